@@ -0,0 +1,134 @@
+import typing
+from functools import lru_cache
+
+from .base_validators import is_code_structure_valid
+
+ACCOUNT_LENGTH = 20
+BALANCE_ACCOUNT_LENGTH = 5
+CURRENCY_CODE_LENGTH = 3
+# Russian ruble: legacy code used in account numbers and ISO 4217 code
+RUB_CODES = ("810", "643")
+
+# Account categories
+OTHER = "other"
+SETTLEMENT = "settlement"
+PERSONAL = "personal"
+DEPOSIT = "deposit"
+BUDGET = "budget"
+TREASURY = "treasury"
+CORRESPONDENT = "correspondent"
+CATEGORIES = (OTHER, SETTLEMENT, PERSONAL, DEPOSIT, BUDGET, TREASURY, CORRESPONDENT)
+# Prefixes of balance accounts (chart of accounts of credit institutions of the Bank of Russia)
+# and their categories. Longer prefixes take precedence over shorter ones.
+CATEGORY_PREFIXES = (
+    ("03", TREASURY),
+    ("301", CORRESPONDENT),
+    ("401", BUDGET),
+    ("40102", TREASURY),
+    ("402", BUDGET),
+    ("403", BUDGET),
+    ("404", SETTLEMENT),
+    ("405", SETTLEMENT),
+    ("406", SETTLEMENT),
+    ("40701", SETTLEMENT),
+    ("40702", SETTLEMENT),
+    ("40703", SETTLEMENT),
+    ("40802", SETTLEMENT),
+    ("40807", SETTLEMENT),
+    ("40821", SETTLEMENT),
+    ("40803", PERSONAL),
+    ("40813", PERSONAL),
+    ("40817", PERSONAL),
+    ("40820", PERSONAL),
+    ("410", DEPOSIT),
+    ("411", DEPOSIT),
+    ("412", DEPOSIT),
+    ("413", DEPOSIT),
+    ("414", DEPOSIT),
+    ("415", DEPOSIT),
+    ("416", DEPOSIT),
+    ("417", DEPOSIT),
+    ("418", DEPOSIT),
+    ("419", DEPOSIT),
+    ("420", DEPOSIT),
+    ("421", DEPOSIT),
+    ("422", DEPOSIT),
+    ("423", DEPOSIT),
+    ("425", DEPOSIT),
+    ("426", DEPOSIT),
+)
+
+class AccountParts(typing.NamedTuple):
+    # Balance account of the second order (the first 5 digits)
+    balance_account: str
+    # Currency code (digits 6-8), "810" for ruble
+    currency: str
+    # Check digit (digit 9)
+    check_digit: str
+    # Code of bank branch (digits 10-13)
+    branch: str
+    # Personal account number (digits 14-20)
+    personal: str
+
+    @property
+    def category(self) -> str:
+        return CATEGORIES[CATEGORY_TABLE[int(self.balance_account)]]
+
+### HELPER FUNCS ###
+
+def _build_category_table() -> bytes:
+    """
+    Returns table of category indexes by balance account number (all 10 ** 5 numbers).
+    """
+    table = bytearray(10 ** BALANCE_ACCOUNT_LENGTH)
+    for prefix, category in sorted(CATEGORY_PREFIXES, key=lambda item: len(item[0])):
+        scale = 10 ** (BALANCE_ACCOUNT_LENGTH - len(prefix))
+        start = int(prefix) * scale
+        table[start:start + scale] = bytes((CATEGORIES.index(category),)) * scale
+    return bytes(table)
+
+CATEGORY_TABLE = _build_category_table()
+
+### PARSER ###
+
+def parse_account(account: str) -> typing.Optional[AccountParts]:
+    """
+    Splits 20-digit bank account into its parts. Returns None if account is malformed.
+    """
+    if not isinstance(account, str) or len(account) != ACCOUNT_LENGTH or not is_code_structure_valid(account):
+        return None
+    return AccountParts(account[:5], account[5:8], account[8], account[9:13], account[13:])
+
+def classify_account(account: str) -> typing.Optional[str]:
+    """
+    Returns category of bank account (see CATEGORIES) with one table lookup
+    or None if account is malformed.
+    """
+    if not isinstance(account, str) or len(account) != ACCOUNT_LENGTH or not is_code_structure_valid(account):
+        return None
+    return CATEGORIES[CATEGORY_TABLE[int(account[:BALANCE_ACCOUNT_LENGTH])]]
+
+def is_rub_account(account: str) -> bool:
+    parts = parse_account(account)
+    return parts is not None and parts.currency in RUB_CODES
+
+@lru_cache(maxsize=len(CATEGORIES))
+def category_ranges(category: str) -> tuple:
+    """
+    Returns ranges (first, last) of 5-digit balance accounts of category,
+    e.g. for range lookups on indexed column.
+    """
+    if category not in CATEGORIES:
+        raise ValueError("Unknown account category: {}".format(category))
+    index = CATEGORIES.index(category)
+    ranges = []
+    first = None
+    for number, value in enumerate(CATEGORY_TABLE):
+        if value == index and first is None:
+            first = number
+        elif value != index and first is not None:
+            ranges.append((first, number - 1))
+            first = None
+    if first is not None:
+        ranges.append((first, len(CATEGORY_TABLE) - 1))
+    return tuple(("{:05d}".format(first), "{:05d}".format(last)) for first, last in ranges)
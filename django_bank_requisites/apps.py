@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+from django.utils.translation import gettext_lazy as _
+
+class BankRequisitesConfig(AppConfig):
+    """
+    Add "django_bank_requisites" to INSTALLED_APPS to use management commands of the package.
+    """
+
+    name = "django_bank_requisites"
+    verbose_name = _("Bank requisites")
@@ -0,0 +1,258 @@
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from .base_validators import (INN_COEFFICIENTS,
+                              BANK_ACCOUNT_COEFFICIENTS,
+                              FIRST_3_KS_DIGITS,
+                              is_code_structure_valid,
+                              is_inn_valid,
+                              is_kpp_valid,
+                              is_ogrn_valid,
+                              is_bik_valid,
+                              is_rs_valid,
+                              is_ks_valid)
+from .errors import FIELDS
+
+# (min batch size, backend name). The backend with the largest size not greater
+# than the batch size is used, if it is available; otherwise the previous one.
+DEFAULT_BACKENDS = (
+    (0, "python"),
+    (2, "table"),
+    (1000, "numpy"),
+    (5000000, "process"),
+)
+BANK_ACCOUNT_FIELDS = ("rs", "ks")
+PROCESS_CHUNK_SIZE = 100000
+
+_registry = {}
+
+def register_backend(name: str):
+    """
+    Class decorator which adds backend to registry.
+    """
+
+    def decorator(cls):
+        cls.name = name
+        _registry[name] = cls()
+        return cls
+
+    return decorator
+
+def get_backend(name: str):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise ValueError("Unknown validation backend '{}'. Available: {}".format(name, ", ".join(_registry)))
+
+### BACKENDS ###
+
+class BaseBackend:
+    """
+    Backend validates batch of codes of one field and returns list of bools.
+    RS and KS also need list of BIKs of the same length.
+    """
+
+    name = None
+
+    def is_available(self) -> bool:
+        return True
+
+    def validate(self, field: str, codes: list, biks: list = None) -> list:
+        raise NotImplementedError
+
+@register_backend("python")
+class PythonBackend(BaseBackend):
+    """
+    Calls base validators for every code.
+    """
+
+    validators = {
+        "inn": is_inn_valid,
+        "kpp": is_kpp_valid,
+        "ogrn": is_ogrn_valid,
+        "bik": is_bik_valid,
+    }
+    bank_account_validators = {
+        "rs": is_rs_valid,
+        "ks": is_ks_valid,
+    }
+
+    def validate(self, field, codes, biks=None):
+        if field in BANK_ACCOUNT_FIELDS:
+            validator = self.bank_account_validators[field]
+            return [validator(code, bik) for code, bik in zip(codes, biks)]
+        validator = self.validators[field]
+        return [validator(code) for code in codes]
+
+def _weights_table(coefs: tuple) -> tuple:
+    """
+    Returns products of every possible ASCII byte value (digits) by coefficient for every position,
+    so checksum is a sum of table lookups without int() conversions.
+    """
+    return tuple(tuple((value - 48) * coef if 48 <= value <= 57 else 0 for value in range(256))
+                 for coef in coefs)
+
+@register_backend("table")
+class TableBackend(BaseBackend):
+    """
+    Computes checksums with precomputed tables of digit-by-coefficient products.
+    """
+
+    inn_10 = _weights_table(INN_COEFFICIENTS["inn_10"])
+    inn_12_penult = _weights_table(INN_COEFFICIENTS["inn_12_penult"])
+    inn_12_last = _weights_table(INN_COEFFICIENTS["inn_12_last"])
+    bank_account = _weights_table(BANK_ACCOUNT_COEFFICIENTS)
+
+    @staticmethod
+    def _checksum(table: tuple, data: bytes) -> int:
+        return sum(weights[value] for weights, value in zip(table, data))
+
+    def _inn(self, code: str) -> bool:
+        if len(code) not in (10, 12) or not is_code_structure_valid(code):
+            return False
+        data = code.encode()
+        if len(data) == 10:
+            return self._checksum(self.inn_10, data) % 11 % 10 == data[9] - 48
+        return (self._checksum(self.inn_12_penult, data) % 11 % 10 == data[10] - 48 and
+                self._checksum(self.inn_12_last, data) % 11 % 10 == data[11] - 48)
+
+    def _bank_account(self, code: str, bik_digits: str) -> bool:
+        return self._checksum(self.bank_account, (bik_digits + code).encode()) % 10 == 0
+
+    def _rs(self, rs: str, bik: str) -> bool:
+        return (is_bik_valid(bik) and len(rs) == 20 and is_code_structure_valid(rs) and
+                self._bank_account(rs, bik[-3:]))
+
+    def _ks(self, ks: str, bik: str) -> bool:
+        return (is_bik_valid(bik) and len(ks) == 20 and is_code_structure_valid(ks) and
+                ks[-3:] == bik[-3:] and ks[:3] == FIRST_3_KS_DIGITS and
+                self._bank_account(ks, "0" + bik[4:6]))
+
+    def validate(self, field, codes, biks=None):
+        if field == "inn":
+            return [self._inn(code) for code in codes]
+        if field == "rs":
+            return [self._rs(code, bik) for code, bik in zip(codes, biks)]
+        if field == "ks":
+            return [self._ks(code, bik) for code, bik in zip(codes, biks)]
+        # Other fields don't have table driven checks
+        return get_backend("python").validate(field, codes, biks)
+
+@register_backend("numpy")
+class NumpyBackend(BaseBackend):
+    """
+    Vectorized validation with numpy (see columnar.py).
+    """
+
+    def is_available(self):
+        from . import columnar
+        return columnar.np is not None
+
+    def validate(self, field, codes, biks=None):
+        from . import columnar
+        validator = getattr(columnar, "{}_valid".format(field))
+        if field in BANK_ACCOUNT_FIELDS:
+            return validator(codes, biks).tolist()
+        return validator(codes).tolist()
+
+def _validate_chunk(field, codes, biks):
+    backend = get_backend("numpy")
+    if not backend.is_available():
+        backend = get_backend("table")
+    return backend.validate(field, codes, biks)
+
+@register_backend("process")
+class ProcessBackend(BaseBackend):
+    """
+    Splits batch into chunks validated in a pool of processes
+    (by numpy backend if it is available, otherwise by table backend).
+    The pool is created on first use and reused until shutdown() or interpreter exit.
+    """
+
+    _executor = None
+    _lock = threading.Lock()
+
+    def is_available(self):
+        return (os.cpu_count() or 1) > 1
+
+    def get_executor(self):
+        with self._lock:
+            if ProcessBackend._executor is None:
+                ProcessBackend._executor = ProcessPoolExecutor(max_workers=os.cpu_count())
+                atexit.register(ProcessBackend.shutdown)
+            return ProcessBackend._executor
+
+    @classmethod
+    def shutdown(cls, wait: bool = True):
+        """
+        Shuts down the pool of processes, the next batch creates a new one.
+        """
+        with cls._lock:
+            executor, cls._executor = cls._executor, None
+        if executor is not None:
+            atexit.unregister(cls.shutdown)
+            executor.shutdown(wait=wait)
+
+    def validate(self, field, codes, biks=None):
+        codes = list(codes)
+        biks = list(biks) if biks is not None else [None] * len(codes)
+        executor = self.get_executor()
+        futures = [executor.submit(_validate_chunk, field,
+                                   codes[start:start + PROCESS_CHUNK_SIZE],
+                                   biks[start:start + PROCESS_CHUNK_SIZE])
+                   for start in range(0, len(codes), PROCESS_CHUNK_SIZE)]
+        result = []
+        for future in futures:
+            result.extend(future.result())
+        return result
+
+### SELECTION ###
+
+def _get_backends_setting():
+    """
+    Reads BANK_REQUISITES_VALIDATION_BACKENDS if Django is installed and configured.
+    """
+    try:
+        from django.core.exceptions import ImproperlyConfigured
+        from .conf import get_setting
+    except ImportError:
+        return DEFAULT_BACKENDS
+    try:
+        return get_setting("VALIDATION_BACKENDS")
+    except ImproperlyConfigured:
+        return DEFAULT_BACKENDS
+
+def select_backend(size: int, backends=None):
+    """
+    Returns the fastest available backend for batch of given size.
+    """
+    if backends is None:
+        backends = _get_backends_setting()
+    selected = get_backend("python")
+    for min_size, name in sorted(backends):
+        if size < min_size:
+            break
+        backend = get_backend(name)
+        if backend.is_available():
+            selected = backend
+    return selected
+
+def validate_many(field: str, codes, biks=None, backend: str = None, backends=None) -> list:
+    """
+    Validates batch of codes of the field ("inn", "kpp", "ogrn", "bik", "rs", "ks")
+    with backend selected by batch size (see select_backend). Returns list of bools.
+    RS and KS also need list of BIKs.
+    """
+    if field not in FIELDS:
+        raise ValueError("Unknown field '{}'. Choose one of: {}".format(field, ", ".join(FIELDS)))
+    codes = list(codes)
+    if field in BANK_ACCOUNT_FIELDS:
+        if biks is None:
+            raise ValueError("BIKs are required to validate {}.".format(field.upper()))
+        biks = list(biks)
+        if len(biks) != len(codes):
+            raise ValueError("Codes and BIKs must have the same length.")
+    selected = get_backend(backend) if backend else select_backend(len(codes), backends)
+    return selected.validate(field, codes, biks)
@@ -1,3 +1,5 @@
+import re
+
 INN_COEFFICIENTS = {
     "inn_10": (2, 4, 10, 3, 5, 9, 4, 6, 8),
     "inn_12_penult": (7, 2, 4, 10, 3, 5, 9, 4, 6, 8),
@@ -5,6 +7,15 @@ INN_COEFFICIENTS = {
 }
 BANK_ACCOUNT_COEFFICIENTS = (7, 1, 3, 7, 1, 3, 7, 1, 3, 7, 1, 3, 7, 1, 3, 7, 1, 3, 7, 1, 3, 7, 1)
 FIRST_3_KS_DIGITS = "301"
+# str.isdigit() accepts any Unicode digits (superscripts, Arabic-Indic, etc.), so only ASCII digits are matched
+DIGITS_PATTERN = re.compile(r"[0-9]*")
+# Separators which are removed from codes and full-width digits which are replaced with ASCII ones
+CODE_SEPARATORS = " \t\n\r\u00a0\u2007\u202f-\u2010\u2011\u2012\u2013\u2014\u2212"
+CODE_NORMALIZATION_TABLE = str.maketrans(
+    "".join(chr(0xFF10 + digit) for digit in range(10)),
+    "0123456789",
+    CODE_SEPARATORS
+)
 
 ### HELPER FUNCS ###
 
@@ -44,7 +55,7 @@ def is_code_length_valid(code: str, length: tuple) -> bool:
     The code may have a different length depending on whether
     it is a legal entity or an individual entrepreneur.
     """
-    if not all(list(map(lambda x: isinstance(x, int), length))):
+    if not all(isinstance(x, int) for x in length):
         raise TypeError("All length values must be of type int")
     return (True
             if len(code) in length
@@ -52,12 +63,19 @@ def is_code_length_valid(code: str, length: tuple) -> bool:
 
 def is_code_structure_valid(code: str) -> bool:
     """
-    Validates if the code consists only of digits.
+    Validates if the code consists only of ASCII digits.
     """
     return (True
-            if all(list(map(lambda x: x.isdigit(), code)))
+            if DIGITS_PATTERN.fullmatch(code)
             else False)
 
+def normalize_code(code: str) -> str:
+    """
+    Removes spaces and dashes from the code and replaces full-width digits with ASCII ones
+    in one pass. Other characters are kept, so the result still has to be validated.
+    """
+    return code.translate(CODE_NORMALIZATION_TABLE)
+
 def is_inn_check_num_valid(inn: str) -> bool:
     """
     Validates INN check numbers depending on code length.
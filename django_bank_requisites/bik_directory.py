@@ -0,0 +1,162 @@
+import threading
+import typing
+from collections import ChainMap
+from xml.etree.ElementTree import iterparse
+
+from .utils import local_name
+
+# ChangeType of BICDirectoryEntry in ED807 delta files
+ADDED = "ADDD"
+CHANGED = "CHGD"
+DELETED = "DLTD"
+# AccountStatus of deleted accounts
+ACCOUNT_DELETED = "ACDL"
+# Max number of delta layers over the full directory, then layers are merged
+MAX_LAYERS = 8
+
+class BankInfo(typing.NamedTuple):
+    bik: str
+    name: str
+    # Correspondent accounts of the bank
+    accounts: tuple = ()
+
+### HELPER FUNCS ###
+
+def _parse_entry(element) -> BankInfo:
+    name = ""
+    accounts = []
+    for child in element:
+        tag = local_name(child.tag)
+        if tag == "ParticipantInfo":
+            name = child.get("NameP", "")
+        elif tag == "Accounts" and child.get("AccountStatus") != ACCOUNT_DELETED:
+            accounts.append(child.get("Account", ""))
+    return BankInfo(bik=element.get("BIC", ""), name=name, accounts=tuple(accounts))
+
+def iter_ed807(source):
+    """
+    Parses ED807 (BIK directory of the Bank of Russia) file or binary stream incrementally.
+    Yields (ChangeType, BankInfo). ChangeType is None in full directory files.
+    Parsed elements are cleared, so memory usage doesn't depend on file size.
+    """
+    root = None
+    for event, element in iterparse(source, events=("start", "end")):
+        if root is None:
+            root = element
+        if event != "end" or local_name(element.tag) != "BICDirectoryEntry":
+            continue
+        yield element.get("ChangeType"), _parse_entry(element)
+        # Cleared entries are also removed from root
+        root.clear()
+
+### DIRECTORY ###
+
+class BikDirectory:
+    """
+    Immutable snapshot of the BIK directory. Changes create a new snapshot,
+    so a snapshot can be read from any thread without locks.
+
+    Entries are a ChainMap of layers: a delta adds a layer with its changes over the layers
+    of the previous snapshot (deleted entries are None), so the full directory isn't copied.
+    When there are more than MAX_LAYERS layers, they are merged into one.
+    """
+
+    def __init__(self, entries: dict = None):
+        self._entries = ChainMap(dict(entries or {}))
+        self._size = len(self._entries)
+
+    @classmethod
+    def from_ed807(cls, source):
+        """
+        Loads full directory. Entries marked as deleted are skipped.
+        """
+        return cls({info.bik: info for change_type, info in iter_ed807(source) if change_type != DELETED})
+
+    def apply(self, changes) -> "BikDirectory":
+        """
+        Returns new directory with changes ((ChangeType, BankInfo) pairs) applied.
+        Added and changed entries replace stored ones, deleted entries are removed,
+        so applying the same delta twice gives the same directory.
+        """
+        entries = self._entries.new_child()
+        size = self._size
+        for change_type, info in changes:
+            exists = entries.get(info.bik) is not None
+            if change_type == DELETED:
+                if exists:
+                    entries[info.bik] = None
+                    size -= 1
+            else:
+                entries[info.bik] = info
+                size += not exists
+        if len(entries.maps) > MAX_LAYERS:
+            return BikDirectory({bik: info for bik, info in entries.items() if info is not None})
+        directory = BikDirectory()
+        directory._entries = entries
+        directory._size = size
+        return directory
+
+    def get(self, bik: str) -> typing.Optional[BankInfo]:
+        return self._entries.get(bik)
+
+    def __contains__(self, bik: str) -> bool:
+        return self._entries.get(bik) is not None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self):
+        return (info for info in self._entries.values() if info is not None)
+
+    def is_ks_valid(self, ks: str, bik: str) -> bool:
+        """
+        Validates that KS is a correspondent account of the bank with this BIK.
+        """
+        info = self._entries.get(bik)
+        return info is not None and ks in info.accounts
+
+class BikDirectoryRegistry:
+    """
+    Holds current BIK directory and swaps it on refresh.
+
+    Readers use the directory attribute: it always refers to a complete snapshot
+    and is never changed in place, so lookups don't take locks and never see
+    a partially applied delta. Writers are serialized with a lock, a new snapshot
+    is built aside and published with one reference assignment.
+    """
+
+    def __init__(self, directory: BikDirectory = None):
+        self.directory = directory if directory is not None else BikDirectory()
+        self._write_lock = threading.Lock()
+
+    def load(self, source):
+        """
+        Replaces directory with full ED807 file.
+        """
+        directory = BikDirectory.from_ed807(source)
+        with self._write_lock:
+            self.directory = directory
+
+    def apply_delta(self, source):
+        """
+        Applies ED807 delta file (ADDD, CHGD and DLTD entries) to the current directory.
+        """
+        changes = list(iter_ed807(source))
+        with self._write_lock:
+            self.directory = self.directory.apply(changes)
+
+    def apply_deltas(self, sources):
+        """
+        Applies several delta files (in order of publication) and publishes the result once.
+        """
+        changes = [change for source in sources for change in iter_ed807(source)]
+        with self._write_lock:
+            self.directory = self.directory.apply(changes)
+
+    def get(self, bik: str) -> typing.Optional[BankInfo]:
+        return self.directory.get(bik)
+
+    def __contains__(self, bik: str) -> bool:
+        return bik in self.directory
+
+bik_directory = BikDirectoryRegistry()
@@ -0,0 +1,137 @@
+import hashlib
+import math
+import struct
+import threading
+
+from .utils import DB_CHUNK_SIZE, atomic_write
+
+MAGIC = b"BRBF"
+FORMAT_VERSION = 1
+# magic, format version, number of bits, number of hashes, number of added items
+HEADER = struct.Struct("<4sBQBQ")
+
+### BLOOM FILTER ###
+
+class BloomFilter:
+    """
+    Probabilistic set: "not in filter" is always true, "in filter" may be false positive
+    with probability error_rate when no more than capacity items are added.
+    Uses double hashing of blake2b digest.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError("capacity must be positive and error_rate must be between 0 and 1")
+        num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        num_hashes = max(1, int(round(num_bits / capacity * math.log(2))))
+        self._init(num_bits, num_hashes, bytearray((num_bits + 7) // 8), 0)
+
+    def _init(self, num_bits: int, num_hashes: int, bits: bytearray, count: int):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bits
+        self.count = count
+        self._lock = threading.Lock()
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str):
+        with self._lock:
+            for position in self._positions(item):
+                self.bits[position >> 3] |= 1 << (position & 7)
+            self.count += 1
+
+    def update(self, items):
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: str) -> bool:
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def save(self, path: str):
+        """
+        Writes filter to file. File is replaced atomically,
+        so processes which load it at the same time never see a partial file.
+        """
+        with atomic_write(path, prefix=".bloom-") as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.num_bits, self.num_hashes, self.count))
+            f.write(self.bits)
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) != HEADER.size:
+                raise ValueError("{} is not a bloom filter file".format(path))
+            magic, version, num_bits, num_hashes, count = HEADER.unpack(header)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError("{} is not a bloom filter file".format(path))
+            bits = bytearray(f.read())
+        if len(bits) != (num_bits + 7) // 8:
+            raise ValueError("{} is truncated".format(path))
+        bloom_filter = cls.__new__(cls)
+        bloom_filter._init(num_bits, num_hashes, bits, count)
+        return bloom_filter
+
+### UNIQUE FIELDS FILTER ###
+
+def filter_key(field: str, value: str) -> str:
+    """
+    One filter stores values of several fields, so values are prefixed with field name.
+    """
+    return "{}:{}".format(field, value)
+
+def build_unique_filter(queryset, fields: tuple = ("inn", "rs"), capacity: int = None, error_rate: float = 0.01):
+    """
+    Builds filter from values of unique fields of the queryset.
+    By default capacity is twice the number of stored values, so there is room for new ones.
+    """
+    if capacity is None:
+        capacity = max(1000, 2 * queryset.count() * len(fields))
+    bloom_filter = BloomFilter(capacity=capacity, error_rate=error_rate)
+    for values in queryset.values_list(*fields).iterator(chunk_size=DB_CHUNK_SIZE):
+        for field, value in zip(fields, values):
+            if value:
+                bloom_filter.add(filter_key(field, value))
+    return bloom_filter
+
+_unique_filter = None
+_unique_filter_path = None
+_unique_filter_lock = threading.Lock()
+
+def get_unique_filter():
+    """
+    Returns filter loaded from BANK_REQUISITES_BLOOM_FILTER_PATH
+    or None if the setting is not set or the file doesn't exist.
+    The filter is loaded once per process.
+    """
+    global _unique_filter, _unique_filter_path
+    from .conf import get_setting
+
+    path = get_setting("BLOOM_FILTER_PATH")
+    if not path:
+        return None
+    if _unique_filter_path != path:
+        with _unique_filter_lock:
+            if _unique_filter_path != path:
+                try:
+                    _unique_filter = BloomFilter.load(path)
+                except FileNotFoundError:
+                    _unique_filter = None
+                _unique_filter_path = path
+    return _unique_filter
+
+def reset_unique_filter():
+    """
+    Makes get_unique_filter() reload the file (e.g. after it was rebuilt).
+    """
+    global _unique_filter, _unique_filter_path
+    with _unique_filter_lock:
+        _unique_filter = None
+        _unique_filter_path = None
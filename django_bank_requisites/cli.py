@@ -0,0 +1,138 @@
+import argparse
+import csv
+import itertools
+import json
+import mmap
+import os
+import sys
+from functools import partial
+from multiprocessing import Pool
+
+from .backends import DEFAULT_BACKENDS
+from .errors import FIELDS, iter_chunks, records_errors
+
+FORMATS = ("csv", "tsv", "jsonl")
+EXTENSIONS = {
+    ".csv": "csv",
+    ".tsv": "tsv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+}
+CHUNK_SIZE = 1000
+# Exit codes
+OK = 0
+INVALID_RECORDS = 1
+USAGE_ERROR = 2
+
+### INPUT ###
+
+def _iter_file_lines(path: str):
+    """
+    Yields lines of memory-mapped file.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield from iter(mapped.readline, b"")
+
+def _detect_format(first_line: bytes) -> str:
+    if first_line.lstrip().startswith(b"{"):
+        return "jsonl"
+    return "tsv" if b"\t" in first_line else "csv"
+
+def iter_records(lines, fmt: str, encoding: str = "utf-8"):
+    """
+    Yields (line number, record) from binary lines of CSV/TSV with header or JSONL.
+    """
+    if fmt == "jsonl":
+        for line_num, line in enumerate(lines, start=1):
+            if line.strip():
+                try:
+                    record = json.loads(line.decode(encoding))
+                except ValueError as e:
+                    raise ValueError("Invalid JSON at line {}: {}".format(line_num, e))
+                if not isinstance(record, dict):
+                    raise ValueError("Line {} is not a JSON object".format(line_num))
+                yield line_num, record
+        return
+    text_lines = (line.decode(encoding) for line in lines)
+    reader = csv.DictReader(text_lines, delimiter="\t" if fmt == "tsv" else ",")
+    for record in reader:
+        yield reader.line_num, record
+
+def _open_records(path: str, fmt: str, encoding: str):
+    lines = iter(sys.stdin.buffer.readline, b"") if path == "-" else _iter_file_lines(path)
+    if fmt is None:
+        fmt = EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        first_line = next(lines, b"")
+        fmt = _detect_format(first_line)
+        lines = itertools.chain([first_line], lines)
+    return iter_records(lines, fmt, encoding=encoding)
+
+### VALIDATION ###
+
+def _validate_chunk(chunk: list, fail_fast: bool = False) -> list:
+    records = [{field: record[field] for field in FIELDS if record.get(field) not in (None, "")}
+               for _, record in chunk]
+    # Default thresholds of backends, so Django settings are not read
+    errors = records_errors(records, fail_fast=fail_fast, backends=DEFAULT_BACKENDS)
+    return [(line_num, {field: codes.keys for field, codes in row_errors.items()})
+            for (line_num, _), row_errors in zip(chunk, errors)]
+
+def validate(records, workers: int = 1, fail_fast: bool = False):
+    """
+    Yields (line number, dict field -> list of error keys) in input order.
+    Chunks of records are validated by a pool of processes if workers > 1.
+    """
+    chunks = iter_chunks(records, CHUNK_SIZE)
+    validate_chunk = partial(_validate_chunk, fail_fast=fail_fast)
+    if workers <= 1:
+        for chunk in chunks:
+            yield from validate_chunk(chunk)
+        return
+    with Pool(processes=workers) as pool:
+        for results in pool.imap(validate_chunk, chunks):
+            yield from results
+
+### COMMAND ###
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m django_bank_requisites",
+                                     description="Validates bank details with base validators, "
+                                                 "Django settings are not needed.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    validate_parser = commands.add_parser(
+        "validate",
+        help="Validate records with inn, kpp, ogrn, bik, rs and ks fields. Results are written as JSON lines.")
+    validate_parser.add_argument("files", nargs="*", default=["-"], help="Input files, - or nothing for stdin.")
+    validate_parser.add_argument("--format", choices=FORMATS, default=None,
+                                 help="Input format. By default detected by file extension or the first line.")
+    validate_parser.add_argument("--encoding", default="utf-8", help="Input encoding.")
+    validate_parser.add_argument("--workers", type=int, default=1, help="Number of worker processes.")
+    validate_parser.add_argument("--only-invalid", action="store_true", help="Write only invalid records.")
+    validate_parser.add_argument("--fail-fast", action="store_true", help="Report only the first error of a record.")
+    return parser
+
+def main(argv=None, stdout=None) -> int:
+    args = _parser().parse_args(argv)
+    stdout = stdout or sys.stdout
+    exit_code = OK
+    for path in args.files:
+        try:
+            results = validate(_open_records(path, args.format, args.encoding), workers=args.workers,
+                               fail_fast=args.fail_fast)
+            for line_num, errors in results:
+                if errors:
+                    exit_code = INVALID_RECORDS
+                elif args.only_invalid:
+                    continue
+                result = {"file": path, "line": line_num, "valid": not errors}
+                if errors:
+                    result["errors"] = errors
+                stdout.write(json.dumps(result) + "\n")
+        except (OSError, ValueError, UnicodeDecodeError, csv.Error) as e:
+            sys.stderr.write("{}: {}\n".format(path, e))
+            return USAGE_ERROR
+    return exit_code
@@ -0,0 +1,320 @@
+"""
+Vectorized validation of bank details columns in pandas DataFrames and pyarrow Tables.
+
+Codes are processed as numpy matrices of character codes. Arrow string arrays are read
+directly from their offsets and data buffers, so values are never converted
+into Python str objects one by one. Requires numpy; pandas and pyarrow are optional.
+
+    from django_bank_requisites.columnar import validate_dataframe
+
+    result = validate_dataframe(df)  # DataFrame with inn_valid, rs_valid, ... columns
+"""
+from .base_validators import (INN_COEFFICIENTS,
+                              BANK_ACCOUNT_COEFFICIENTS,
+                              FIRST_3_KS_DIGITS)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pragma: no cover
+    pa = None
+    pc = None
+
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover
+    pd = None
+
+CODE_FIELDS = ("inn", "kpp", "ogrn", "bik")
+BANK_ACCOUNT_FIELDS = ("rs", "ks")
+CHUNK_SIZE = 1 << 20
+# Width of character matrix: the longest valid code (RS and KS) plus one character.
+# Longer values are invalid by length, so the rest of their characters is not needed.
+MAX_CODE_WIDTH = 21
+
+### HELPER FUNCS ###
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("Columnar validation requires numpy. Install it with 'pip install numpy'.")
+
+class _Codes:
+    """
+    Column of codes as matrix of ASCII character codes (non-ASCII characters are zeroes)
+    padded with zeroes, plus lengths of codes in characters. Nulls are empty codes.
+    Codes longer than MAX_CODE_WIDTH are truncated in the matrix, their lengths stay invalid.
+    """
+
+    def __init__(self, matrix, lengths):
+        self.matrix = matrix
+        self.lengths = lengths
+
+    def __len__(self):
+        return len(self.lengths)
+
+    @classmethod
+    def from_arrow(cls, array):
+        if not (pa.types.is_string(array.type) or pa.types.is_large_string(array.type)):
+            array = array.cast(pa.string())
+        n = len(array)
+        offsets_type = np.int64 if pa.types.is_large_string(array.type) else np.int32
+        _, offsets_buffer, data_buffer = array.buffers()
+        offsets = (np.frombuffer(offsets_buffer, dtype=offsets_type)[array.offset:array.offset + n + 1]
+                   if offsets_buffer is not None
+                   else np.zeros(n + 1, dtype=offsets_type))
+        data = (np.frombuffer(data_buffer, dtype=np.uint8)
+                if data_buffer is not None and data_buffer.size
+                else np.zeros(1, dtype=np.uint8))
+        byte_lengths = np.diff(offsets)
+        # Null values may have non-zero length in buffers
+        if array.null_count:
+            byte_lengths = np.where(array.is_null().to_numpy(zero_copy_only=False), 0, byte_lengths)
+        width = min(int(byte_lengths.max()), MAX_CODE_WIDTH) if n else 0
+        positions = np.arange(width)
+        inside = positions < byte_lengths[:, None]
+        indexes = np.minimum(offsets[:-1, None] + positions, len(data) - 1)
+        matrix = np.where(inside, data[indexes], 0).astype(np.uint8)
+        # Non-ASCII bytes are never digits
+        matrix[matrix > 127] = 0
+        lengths = pc.utf8_length(array).fill_null(0).to_numpy(zero_copy_only=False).astype(np.int64)
+        return cls(matrix, lengths)
+
+    @classmethod
+    def from_values(cls, values):
+        values = np.asarray(values, dtype=object)
+        nulls = (pd.isna(values)
+                 if pd is not None
+                 else np.fromiter((value is None for value in values), dtype=bool, count=len(values)))
+        # Longer values are truncated to MAX_CODE_WIDTH, so their lengths are still invalid
+        strings = np.where(nulls, "", values).astype("U{}".format(MAX_CODE_WIDTH))
+        width = strings.dtype.itemsize // 4
+        matrix = (strings.view(np.uint32).reshape(len(strings), width)
+                  if width
+                  else np.zeros((len(strings), 0), dtype=np.uint32))
+        matrix = np.where(matrix < 128, matrix, 0).astype(np.uint8)
+        lengths = np.char.str_len(strings).astype(np.int64)
+        return cls(matrix, lengths)
+
+    def length_valid(self, length: tuple):
+        return np.isin(self.lengths, length)
+
+    def structure_valid(self):
+        is_digit = (self.matrix >= 48) & (self.matrix <= 57)
+        inside = np.arange(self.matrix.shape[1]) < self.lengths[:, None]
+        return np.all(is_digit | ~inside, axis=1)
+
+    def digits(self, length: int):
+        """
+        Returns (n, length) matrix of digits of codes with given length.
+        Values of other rows are meaningless.
+        """
+        matrix = self.matrix[:, :length].astype(np.int64) - 48
+        if matrix.shape[1] < length:
+            matrix = np.hstack([matrix, np.zeros((len(self), length - matrix.shape[1]), dtype=np.int64)])
+        return matrix
+
+def _iter_chunks(column):
+    """
+    Yields _Codes for chunks of column (pyarrow Array/ChunkedArray, pandas Series or any sequence).
+    """
+    _require_numpy()
+    if pa is not None and isinstance(column, pa.ChunkedArray):
+        arrays = column.chunks
+    elif pa is not None and isinstance(column, pa.Array):
+        arrays = [column]
+    elif pa is not None and pd is not None and isinstance(column, pd.Series):
+        arrays = [pa.array(column, from_pandas=True)]
+    else:
+        values = np.asarray(column, dtype=object)
+        for start in range(0, len(values), CHUNK_SIZE):
+            yield _Codes.from_values(values[start:start + CHUNK_SIZE])
+        return
+    for array in arrays:
+        for start in range(0, len(array), CHUNK_SIZE):
+            yield _Codes.from_arrow(array.slice(start, CHUNK_SIZE))
+
+def _concat(chunks_checks: list) -> dict:
+    if not chunks_checks:
+        return {}
+    return {name: np.concatenate([checks[name] for checks in chunks_checks])
+            for name in chunks_checks[0]}
+
+def _check_column(column, check_chunk, bik=None) -> dict:
+    chunks = list(_iter_chunks(column))
+    if bik is None:
+        return _concat([check_chunk(codes) for codes in chunks])
+    bik_chunks = list(_iter_chunks(bik))
+    if sum(map(len, chunks)) != sum(map(len, bik_chunks)):
+        raise ValueError("Code and BIK columns must have the same length.")
+    if [len(codes) for codes in chunks] != [len(codes) for codes in bik_chunks]:
+        # Chunks of two columns may be different, so split codes by BIK chunks
+        merged = _merge_codes(chunks)
+        chunks, start = [], 0
+        for bik_codes in bik_chunks:
+            end = start + len(bik_codes)
+            chunks.append(_Codes(merged.matrix[start:end], merged.lengths[start:end]))
+            start = end
+    return _concat([check_chunk(codes, bik_codes) for codes, bik_codes in zip(chunks, bik_chunks)])
+
+def _merge_codes(chunks: list):
+    width = max([codes.matrix.shape[1] for codes in chunks] or [0])
+    matrices = [np.pad(codes.matrix, ((0, 0), (0, width - codes.matrix.shape[1]))) for codes in chunks]
+    return _Codes(np.vstack(matrices) if matrices else np.zeros((0, 0), dtype=np.uint8),
+                  np.concatenate([codes.lengths for codes in chunks]) if chunks else np.zeros(0, dtype=np.int64))
+
+def _inn_check_num(digits, coefs: tuple, position: int):
+    checksum = digits[:, :len(coefs)] @ np.array(coefs, dtype=np.int64)
+    return checksum % 11 % 10 == digits[:, position]
+
+def _bank_account_check_num(bik_digits, code_digits):
+    digits = np.hstack([bik_digits, code_digits])
+    return digits @ np.array(BANK_ACCOUNT_COEFFICIENTS, dtype=np.int64) % 10 == 0
+
+def _number(digits):
+    result = np.zeros(len(digits), dtype=np.int64)
+    for i in range(digits.shape[1]):
+        result = result * 10 + digits[:, i]
+    return result
+
+### CHUNK CHECKS ###
+
+def _check_inn(codes) -> dict:
+    length = codes.length_valid((10, 12))
+    structure = codes.structure_valid()
+    digits_10 = codes.digits(10)
+    digits_12 = codes.digits(12)
+    check_num = np.where(codes.lengths == 10,
+                         _inn_check_num(digits_10, INN_COEFFICIENTS["inn_10"], 9),
+                         _inn_check_num(digits_12, INN_COEFFICIENTS["inn_12_penult"], 10) &
+                         _inn_check_num(digits_12, INN_COEFFICIENTS["inn_12_last"], 11))
+    return {"length": length, "structure": structure, "check_num": length & structure & check_num}
+
+def _check_kpp(codes) -> dict:
+    return {"length": codes.length_valid((9,)), "structure": codes.structure_valid()}
+
+_check_bik = _check_kpp
+
+def _check_ogrn(codes) -> dict:
+    length = codes.length_valid((13, 15))
+    structure = codes.structure_valid()
+    digits_13 = codes.digits(13)
+    digits_15 = codes.digits(15)
+    check_num = np.where(codes.lengths == 13,
+                         _number(digits_13[:, :12]) % 11 % 10 == digits_13[:, 12],
+                         _number(digits_15[:, :14]) % 13 % 10 == digits_15[:, 14])
+    return {"length": length, "structure": structure, "check_num": length & structure & check_num}
+
+def _check_rs(codes, bik_codes) -> dict:
+    length = codes.length_valid((20,))
+    structure = codes.structure_valid()
+    bik_valid = bik_codes.length_valid((9,)) & bik_codes.structure_valid()
+    check_num = _bank_account_check_num(bik_codes.digits(9)[:, 6:9], codes.digits(20))
+    return {"bik": bik_valid, "length": length, "structure": structure,
+            "check_num_bik": bik_valid & length & structure & check_num}
+
+def _check_ks(codes, bik_codes) -> dict:
+    length = codes.length_valid((20,))
+    structure = codes.structure_valid()
+    bik_valid = bik_codes.length_valid((9,)) & bik_codes.structure_valid()
+    digits = codes.digits(20)
+    bik_digits = bik_codes.digits(9)
+    first_3 = np.all(digits[:, :3] == [int(digit) for digit in FIRST_3_KS_DIGITS], axis=1)
+    last_3 = np.all(digits[:, 17:20] == bik_digits[:, 6:9], axis=1)
+    ks_bik_digits = np.hstack([np.zeros((len(codes), 1), dtype=np.int64), bik_digits[:, 4:6]])
+    check_num = _bank_account_check_num(ks_bik_digits, digits)
+    return {"bik": bik_valid, "length": length, "structure": structure,
+            "ks_first_3": length & first_3, "ks_last_3": length & last_3,
+            "check_num_bik": bik_valid & length & structure & first_3 & last_3 & check_num}
+
+CHECKS = {
+    "inn": _check_inn,
+    "kpp": _check_kpp,
+    "ogrn": _check_ogrn,
+    "bik": _check_bik,
+    "rs": _check_rs,
+    "ks": _check_ks,
+}
+
+### COLUMN VALIDATORS ###
+
+def check_column(field: str, column, bik=None) -> dict:
+    """
+    Runs all checks of the field ("inn", "kpp", "ogrn", "bik", "rs", "ks") for the column.
+    Returns dict check name -> numpy bool array (True if check passed).
+    Check names are the same as keys of django_validators.error_messages.
+    RS and KS checks also need BIK column.
+    """
+    if field in BANK_ACCOUNT_FIELDS:
+        if bik is None:
+            raise ValueError("BIK column is required to validate {}.".format(field.upper()))
+        return _check_column(column, CHECKS[field], bik=bik)
+    return _check_column(column, CHECKS[field])
+
+def _all_passed(checks: dict, column):
+    if not checks:
+        _require_numpy()
+        return np.zeros(len(column), dtype=bool)
+    return np.logical_and.reduce(list(checks.values()))
+
+def inn_valid(column):
+    """
+    Vectorized is_inn_valid. Returns numpy bool array.
+    """
+    return _all_passed(check_column("inn", column), column)
+
+def kpp_valid(column):
+    return _all_passed(check_column("kpp", column), column)
+
+def ogrn_valid(column):
+    return _all_passed(check_column("ogrn", column), column)
+
+def bik_valid(column):
+    return _all_passed(check_column("bik", column), column)
+
+def rs_valid(column, bik):
+    """
+    Vectorized is_rs_valid. Returns numpy bool array.
+    """
+    return _all_passed(check_column("rs", column, bik=bik), column)
+
+def ks_valid(column, bik):
+    return _all_passed(check_column("ks", column, bik=bik), column)
+
+def _validate_columns(get_column, column_names, detailed: bool) -> dict:
+    result = {}
+    bik = get_column("bik") if "bik" in column_names else None
+    for field in CODE_FIELDS + BANK_ACCOUNT_FIELDS:
+        if field not in column_names or (field in BANK_ACCOUNT_FIELDS and bik is None):
+            continue
+        column = get_column(field)
+        checks = check_column(field, column, bik=bik if field in BANK_ACCOUNT_FIELDS else None)
+        if detailed:
+            for name, passed in checks.items():
+                result["{}_{}".format(field, name)] = passed
+        result["{}_valid".format(field)] = _all_passed(checks, column)
+    return result
+
+def validate_dataframe(df, detailed: bool = False):
+    """
+    Validates inn, kpp, ogrn, bik, rs and ks columns of pandas DataFrame (missing columns are skipped).
+    Returns DataFrame with the same index and bool <field>_valid columns.
+    If detailed is True, also adds <field>_<check> columns for every check.
+    """
+    if pd is None:
+        raise ImportError("validate_dataframe requires pandas. Install it with 'pip install pandas'.")
+    result = _validate_columns(lambda name: df[name], set(df.columns), detailed)
+    return pd.DataFrame(result, index=df.index)
+
+def validate_table(table, detailed: bool = False):
+    """
+    Same as validate_dataframe for pyarrow Table. Returns pyarrow Table.
+    """
+    if pa is None:
+        raise ImportError("validate_table requires pyarrow. Install it with 'pip install pyarrow'.")
+    result = _validate_columns(lambda name: table.column(name), set(table.column_names), detailed)
+    return pa.table({name: pa.array(values) for name, values in result.items()})
@@ -0,0 +1,56 @@
+from django.conf import settings
+
+from .backends import DEFAULT_BACKENDS
+from .errors import FAIL_FAST
+
+SETTINGS_PREFIX = "BANK_REQUISITES_"
+
+DEFAULTS = {
+    # Deferred (background) validation for models with SaveMethodMixin
+    "DEFERRED_VALIDATION": False,
+    "DEFERRED_POOL": "thread",
+    "DEFERRED_MAX_WORKERS": 4,
+    "DEFERRED_VALIDATE_UNIQUE": True,
+    "DEFERRED_MAX_RESULTS": 10000,
+    # Cache-Control max-age (seconds) of single code validation endpoint responses
+    "CODE_VALIDATION_MAX_AGE": 365 * 24 * 60 * 60,
+    # Profiling of validation with cProfile (see profiling.py)
+    "PROFILING_ENABLED": False,
+    "PROFILING_SAMPLE_RATE": 0.01,
+    "PROFILING_OUTPUT_DIR": None,
+    "PROFILING_DUMP_INTERVAL": 100,
+    # File with bloom filter of inn and rs values (see bloom.py)
+    "BLOOM_FILTER_PATH": None,
+    # Batch validation backends by min batch size (see backends.py)
+    "VALIDATION_BACKENDS": DEFAULT_BACKENDS,
+    # Check of INN in tax registry service in BankDetailsValidated.clean() (see counterparty.py)
+    "COUNTERPARTY_CHECK": False,
+    "COUNTERPARTY_BASE_URL": None,
+    "COUNTERPARTY_TIMEOUT": 5,
+    "COUNTERPARTY_POOL_SIZE": 8,
+    "COUNTERPARTY_CACHE_SIZE": 10000,
+    "COUNTERPARTY_CACHE_TTL": 60 * 60,
+    # Check of BIK and KS in the loaded BIK directory in clean() and serializers (see bik_directory.py)
+    "BIK_DIRECTORY_CHECK": False,
+    # Alias of Django cache for results shared by processes (see result_cache.py)
+    "RESULT_CACHE": None,
+    "RESULT_CACHE_TIMEOUT": 24 * 60 * 60,
+    # "collect_all" reports all errors, "fail_fast" stops at the first one (see errors.first_error)
+    "VALIDATION_MODE": "collect_all",
+    # Default page size of BankDetailsCursorPagination (see pagination.py)
+    "CURSOR_PAGE_SIZE": 100,
+}
+
+def get_setting(name: str):
+    """
+    Returns package setting from Django settings (with BANK_REQUISITES_ prefix)
+    or its default value.
+    """
+    return getattr(settings, SETTINGS_PREFIX + name, DEFAULTS[name])
+
+def is_fail_fast_mode(validation_mode: str = None) -> bool:
+    """
+    Returns True if validation_mode (BANK_REQUISITES_VALIDATION_MODE setting if it is None) is "fail_fast".
+    """
+    mode = get_setting("VALIDATION_MODE") if validation_mode is None else validation_mode
+    return mode == FAIL_FAST
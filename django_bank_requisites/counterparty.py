@@ -0,0 +1,328 @@
+import http.client
+import json
+import threading
+import time
+import typing
+from collections import OrderedDict
+from queue import LifoQueue, Empty, Full
+from urllib.parse import quote, urlsplit
+
+# Max number of codes in one bulk request
+BULK_CHUNK_SIZE = 100
+
+class CounterpartyError(Exception):
+    """
+    Raised when registry service is unavailable or returns invalid response.
+    """
+
+class CounterpartyStatus(typing.NamedTuple):
+    # INN or OGRN
+    code: str
+    registered: bool
+    active: bool
+
+### HELPER CLASSES ###
+
+class _ConnectionPool:
+    """
+    Keeps up to size keep-alive connections to the service host.
+    """
+
+    def __init__(self, base_url: str, size: int, timeout: float):
+        url = urlsplit(base_url)
+        if url.scheme not in ("http", "https") or not url.hostname:
+            raise ValueError("Invalid base URL: {}".format(base_url))
+        self.connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        self.host = url.hostname
+        self.port = url.port
+        self.path = url.path.rstrip("/")
+        self.timeout = timeout
+        self._connections = LifoQueue(maxsize=size)
+
+    def request(self, method: str, path: str, body: bytes = None) -> tuple:
+        """
+        Returns (status, body). Connection is returned to the pool only after successful request.
+        If pooled connection was closed by the server, request is retried once on a new connection.
+        """
+        try:
+            connection = self._connections.get_nowait()
+        except Empty:
+            connection = None
+        headers = {"Accept": "application/json"}
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+        while True:
+            pooled = connection is not None
+            if not pooled:
+                connection = self.connection_class(self.host, self.port, timeout=self.timeout)
+            try:
+                connection.request(method, self.path + path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                connection = None
+                # Keep-alive connection can be closed by the server while it is idle in the pool
+                if pooled and isinstance(e, (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)):
+                    continue
+                raise CounterpartyError("Registry request failed: {}".format(e))
+            break
+        if response.will_close:
+            connection.close()
+        else:
+            try:
+                self._connections.put_nowait(connection)
+            except Full:
+                connection.close()
+        return response.status, data
+
+    def close(self):
+        while True:
+            try:
+                self._connections.get_nowait().close()
+            except Empty:
+                break
+
+class _TTLCache:
+    """
+    LRU cache with max size and expiration time of values.
+    """
+
+    def __init__(self, size: int, ttl: float):
+        self.size = size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+class _Call:
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class _SingleFlight:
+    """
+    Concurrent calls with the same key wait for the first one instead of repeating the request.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = func()
+            except Exception as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+### CLIENT ###
+
+class CounterpartyClient:
+    """
+    Client of tax registry service which tells whether INN or OGRN is registered and active.
+
+    Service API:
+        GET {base_url}/counterparties/{code} -> {"registered": bool, "active": bool} (404 if not registered)
+        POST {base_url}/counterparties/bulk {"codes": [...]} -> {"results": {code: {"registered": ..., "active": ...}}}
+
+    Connections are pooled, statuses are cached for cache_ttl seconds
+    and concurrent requests of the same code are coalesced into one.
+    shared_cache is an optional second level cache shared by processes
+    (e.g. result_cache.SharedCache), it must have get, set, get_many and set_many methods.
+    """
+
+    def __init__(self, base_url: str, timeout: float = 5, pool_size: int = 8,
+                 cache_size: int = 10000, cache_ttl: float = 3600, shared_cache=None):
+        self._pool = _ConnectionPool(base_url, size=pool_size, timeout=timeout)
+        self._cache = _TTLCache(size=cache_size, ttl=cache_ttl)
+        self._shared_cache = shared_cache
+        self._single_flight = _SingleFlight()
+
+    @staticmethod
+    def _status(code: str, data: dict) -> CounterpartyStatus:
+        if not isinstance(data, dict):
+            raise CounterpartyError("Invalid registry response for {}".format(code))
+        return CounterpartyStatus(code=code, registered=bool(data.get("registered")), active=bool(data.get("active")))
+
+    @staticmethod
+    def _loads(data: bytes):
+        try:
+            return json.loads(data.decode())
+        except ValueError as e:
+            raise CounterpartyError("Invalid registry response: {}".format(e))
+
+    def _cache_status(self, status: CounterpartyStatus):
+        self._cache.set(status.code, status)
+        if self._shared_cache is not None:
+            self._shared_cache.set(status.code, [status.registered, status.active])
+
+    def _get_shared(self, code: str) -> typing.Optional[CounterpartyStatus]:
+        if self._shared_cache is None:
+            return None
+        cached = self._shared_cache.get(code)
+        if cached is None:
+            return None
+        result = CounterpartyStatus(code, *cached)
+        self._cache.set(code, result)
+        return result
+
+    def _fetch(self, code: str) -> CounterpartyStatus:
+        shared = self._get_shared(code)
+        if shared is not None:
+            return shared
+        status, data = self._pool.request("GET", "/counterparties/{}".format(quote(code)))
+        if status == 404:
+            result = CounterpartyStatus(code=code, registered=False, active=False)
+        elif status == 200:
+            result = self._status(code, self._loads(data))
+        else:
+            raise CounterpartyError("Registry responded with status {}".format(status))
+        self._cache_status(result)
+        return result
+
+    def _fetch_many(self, codes: list) -> dict:
+        body = json.dumps({"codes": codes}).encode()
+        status, data = self._pool.request("POST", "/counterparties/bulk", body=body)
+        if status != 200:
+            raise CounterpartyError("Registry responded with status {}".format(status))
+        results = self._loads(data)
+        results = results.get("results") if isinstance(results, dict) else None
+        if not isinstance(results, dict):
+            raise CounterpartyError("Invalid registry response")
+        statuses = {}
+        for code in codes:
+            data = results.get(code)
+            statuses[code] = (self._status(code, data) if data is not None
+                              else CounterpartyStatus(code=code, registered=False, active=False))
+            self._cache.set(code, statuses[code])
+        if self._shared_cache is not None:
+            self._shared_cache.set_many({code: [status.registered, status.active] for code, status in statuses.items()})
+        return statuses
+
+    def status(self, code: str) -> CounterpartyStatus:
+        result = self._cache.get(code)
+        if result is None:
+            result = self._single_flight.do(code, lambda: self._fetch(code))
+        return result
+
+    def status_many(self, codes) -> dict:
+        """
+        Returns dict code -> CounterpartyStatus. Codes which are not cached are requested in bulk.
+        """
+        result = {}
+        missing = []
+        for code in dict.fromkeys(codes):
+            cached = self._cache.get(code)
+            if cached is None:
+                missing.append(code)
+            else:
+                result[code] = cached
+        if missing and self._shared_cache is not None:
+            for code, cached in self._shared_cache.get_many(missing).items():
+                result[code] = CounterpartyStatus(code, *cached)
+                self._cache.set(code, result[code])
+            missing = [code for code in missing if code not in result]
+        for start in range(0, len(missing), BULK_CHUNK_SIZE):
+            result.update(self._fetch_many(missing[start:start + BULK_CHUNK_SIZE]))
+        return result
+
+    def is_active(self, code: str) -> bool:
+        status = self.status(code)
+        return status.registered and status.active
+
+    def clear_cache(self):
+        self._cache.clear()
+
+    def close(self):
+        self._pool.close()
+
+### DEFAULT CLIENT ###
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client() -> typing.Optional[CounterpartyClient]:
+    """
+    Returns client configured with BANK_REQUISITES_COUNTERPARTY_* settings
+    or None if BANK_REQUISITES_COUNTERPARTY_BASE_URL is not set.
+    """
+    global _client
+    from .conf import get_setting
+    from .result_cache import COUNTERPARTY_NAMESPACE, get_shared_cache
+
+    if _client is None:
+        base_url = get_setting("COUNTERPARTY_BASE_URL")
+        if not base_url:
+            return None
+        with _client_lock:
+            if _client is None:
+                _client = CounterpartyClient(base_url=base_url,
+                                             timeout=get_setting("COUNTERPARTY_TIMEOUT"),
+                                             pool_size=get_setting("COUNTERPARTY_POOL_SIZE"),
+                                             cache_size=get_setting("COUNTERPARTY_CACHE_SIZE"),
+                                             cache_ttl=get_setting("COUNTERPARTY_CACHE_TTL"),
+                                             shared_cache=get_shared_cache(
+                                                 COUNTERPARTY_NAMESPACE,
+                                                 timeout=get_setting("COUNTERPARTY_CACHE_TTL")))
+    return _client
+
+def reset_client():
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+
+def _reset_client_on_setting_changed(setting, **kwargs):
+    from .conf import SETTINGS_PREFIX
+
+    if setting.startswith((SETTINGS_PREFIX + "COUNTERPARTY", SETTINGS_PREFIX + "RESULT_CACHE")):
+        reset_client()
+
+try:
+    from django.core.signals import setting_changed
+except ImportError:  # pragma: no cover
+    pass
+else:
+    setting_changed.connect(_reset_client_on_setting_changed)
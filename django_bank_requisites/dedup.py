@@ -0,0 +1,219 @@
+from array import array
+from bisect import bisect_left
+
+from .base_validators import is_code_structure_valid
+from .utils import DB_CHUNK_SIZE
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+# Max number of digits which always fits into unsigned 64-bit integer
+MAX_PACKED_DIGITS = 19
+
+IN_FILE_DUPLICATE = "duplicate"
+ALREADY_EXISTS = "exists"
+
+### HELPER FUNCS ###
+
+def _pack_code(code: str) -> tuple:
+    """
+    Packs code into (bucket, unsigned 64-bit integer).
+    Bucket consists of code length (so codes with leading zeroes don't collide)
+    and leading digits which don't fit into 64 bits (first digit of 20-digit RS or KS).
+    """
+    if not code or not is_code_structure_valid(code):
+        raise ValueError("Code must contain only ASCII digits: {!r}".format(code))
+    prefix_length = max(0, len(code) - MAX_PACKED_DIGITS)
+    return (len(code), code[:prefix_length]), int(code[prefix_length:])
+
+def _sorted_unique(values: array) -> array:
+    if np is not None:
+        result = array("Q")
+        result.frombytes(np.unique(np.frombuffer(values, dtype=np.uint64)).tobytes())
+        return result
+    return array("Q", sorted(set(values)))
+
+def _contains(values: array, value: int) -> bool:
+    position = bisect_left(values, value)
+    return position < len(values) and values[position] == value
+
+def _difference(values: array, runs: list) -> array:
+    """
+    Returns sorted values which are not in any of sorted runs.
+    """
+    if np is not None:
+        values = np.frombuffer(values, dtype=np.uint64)
+        for run in runs:
+            stored = np.frombuffer(run, dtype=np.uint64)
+            if len(stored) and len(values):
+                found = np.minimum(np.searchsorted(stored, values), len(stored) - 1)
+                values = values[stored[found] != values]
+        result = array("Q")
+        result.frombytes(values.tobytes())
+        return result
+    return array("Q", (value for value in values if not any(_contains(run, value) for run in runs)))
+
+### INDEX ###
+
+class CodeIndex:
+    """
+    Compact in-memory set of numeric codes (INN, RS, KS, ...).
+
+    Codes are stored as sorted arrays of unsigned 64-bit integers (8 bytes per code
+    instead of ~70 bytes for str in a set) and looked up with binary search.
+    Added codes are buffered and sorted into a new array (run) on the next lookup.
+    Runs of similar size are merged (like in LSM trees), so there are at most
+    log2(N) runs and loading the index in portions stays cheap.
+    Uses numpy for sorting and bulk lookups if it is installed.
+    """
+
+    def __init__(self, codes=()):
+        self._buckets = {}
+        self._pending = {}
+        self.update(codes)
+
+    @classmethod
+    def from_queryset(cls, queryset, field: str):
+        """
+        Builds index from values of the field, e.g. CodeIndex.from_queryset(MyModel.objects.all(), "inn").
+        Empty values are skipped.
+        """
+        index = cls()
+        values = queryset.values_list(field, flat=True).iterator(chunk_size=DB_CHUNK_SIZE)
+        index.update(value for value in values if value)
+        return index
+
+    def add(self, code: str):
+        bucket, value = _pack_code(code)
+        self._pending.setdefault(bucket, array("Q")).append(value)
+
+    def update(self, codes):
+        for code in codes:
+            self.add(code)
+
+    def _merge(self):
+        for bucket, values in self._pending.items():
+            runs = self._buckets.setdefault(bucket, [])
+            # Runs never intersect, so every code is stored once
+            runs.append(_difference(_sorted_unique(values), runs))
+            while len(runs) > 1 and len(runs[-2]) <= 2 * len(runs[-1]):
+                last = runs.pop()
+                runs[-1].extend(last)
+                runs[-1] = _sorted_unique(runs[-1])
+        self._pending = {}
+
+    def __contains__(self, code: str) -> bool:
+        if self._pending:
+            self._merge()
+        try:
+            bucket, value = _pack_code(code)
+        except ValueError:
+            return False
+        return any(_contains(values, value) for values in self._buckets.get(bucket, ()))
+
+    def contains_many(self, codes) -> list:
+        """
+        Returns list of bools, whether each code is in index.
+        """
+        codes = list(codes)
+        if np is None:
+            return [code in self for code in codes]
+        if self._pending:
+            self._merge()
+        result = [False] * len(codes)
+        grouped = {}
+        for i, code in enumerate(codes):
+            try:
+                bucket, value = _pack_code(code)
+            except ValueError:
+                continue
+            if bucket in self._buckets:
+                grouped.setdefault(bucket, ([], []))
+                grouped[bucket][0].append(i)
+                grouped[bucket][1].append(value)
+        for bucket, (positions, values) in grouped.items():
+            values = np.array(values, dtype=np.uint64)
+            found_mask = np.zeros(len(values), dtype=bool)
+            for run in self._buckets[bucket]:
+                stored = np.frombuffer(run, dtype=np.uint64)
+                if not len(stored):
+                    continue
+                found = np.minimum(np.searchsorted(stored, values), len(stored) - 1)
+                found_mask |= stored[found] == values
+            for position, is_found in zip(positions, found_mask.tolist()):
+                result[position] = is_found
+        return result
+
+    def __len__(self) -> int:
+        if self._pending:
+            self._merge()
+        return sum(len(run) for runs in self._buckets.values() for run in runs)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory used by stored codes.
+        """
+        stored = sum(run.itemsize * len(run) for runs in self._buckets.values() for run in runs)
+        return stored + sum(values.itemsize * len(values) for values in self._pending.values())
+
+### IMPORT HELPERS ###
+
+class DuplicateFinder:
+    """
+    Finds duplicated codes in records one by one, so it can be used while a file is streamed (see find_duplicates).
+    """
+
+    def __init__(self, fields: tuple = ("inn", "rs"), existing: dict = None):
+        self.fields = fields
+        self.existing = existing or {}
+        self._seen = {field: CodeIndex() for field in fields}
+        # Codes of the current file are added to index in batches,
+        # so lookups don't sort arrays after every row
+        self._batch = {field: set() for field in fields}
+        # Invalid (non-digit) codes can't be stored in index
+        self._invalid = {field: set() for field in fields}
+
+    def check(self, record) -> dict:
+        """
+        Returns dict field -> IN_FILE_DUPLICATE or ALREADY_EXISTS of duplicated codes of the record.
+        """
+        result = {}
+        for field in self.fields:
+            code = record.get(field) if isinstance(record, dict) else getattr(record, field, None)
+            if not code:
+                continue
+            if field in self.existing and code in self.existing[field]:
+                result[field] = ALREADY_EXISTS
+            elif code in self._batch[field] or code in self._invalid[field] or code in self._seen[field]:
+                result[field] = IN_FILE_DUPLICATE
+            elif not is_code_structure_valid(code):
+                self._invalid[field].add(code)
+            else:
+                self._batch[field].add(code)
+                if len(self._batch[field]) >= DB_CHUNK_SIZE:
+                    self._seen[field].update(self._batch[field])
+                    self._batch[field] = set()
+        return result
+
+def find_duplicates(records, fields: tuple = ("inn", "rs"), existing: dict = None) -> dict:
+    """
+    Finds duplicated codes in records (dicts or model instances) of an import file.
+
+    Params:
+            records: Iterable of dicts or BankDetailsUnvalidated/BankDetailsValidated instances
+            fields (tuple): Unique fields to check
+            existing (dict): Optional field -> CodeIndex of already stored codes
+                             (see CodeIndex.from_queryset)
+
+    Returns dict field -> {row index: IN_FILE_DUPLICATE or ALREADY_EXISTS}.
+    The first occurrence of a code in file is not a duplicate.
+    """
+    finder = DuplicateFinder(fields=fields, existing=existing)
+    result = {field: {} for field in fields}
+    for row, record in enumerate(records):
+        for field, status in finder.check(record).items():
+            result[field][row] = status
+    return result
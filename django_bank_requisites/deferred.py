@@ -0,0 +1,229 @@
+import copy
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+
+from django.core.exceptions import ValidationError
+from django.db import close_old_connections, connections, transaction
+
+from .conf import get_setting
+from .signals import bank_details_validated, bank_details_validation_failed
+
+PENDING = "pending"
+VALID = "valid"
+INVALID = "invalid"
+
+### HELPER FUNCS ###
+
+def _instance_key(instance) -> tuple:
+    return (instance._meta.label_lower, instance.pk)
+
+def run_validation(instance, validate_unique: bool = True) -> dict:
+    """
+    Runs full model validation of the instance.
+    Returns dict of errors (field -> list of messages), empty dict if instance is valid.
+    """
+    try:
+        instance.full_clean(validate_unique=validate_unique)
+    except ValidationError as e:
+        return e.message_dict
+    return {}
+
+def _run_validation_in_worker(instance, validate_unique: bool = True) -> dict:
+    """
+    Same as run_validation, but manages DB connections of the worker
+    like Django does for every request.
+    Module level function, so it can be pickled for process based pool.
+    """
+    close_old_connections()
+    try:
+        return run_validation(instance, validate_unique=validate_unique)
+    finally:
+        close_old_connections()
+
+def _init_process_worker():
+    """
+    Initializer of process based pool. Sets up Django in spawned workers
+    and drops DB connections inherited through fork: their sockets belong to the parent,
+    so they are forgotten without closing.
+    """
+    import django
+    django.setup()
+    for connection in connections.all():
+        connection.connection = None
+
+def _process_executor(max_workers: int, mp_context=None) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context, initializer=_init_process_worker)
+
+class _SyncExecutor:
+    """
+    Executor which runs jobs immediately in the caller thread.
+    Useful for tests and management commands.
+    """
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait=True):
+        pass
+
+EXECUTORS = {
+    "thread": ThreadPoolExecutor,
+    "process": _process_executor,
+    "sync": _SyncExecutor,
+}
+
+### POOL ###
+
+class DeferredValidationPool:
+    """
+    Local worker pool which validates already saved instances in background.
+
+    Instances are marked as pending when submitted. When validation is finished,
+    the result is recorded in the pool and bank_details_validated or
+    bank_details_validation_failed signal is sent.
+
+    Results are kept only in memory of the process and only for the last max_results
+    finished validations, older ones are evicted. To keep status, store it in signal receivers.
+
+    Params:
+            kind (str): "thread", "process" or "sync"
+            max_workers (int): Number of workers (ignored for "sync" pool)
+            validate_unique (bool): Whether to run uniqueness checks in background
+            max_results (int): Number of finished results kept in the pool
+            mp_context: multiprocessing context of "process" pool (e.g. multiprocessing.get_context("spawn"))
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: int = 4, validate_unique: bool = True,
+                 max_results: int = 10000, mp_context=None):
+        if kind not in EXECUTORS:
+            raise ValueError("Unknown pool kind '{}'. Choose one of: {}".format(kind, ", ".join(EXECUTORS)))
+        self.kind = kind
+        self.validate_unique = validate_unique
+        self.max_results = max_results
+        if kind == "sync":
+            self._executor = EXECUTORS[kind]()
+        elif kind == "process":
+            self._executor = EXECUTORS[kind](max_workers=max_workers, mp_context=mp_context)
+        else:
+            self._executor = EXECUTORS[kind](max_workers=max_workers)
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+        # Futures of pending validations and finished results by instance key
+        self._pending = {}
+        self._results = OrderedDict()
+        self._futures = set()
+
+    def submit(self, instance) -> Future:
+        """
+        Marks instance as pending and schedules its validation.
+        """
+        if instance.pk is None:
+            raise ValueError("Only saved instances can be validated in background.")
+        key = _instance_key(instance)
+        instance.validation_status = PENDING
+        # Validate a snapshot, so further changes of the instance don't affect the result
+        snapshot = copy.copy(instance)
+        func = run_validation if self.kind == "sync" else _run_validation_in_worker
+        future = self._executor.submit(func, snapshot, self.validate_unique)
+        with self._lock:
+            self._pending[key] = future
+            self._futures.add(future)
+        future.add_done_callback(lambda f: self._record(f, instance, key))
+        return future
+
+    def _record(self, future, instance, key):
+        try:
+            errors = future.result()
+        except Exception as e:
+            errors = {"__all__": [str(e)]}
+        status = INVALID if errors else VALID
+        with self._lock:
+            # Don't overwrite result of a newer submission of the same instance
+            if self._pending.get(key) is future:
+                del self._pending[key]
+                self._results.pop(key, None)
+                self._results[key] = (status, errors)
+                while len(self._results) > self.max_results:
+                    self._results.popitem(last=False)
+        instance.validation_status = status
+        signal = bank_details_validation_failed if errors else bank_details_validated
+        try:
+            signal.send(sender=type(instance), instance=instance, errors=errors)
+        finally:
+            with self._lock:
+                self._futures.discard(future)
+                self._done.notify_all()
+
+    def status(self, instance):
+        """
+        Returns validation status of the instance (pending, valid, invalid)
+        or None if instance was never submitted or its result was evicted.
+        """
+        key = _instance_key(instance)
+        with self._lock:
+            if key in self._pending:
+                return PENDING
+            return self._results.get(key, (None,))[0]
+
+    def errors(self, instance) -> dict:
+        """
+        Returns recorded validation errors of the instance (empty dict while validation is pending).
+        """
+        with self._lock:
+            if _instance_key(instance) in self._pending:
+                return {}
+            return self._results.get(_instance_key(instance), (None, {}))[1]
+
+    def wait(self, timeout=None):
+        """
+        Waits until all submitted validations are finished and recorded.
+        Returns False if timeout expired.
+        """
+        with self._lock:
+            return self._done.wait_for(lambda: not self._futures, timeout=timeout)
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+def get_default_pool() -> DeferredValidationPool:
+    """
+    Returns pool configured by BANK_REQUISITES_DEFERRED_* settings.
+    The pool is created on first use.
+    """
+    global _default_pool
+    if _default_pool is None:
+        with _default_pool_lock:
+            if _default_pool is None:
+                _default_pool = DeferredValidationPool(
+                    kind=get_setting("DEFERRED_POOL"),
+                    max_workers=get_setting("DEFERRED_MAX_WORKERS"),
+                    validate_unique=get_setting("DEFERRED_VALIDATE_UNIQUE"),
+                    max_results=get_setting("DEFERRED_MAX_RESULTS"),
+                )
+    return _default_pool
+
+def set_default_pool(pool):
+    """
+    Replaces default pool (e.g. in tests). Previous pool is shut down.
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is not None and _default_pool is not pool:
+            _default_pool.shutdown(wait=True)
+        _default_pool = pool
+
+def defer_validation(instance, pool=None):
+    """
+    Schedules background validation of the instance after current transaction commits.
+    """
+    instance.validation_status = PENDING
+    transaction.on_commit(lambda: (pool or get_default_pool()).submit(instance))
@@ -2,6 +2,10 @@ from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 
 from .base_validators import *
+from .bik_directory import bik_directory
+from .counterparty import CounterpartyError, get_client
+from .errors import ErrorCode
+from .profiling import profiled
 
 error_messages = {
     "length": _("Invalid code length."),
@@ -10,8 +14,29 @@ error_messages = {
     "check_num_bik": _("Checknum calculated incorrectly. Enter correct code or check BIK."),
     "ks_last_3": _("Last 3 digits of the KS must match last 3 digits of the BIK."),
     "ks_first_3": _("First 3 digits of the KS must match sequence '301'."),
+    "not_registered": _("Organization with this code is not registered in the tax registry."),
+    "inactive": _("Organization with this code is not active in the tax registry."),
+    "bik_not_found": _("Bank with this BIK is not in the BIK directory."),
+    "ks_not_found": _("KS is not a correspondent account of the bank with this BIK."),
 }
 
+# ErrorCode -> (key of error_messages, code of ValidationError)
+ERROR_CODES = {
+    ErrorCode.LENGTH: ("length", "invalid_length"),
+    ErrorCode.STRUCTURE: ("structure", "invalid_structure"),
+    ErrorCode.CHECK_NUM: ("check_num", "invalid_check_num"),
+    ErrorCode.CHECK_NUM_BIK: ("check_num_bik", "invalid_check_num_or_bik"),
+    ErrorCode.KS_LAST_3: ("ks_last_3", "invalid_ks"),
+    ErrorCode.KS_FIRST_3: ("ks_first_3", "invalid_ks"),
+}
+
+def validation_error(error_code: ErrorCode) -> ValidationError:
+    """
+    Returns ValidationError with message and code of single ErrorCode.
+    """
+    key, code = ERROR_CODES[error_code]
+    return ValidationError(message=error_messages[key], code=code)
+
 def validate_length_and_structure(value, length: tuple):
     """
     Validates code length and structure.
@@ -24,6 +49,7 @@ def validate_length_and_structure(value, length: tuple):
     if errors:
         raise ValidationError(errors)
     
+@profiled
 def validate_inn(value):
     """
     Validates INN length, structure and check nums.
@@ -32,12 +58,14 @@ def validate_inn(value):
     if not is_inn_check_num_valid(inn=value):
         raise ValidationError(message=error_messages["check_num"], code="invalid_check_num")
 
+@profiled
 def validate_kpp(value):
     """
     Validates KPP length and structure.
     """
     validate_length_and_structure(value=value, length=(9,))
 
+@profiled
 def validate_ogrn(value):
     """
     Validates INN length, structure and check nums.
@@ -46,22 +74,56 @@ def validate_ogrn(value):
     if not is_ogrn_check_num_valid(ogrn=value):
         raise ValidationError(message=error_messages["check_num"], code="invalid_check_num")
 
+@profiled
 def validate_bik(value):
     """
     Validates BIK length and structure.
     """
     validate_length_and_structure(value=value, length=(9,))
 
+@profiled
 def validate_rs(value):
     """
     Validates RS (расчетный счет) length and structure.
     """
     validate_length_and_structure(value=value, length=(20,))
 
+@profiled
 def validate_ks(value):
     """
     Validates KS (корреспондентский счет) length and structure.
     """
     validate_length_and_structure(value=value, length=(20,))
     if not is_ks_3_first_digits_valid(ks=value):
-        raise ValidationError(message=error_messages["ks_first_3"], code="invalid_ks")
\ No newline at end of file
+        raise ValidationError(message=error_messages["ks_first_3"], code="invalid_ks")
+
+@profiled
+def validate_counterparty(value):
+    """
+    Validates that INN or OGRN is registered and active in the tax registry (see counterparty.py).
+    The check is skipped if the registry is not configured or unavailable.
+    """
+    client = get_client()
+    if client is None:
+        return
+    try:
+        status = client.status(value)
+    except CounterpartyError:
+        return
+    if not status.registered:
+        raise ValidationError(message=error_messages["not_registered"], code="not_registered")
+    if not status.active:
+        raise ValidationError(message=error_messages["inactive"], code="inactive")
+
+def validate_bank_directory(bik: str, ks: str = ""):
+    """
+    Validates that BIK is in the BIK directory (see bik_directory.py)
+    and KS is a correspondent account of the bank. The check is skipped if the directory is not loaded.
+    """
+    directory = bik_directory.directory
+    if not len(directory):
+        return
+    if bik not in directory:
+        raise ValidationError({"bik": ValidationError(message=error_messages["bik_not_found"], code="bik_not_found")})
+    if ks and not directory.is_ks_valid(ks, bik):
+        raise ValidationError({"ks": ValidationError(message=error_messages["ks_not_found"], code="ks_not_found")})
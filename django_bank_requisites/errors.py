@@ -0,0 +1,326 @@
+import enum
+import itertools
+import typing
+from array import array
+
+from .base_validators import (is_code_length_valid,
+                              is_code_structure_valid,
+                              is_inn_check_num_valid,
+                              is_ogrn_check_num_valid,
+                              is_bik_valid,
+                              is_bank_account_code_check_num_valid,
+                              is_ks_3_last_digits_valid,
+                              is_ks_3_first_digits_valid)
+
+class ErrorCode(enum.IntFlag):
+    """
+    Stable integer codes of validation failures. Values never change,
+    so they can be stored in files and databases.
+    Names in lower case are keys of django_validators.error_messages.
+    """
+
+    LENGTH = 1
+    STRUCTURE = 2
+    CHECK_NUM = 4
+    CHECK_NUM_BIK = 8
+    KS_LAST_3 = 16
+    KS_FIRST_3 = 32
+
+    @property
+    def keys(self) -> list:
+        """
+        Keys of error_messages for all failures in this value.
+        """
+        return [code.name.lower() for code in ErrorCode if code in self]
+
+OK = ErrorCode(0)
+# Number of bits for errors of one field in packed row
+BITS_PER_FIELD = 6
+FIELDS = ("inn", "kpp", "ogrn", "bik", "rs", "ks")
+# Number of records validated with one batch call of validation backend (see records_errors)
+CHUNK_SIZE = 1000
+FIELD_LENGTHS = {
+    "inn": (10, 12),
+    "kpp": (9,),
+    "ogrn": (13, 15),
+    "bik": (9,),
+    "rs": (20,),
+    "ks": (20,),
+}
+# Validation modes: report all errors or stop at the first one
+COLLECT_ALL = "collect_all"
+FAIL_FAST = "fail_fast"
+VALIDATION_MODES = (COLLECT_ALL, FAIL_FAST)
+
+### HELPER FUNCS ###
+
+def _length_and_structure(code: str, length: tuple) -> ErrorCode:
+    errors = OK
+    if not is_code_length_valid(code=code, length=length):
+        errors |= ErrorCode.LENGTH
+    if not is_code_structure_valid(code=code):
+        errors |= ErrorCode.STRUCTURE
+    return errors
+
+### ERROR CODES OF FIELDS ###
+
+def inn_errors(inn: str) -> ErrorCode:
+    errors = _length_and_structure(inn, FIELD_LENGTHS["inn"])
+    if not errors and not is_inn_check_num_valid(inn=inn):
+        errors |= ErrorCode.CHECK_NUM
+    return errors
+
+def kpp_errors(kpp: str) -> ErrorCode:
+    return _length_and_structure(kpp, FIELD_LENGTHS["kpp"])
+
+def ogrn_errors(ogrn: str) -> ErrorCode:
+    errors = _length_and_structure(ogrn, FIELD_LENGTHS["ogrn"])
+    if not errors and not is_ogrn_check_num_valid(ogrn=ogrn):
+        errors |= ErrorCode.CHECK_NUM
+    return errors
+
+def bik_errors(bik: str) -> ErrorCode:
+    return _length_and_structure(bik, FIELD_LENGTHS["bik"])
+
+def rs_errors(rs: str, bik: str) -> ErrorCode:
+    """
+    RS check num is validated only if BIK is valid (like in BankDetailsValidated.clean).
+    """
+    errors = _length_and_structure(rs, FIELD_LENGTHS["rs"])
+    if (not errors and is_bik_valid(bik=bik) and
+        not is_bank_account_code_check_num_valid(code=rs, bik_digits=bik[-3:])):
+        errors |= ErrorCode.CHECK_NUM_BIK
+    return errors
+
+def ks_errors(ks: str, bik: str) -> ErrorCode:
+    """
+    Mirrors validate_ks field validator and KS checks of BankDetailsValidated.clean.
+    """
+    errors = _length_and_structure(ks, FIELD_LENGTHS["ks"])
+    if not errors and not is_ks_3_first_digits_valid(ks=ks):
+        errors |= ErrorCode.KS_FIRST_3
+    if not is_bik_valid(bik=bik):
+        return errors
+    if not is_ks_3_last_digits_valid(ks=ks, bik=bik):
+        errors |= ErrorCode.KS_LAST_3
+    elif (not errors & (ErrorCode.LENGTH | ErrorCode.STRUCTURE) and
+          not is_bank_account_code_check_num_valid(code=ks, bik_digits="0" + bik[4:6])):
+        errors |= ErrorCode.CHECK_NUM_BIK
+    return errors
+
+def _record_values(record: dict) -> dict:
+    """
+    Values of fields present in the record, KS may be blank.
+    """
+    return {field: str(record[field]) for field in FIELDS
+            if record.get(field) is not None and not (field == "ks" and record[field] == "")}
+
+def first_error(record: dict) -> typing.Optional[tuple]:
+    """
+    Returns (field, ErrorCode) of the first failure of the record or None.
+    Checks run cheapest first over all fields: length, digits, KS prefix and suffix, check nums.
+    """
+    values = _record_values(record)
+    for field, value in values.items():
+        if not is_code_length_valid(code=value, length=FIELD_LENGTHS[field]):
+            return field, ErrorCode.LENGTH
+    for field, value in values.items():
+        if not is_code_structure_valid(code=value):
+            return field, ErrorCode.STRUCTURE
+    # BIK is valid here if present
+    bik = values.get("bik")
+    if "ks" in values:
+        if not is_ks_3_first_digits_valid(ks=values["ks"]):
+            return "ks", ErrorCode.KS_FIRST_3
+        if bik and not is_ks_3_last_digits_valid(ks=values["ks"], bik=bik):
+            return "ks", ErrorCode.KS_LAST_3
+    if "inn" in values and not is_inn_check_num_valid(inn=values["inn"]):
+        return "inn", ErrorCode.CHECK_NUM
+    if "ogrn" in values and not is_ogrn_check_num_valid(ogrn=values["ogrn"]):
+        return "ogrn", ErrorCode.CHECK_NUM
+    if bik and "rs" in values and not is_bank_account_code_check_num_valid(code=values["rs"], bik_digits=bik[-3:]):
+        return "rs", ErrorCode.CHECK_NUM_BIK
+    if (bik and "ks" in values and
+        not is_bank_account_code_check_num_valid(code=values["ks"], bik_digits="0" + bik[4:6])):
+        return "ks", ErrorCode.CHECK_NUM_BIK
+    return None
+
+def record_errors(record: dict, fail_fast: bool = False) -> dict:
+    """
+    Returns dict field -> ErrorCode for failed fields of the record.
+    Only fields present in the record are validated, KS may be blank.
+    With fail_fast=True only the first failure is returned (see first_error).
+    """
+    if fail_fast:
+        error = first_error(record)
+        return dict([error]) if error else {}
+    result = {}
+    bik = record.get("bik") or ""
+    for field, value in _record_values(record).items():
+        if field == "rs":
+            errors = rs_errors(value, bik)
+        elif field == "ks":
+            errors = ks_errors(value, bik)
+        else:
+            errors = FIELD_ERRORS[field](value)
+        if errors:
+            result[field] = errors
+    return result
+
+def records_errors(records: list, fail_fast: bool = False, backends=None) -> list:
+    """
+    Batch counterpart of record_errors(): returns list of errors of records.
+    Every field is checked with one backends.validate_many() call for all records,
+    error codes are computed only for rejected records.
+    backends are thresholds of backends.select_backend(), by default from settings.
+    """
+    from .backends import BANK_ACCOUNT_FIELDS, validate_many
+
+    values = [_record_values(record) for record in records]
+    valid = [True] * len(records)
+    for field in FIELDS:
+        rows = [row for row, row_values in enumerate(values) if field in row_values]
+        if not rows:
+            continue
+        codes = [values[row][field] for row in rows]
+        biks = ([str(records[row].get("bik") or "") for row in rows]
+                if field in BANK_ACCOUNT_FIELDS else None)
+        for row, is_valid in zip(rows, validate_many(field, codes, biks, backends=backends)):
+            if not is_valid:
+                valid[row] = False
+    return [{} if is_valid else record_errors(record, fail_fast=fail_fast)
+            for record, is_valid in zip(records, valid)]
+
+def parties_errors(documents: list, fail_fast: bool = False) -> list:
+    """
+    Validates parties of payment documents in batch (see records_errors).
+    documents is a list of dicts party -> record, returns list of dicts party -> errors of failed parties.
+    """
+    results = iter(records_errors([record for parties in documents for record in parties.values()],
+                                  fail_fast=fail_fast))
+    documents_errors = []
+    for parties in documents:
+        errors = {}
+        for party in parties:
+            party_errors = next(results)
+            if party_errors:
+                errors[party] = party_errors
+        documents_errors.append(errors)
+    return documents_errors
+
+def iter_chunks(items, size: int = CHUNK_SIZE):
+    """
+    Yields lists of up to size items.
+    """
+    items = iter(items)
+    while True:
+        chunk = list(itertools.islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+FIELD_ERRORS = {
+    "inn": inn_errors,
+    "kpp": kpp_errors,
+    "ogrn": ogrn_errors,
+    "bik": bik_errors,
+}
+
+### REPORT ###
+
+class ErrorReport:
+    """
+    Compact report of failures for bulk runs.
+
+    Errors of all fields of a row are packed into one 64-bit integer
+    (6 bits per field), only failed rows are stored. Messages are rendered
+    only at display time with render() or iter_messages().
+    """
+
+    def __init__(self, fields: tuple = FIELDS):
+        if len(fields) * BITS_PER_FIELD > 64:
+            raise ValueError("Too many fields for packed report.")
+        self.fields = tuple(fields)
+        self.rows = array("Q")
+        self.flags = array("Q")
+        self.total = 0
+
+    def _pack(self, errors: dict) -> int:
+        packed = 0
+        for i, field in enumerate(self.fields):
+            packed |= int(errors.get(field, OK)) << (i * BITS_PER_FIELD)
+        return packed
+
+    def _unpack(self, packed: int) -> dict:
+        mask = (1 << BITS_PER_FIELD) - 1
+        return {field: ErrorCode((packed >> (i * BITS_PER_FIELD)) & mask)
+                for i, field in enumerate(self.fields)
+                if (packed >> (i * BITS_PER_FIELD)) & mask}
+
+    def add(self, row: int, errors: dict):
+        """
+        Adds errors (dict field -> ErrorCode) of the row. Rows must be added in ascending order.
+        """
+        self.total += 1
+        packed = self._pack(errors)
+        if packed:
+            self.rows.append(row)
+            self.flags.append(packed)
+
+    def add_record(self, row: int, record: dict, fail_fast: bool = False):
+        self.add(row, record_errors(record, fail_fast=fail_fast))
+
+    @classmethod
+    def from_records(cls, records, fields: tuple = FIELDS, fail_fast: bool = False):
+        """
+        Builds report of records validated in chunks (see records_errors).
+        """
+        report = cls(fields=fields)
+        row = 0
+        for chunk in iter_chunks(records):
+            for errors in records_errors(chunk, fail_fast=fail_fast):
+                report.add(row, errors)
+                row += 1
+        return report
+
+    def __len__(self) -> int:
+        """
+        Number of failed rows.
+        """
+        return len(self.rows)
+
+    def __iter__(self):
+        """
+        Yields (row, dict field -> ErrorCode) for failed rows.
+        """
+        for row, packed in zip(self.rows, self.flags):
+            yield row, self._unpack(packed)
+
+    def counts(self) -> dict:
+        """
+        Returns dict (field, ErrorCode) -> number of rows with this failure.
+        """
+        result = {}
+        for _, errors in self:
+            for field, codes in errors.items():
+                for code in ErrorCode:
+                    if code in codes:
+                        result[(field, code)] = result.get((field, code), 0) + 1
+        return result
+
+    @staticmethod
+    def render(errors: dict, messages: dict = None) -> dict:
+        """
+        Renders errors of a row into dict field -> list of messages.
+        By default messages are django_validators.error_messages (translated when rendered).
+        """
+        if messages is None:
+            from .django_validators import error_messages as messages
+        return {field: [str(messages[key]) for key in codes.keys] for field, codes in errors.items()}
+
+    def iter_messages(self, messages: dict = None):
+        """
+        Yields (row, dict field -> list of messages) for failed rows.
+        """
+        for row, errors in self:
+            yield row, self.render(errors, messages=messages)
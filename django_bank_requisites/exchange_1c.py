@@ -0,0 +1,126 @@
+import typing
+
+from .dedup import DuplicateFinder
+from .errors import iter_chunks, parties_errors
+from .utils import EMPTY_VALUES
+
+HEADER = "1CClientBankExchange"
+DOCUMENT_START = "СекцияДокумент"
+DOCUMENT_END = "КонецДокумента"
+ENCODING_KEY = "Кодировка"
+DEFAULT_ENCODING = "cp1251"
+# Values of Кодировка header key
+ENCODINGS = {
+    "Windows": "cp1251",
+    "DOS": "cp866",
+}
+PARTIES = {
+    "payer": "Плательщик",
+    "payee": "Получатель",
+}
+# Keys of party fields without party prefix. The first key which is present in document is used:
+# РасчСчет is the account in the bank when payment goes through another bank's correspondent account
+PARTY_KEYS = {
+    "inn": ("ИНН",),
+    "kpp": ("КПП",),
+    "rs": ("РасчСчет", "Счет"),
+    "bik": ("БИК",),
+    "ks": ("Корсчет", "КоррСчет"),
+}
+
+class DocumentResult(typing.NamedTuple):
+    # Position of the document in the file (0-based)
+    index: int
+    # Line number of СекцияДокумент
+    line: int
+    # Document type, e.g. "Платежное поручение"
+    kind: str
+    number: str
+    # dict party ("payer" or "payee") -> dict field -> ErrorCode, only failed fields
+    errors: dict
+    # The number is repeated in the file (see dedup.DuplicateFinder)
+    duplicate: bool = False
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+### HELPER FUNCS ###
+
+def _detect_encoding(line: bytes) -> typing.Optional[str]:
+    for encoding in set(ENCODINGS.values()):
+        prefix = (ENCODING_KEY + "=").encode(encoding)
+        if line.startswith(prefix):
+            return ENCODINGS.get(line[len(prefix):].strip().decode("ascii", errors="ignore"))
+    return None
+
+def _iter_lines(stream, encoding: str):
+    """
+    Yields (line number, decoded line). If encoding is None, it is taken from Кодировка header key.
+    """
+    detect = encoding is None
+    encoding = encoding or DEFAULT_ENCODING
+    for line_num, line in enumerate(stream, start=1):
+        if isinstance(line, bytes):
+            if detect and line_num < 10:
+                encoding = _detect_encoding(line) or encoding
+            line = line.decode(encoding)
+        yield line_num, line.rstrip("\r\n")
+
+def _party_record(document: dict, prefix: str) -> dict:
+    record = {}
+    for field, keys in PARTY_KEYS.items():
+        for key in keys:
+            value = document.get(prefix + key)
+            if value is not None:
+                if value.strip() not in EMPTY_VALUES:
+                    record[field] = value.strip()
+                break
+    return record
+
+### PARSER ###
+
+def iter_1c_documents(stream, encoding: str = None):
+    """
+    Parses 1CClientBankExchange file (binary or text stream) line by line.
+    Yields (line number, document type, dict key -> value) for every СекцияДокумент block,
+    only one document is kept in memory.
+    Raises ValueError if the file is not 1C exchange file or a document is not closed.
+    """
+    document = None
+    start_line = kind = None
+    for line_num, line in _iter_lines(stream, encoding):
+        if line_num == 1:
+            if line.lstrip("\ufeff").strip() != HEADER:
+                raise ValueError("Not a {} file".format(HEADER))
+            continue
+        key, _, value = line.partition("=")
+        if key == DOCUMENT_START:
+            if document is not None:
+                raise ValueError("Document at line {} is not closed".format(start_line))
+            document, start_line, kind = {}, line_num, value
+        elif key == DOCUMENT_END:
+            if document is None:
+                raise ValueError("{} without {} at line {}".format(DOCUMENT_END, DOCUMENT_START, line_num))
+            yield start_line, kind, document
+            document = None
+        elif document is not None and value:
+            document[key] = value
+    if document is not None:
+        raise ValueError("Document at line {} is not closed".format(start_line))
+
+def validate_1c_documents(stream, encoding: str = None):
+    """
+    Validates INN, KPP, account, BIK and correspondent account of payer and payee of every document.
+    Yields DocumentResult. Parties of a chunk of documents are validated in batch (see errors.records_errors).
+    Documents with a number repeated in the file are marked as duplicate.
+    """
+    finder = DuplicateFinder(fields=("number",))
+    documents = enumerate(iter_1c_documents(stream, encoding=encoding))
+    for chunk in iter_chunks(documents):
+        parties = [{party: _party_record(document, prefix) for party, prefix in PARTIES.items()}
+                   for _, (_, _, document) in chunk]
+        for (index, (line, kind, document)), errors in zip(chunk, parties_errors(parties)):
+            number = document.get("Номер", "")
+            yield DocumentResult(index=index, line=line, kind=kind, number=number, errors=errors,
+                                 duplicate=bool(finder.check({"number": number})))
@@ -0,0 +1,36 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from django_bank_requisites.bloom import build_unique_filter
+from django_bank_requisites.conf import get_setting
+
+class Command(BaseCommand):
+    help = "Builds bloom filter of unique bank details fields (inn and rs by default) of the model."
+
+    def add_arguments(self, parser):
+        parser.add_argument("model", help="Model in app_label.ModelName format.")
+        parser.add_argument("--fields", nargs="+", default=["inn", "rs"], help="Unique fields to add to the filter.")
+        parser.add_argument("--capacity", type=int, default=None,
+                            help="Expected number of values. By default twice the number of stored values.")
+        parser.add_argument("--error-rate", type=float, default=0.01, help="False positive probability.")
+        parser.add_argument("--output", default=None,
+                            help="Output file. By default BANK_REQUISITES_BLOOM_FILTER_PATH setting.")
+
+    def handle(self, *args, **options):
+        output = options["output"] or get_setting("BLOOM_FILTER_PATH")
+        if not output:
+            raise CommandError("Set --output or BANK_REQUISITES_BLOOM_FILTER_PATH setting.")
+        try:
+            model = apps.get_model(options["model"])
+        except (LookupError, ValueError) as e:
+            raise CommandError(str(e))
+        try:
+            bloom_filter = build_unique_filter(model._default_manager.all(),
+                                               fields=tuple(options["fields"]),
+                                               capacity=options["capacity"],
+                                               error_rate=options["error_rate"])
+        except ValueError as e:
+            raise CommandError(str(e))
+        bloom_filter.save(output)
+        self.stdout.write("Bloom filter with {} values ({} bytes) is written to {}".format(
+            bloom_filter.count, len(bloom_filter.bits), output))
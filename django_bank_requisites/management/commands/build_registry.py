@@ -0,0 +1,31 @@
+from xml.etree.ElementTree import ParseError
+
+from django.apps import apps
+from django.core.exceptions import FieldError
+from django.core.management.base import BaseCommand, CommandError
+
+from django_bank_requisites.bik_directory import BikDirectory
+from django_bank_requisites.mapped_registry import write_bik_registry, write_inn_registry
+from django_bank_requisites.utils import DB_CHUNK_SIZE
+
+class Command(BaseCommand):
+    help = "Builds memory-mapped registry file: BIK directory from ED807 file or INNs of the model."
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=["bik", "inn"], help="Registry kind.")
+        parser.add_argument("source",
+                            help="ED807 file for bik registry or model in app_label.ModelName format for inn registry.")
+        parser.add_argument("--field", default="inn", help="Model field with INN.")
+        parser.add_argument("--output", required=True, help="Output file.")
+
+    def handle(self, *args, **options):
+        try:
+            if options["kind"] == "bik":
+                count = write_bik_registry(options["output"], BikDirectory.from_ed807(options["source"]))
+            else:
+                model = apps.get_model(options["source"])
+                inns = model._default_manager.values_list(options["field"], flat=True).iterator(chunk_size=DB_CHUNK_SIZE)
+                count = write_inn_registry(options["output"], inns)
+        except (LookupError, ValueError, OSError, FieldError, ParseError) as e:
+            raise CommandError(str(e))
+        self.stdout.write("Registry with {} records is written to {}".format(count, options["output"]))
@@ -0,0 +1,72 @@
+import cProfile
+import csv
+import pstats
+
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from django_bank_requisites.serializers import BankDetailsSerializer
+from django_bank_requisites.streaming import iter_json_records
+
+class Command(BaseCommand):
+    help = ("Profiles bank details validation stack (serializer and, optionally, model validation) "
+            "over records from CSV, JSON array or NDJSON file.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("input_file", help="File with bank details records.")
+        parser.add_argument("--format", choices=("json", "csv"), default=None,
+                            help="Input format. JSON array and NDJSON are both 'json'. "
+                                 "By default is detected by file extension.")
+        parser.add_argument("--model", default=None,
+                            help="Also run full_clean() of the model (app_label.ModelName) without unique checks.")
+        parser.add_argument("--repeat", type=int, default=1, help="How many times to validate every record.")
+        parser.add_argument("--sort", default="cumulative", help="Stats sort key.")
+        parser.add_argument("--limit", type=int, default=30, help="Number of stats lines to print.")
+        parser.add_argument("--output", default=None, help="Write raw stats to this file.")
+
+    def iter_records(self, path, input_format):
+        if input_format is None:
+            input_format = "csv" if path.lower().endswith(".csv") else "json"
+        if input_format == "csv":
+            with open(path, newline="", encoding="utf-8") as f:
+                yield from csv.DictReader(f)
+        else:
+            with open(path, "rb") as f:
+                yield from iter_json_records(f)
+
+    def validate_record(self, record, model):
+        BankDetailsSerializer(data=record).is_valid()
+        if model is not None and isinstance(record, dict):
+            field_names = {field.name for field in model._meta.concrete_fields}
+            instance = model(**{key: value for key, value in record.items() if key in field_names})
+            try:
+                instance.full_clean(validate_unique=False)
+            except ValidationError:
+                pass
+
+    def handle(self, *args, **options):
+        model = None
+        if options["model"]:
+            try:
+                model = apps.get_model(options["model"])
+            except (LookupError, ValueError) as e:
+                raise CommandError(str(e))
+        try:
+            records = list(self.iter_records(options["input_file"], options["format"]))
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        for _ in range(options["repeat"]):
+            for record in records:
+                self.validate_record(record, model)
+        profiler.disable()
+
+        self.stdout.write("Validated {} records {} time(s).".format(len(records), options["repeat"]))
+        stats = pstats.Stats(profiler, stream=self.stdout)
+        stats.sort_stats(options["sort"]).print_stats(options["limit"])
+        if options["output"]:
+            stats.dump_stats(options["output"])
+            self.stdout.write("Stats are written to {}".format(options["output"]))
@@ -0,0 +1,339 @@
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.core.validators import MaxLengthValidator
+from django.db import models
+from django.db.models.functions import Substr
+from django.utils.translation import gettext_lazy as _
+
+from .backends import BANK_ACCOUNT_FIELDS, validate_many
+from .base_validators import is_inn_valid
+from .conf import get_setting, is_fail_fast_mode
+from .counterparty import CounterpartyError, get_client
+from .dedup import DuplicateFinder
+from .django_validators import validate_bik, validate_inn, validate_kpp, validate_ks, validate_ogrn, validate_rs
+from .errors import FIELDS
+from .utils import DB_CHUNK_SIZE
+
+RAISE = "raise"
+SKIP = "skip"
+INVALID_ROWS_MODES = (RAISE, SKIP)
+# Fields which are validated together in model clean()
+CROSS_FIELDS = ("bik", "rs", "ks")
+# Fields read by model clean(): cross fields and INN for the tax registry check
+CLEAN_FIELDS = CROSS_FIELDS + ("inn",)
+# Max number of values in one IN lookup (SQLite limits number of query parameters)
+IN_LOOKUP_CHUNK_SIZE = 500
+# Validators of code fields, which are implied by passing backends.validate_many()
+CODE_VALIDATORS = {
+    "inn": validate_inn,
+    "kpp": validate_kpp,
+    "ogrn": validate_ogrn,
+    "bik": validate_bik,
+    "rs": validate_rs,
+    "ks": validate_ks,
+}
+
+class BulkValidationError(ValidationError):
+    """
+    Raised by validated bulk operations when some rows are invalid.
+    row_errors is a dict: row index (position in objs) or pk for update() -> message dict.
+    """
+
+    def __init__(self, row_errors: dict):
+        self.row_errors = row_errors
+        super().__init__(message=_("%(count)d row(s) are invalid."),
+                         code="invalid_rows",
+                         params={"count": len(row_errors)})
+
+### HELPER FUNCS ###
+
+def _check_mode(invalid_rows: str):
+    if invalid_rows not in INVALID_ROWS_MODES:
+        raise ValueError("invalid_rows must be one of: {}".format(", ".join(INVALID_ROWS_MODES)))
+
+def _add_errors(errors: dict, key, error: ValidationError):
+    row_errors = errors.setdefault(key, {})
+    error_dict = error.message_dict if hasattr(error, "error_dict") else {NON_FIELD_ERRORS: error.messages}
+    for field, messages in error_dict.items():
+        row_errors.setdefault(field, []).extend(messages)
+
+def _unique_error(model, obj, field) -> ValidationError:
+    return ValidationError({field.name: obj.unique_error_message(model, (field.name,))})
+
+def _is_screened(field) -> bool:
+    """
+    Field can be checked by validation backend instead of its validators,
+    if it has only the validator of its code (and max length).
+    """
+    validator = CODE_VALIDATORS.get(field.name)
+    return (validator is not None and not field.choices and
+            all(v is validator or isinstance(v, MaxLengthValidator) for v in field.validators))
+
+def _is_code_value(value, field) -> bool:
+    return isinstance(value, str) and 0 < len(value) <= (field.max_length or len(value))
+
+class _RowsValidator:
+    """
+    Validates model instances in batch: field validators and clean() of every instance,
+    then uniqueness with one query per unique field for a chunk of values.
+    In collect_all mode code fields are checked first with one backends.validate_many() call per field,
+    validators of accepted values are skipped.
+    """
+
+    def __init__(self, model, using, fields: set = None):
+        self.model = model
+        self.using = using
+        all_fields = {field.name for field in model._meta.concrete_fields}
+        self.fields = all_fields if fields is None else set(fields)
+        self.exclude = all_fields - self.fields
+        self.run_clean = fields is None or bool(self.fields & set(CROSS_FIELDS))
+        self.unique_fields = [field for field in model._meta.concrete_fields
+                              if field.unique and not field.primary_key and field.name in self.fields]
+        # In fail-fast mode only the first error of a row is reported
+        self.fail_fast = is_fail_fast_mode(getattr(model, "validation_mode", None))
+        self.code_fields = [field for field in FIELDS if field in self.fields or
+                            (self.run_clean and field in CROSS_FIELDS)]
+        self.screened_fields = [field for field in model._meta.concrete_fields
+                                if field.name in self.fields and _is_screened(field)]
+
+    def validate(self, objs: dict) -> dict:
+        """
+        objs is a dict: key -> instance. Returns dict: key -> message dict.
+        """
+        errors = {}
+        if self.run_clean:
+            self._prefetch_counterparties(objs)
+        accepted = {} if self.fail_fast else self._screen(objs)
+        for key, obj in objs.items():
+            if self.fail_fast:
+                self._validate_fail_fast(key, obj, errors)
+                continue
+            try:
+                obj.clean_fields(exclude=self.exclude | accepted.get(key, set()))
+            except ValidationError as e:
+                _add_errors(errors, key, e)
+            if self.run_clean:
+                try:
+                    obj.clean()
+                except ValidationError as e:
+                    _add_errors(errors, key, e)
+        for field in self.unique_fields:
+            self._validate_unique(field, objs, errors)
+        return errors
+
+    def _validate_fail_fast(self, key, obj, errors: dict):
+        """
+        Runs cheapest checks first and stops at the first error.
+        """
+        try:
+            obj._raise_first_error([field for field in self.code_fields if hasattr(obj, field)])
+            obj.clean_fields(exclude=self.exclude)
+            if self.run_clean:
+                obj.clean()
+        except ValidationError as e:
+            field, messages = next(iter(e.message_dict.items()))
+            errors[key] = {field: messages[:1]}
+
+    def _screen(self, objs: dict) -> dict:
+        """
+        Validates code fields of all instances with validation backends.
+        Returns dict: key -> set of fields with accepted values.
+        """
+        accepted = {}
+        for field in self.screened_fields:
+            keys = [key for key, obj in objs.items() if _is_code_value(getattr(obj, field.attname), field)]
+            if not keys:
+                continue
+            codes = [getattr(objs[key], field.attname) for key in keys]
+            biks = ([str(getattr(objs[key], "bik", None) or "") for key in keys]
+                    if field.name in BANK_ACCOUNT_FIELDS else None)
+            for key, is_valid in zip(keys, validate_many(field.name, codes, biks)):
+                if is_valid:
+                    accepted.setdefault(key, set()).add(field.name)
+        return accepted
+
+    def _prefetch_counterparties(self, objs: dict):
+        """
+        Requests statuses of all INNs in bulk, so clean() of every instance takes them from cache.
+        """
+        client = get_client() if get_setting("COUNTERPARTY_CHECK") else None
+        if client is None:
+            return
+        inns = [obj.inn for obj in objs.values() if is_inn_valid(inn=getattr(obj, "inn", None) or "")]
+        try:
+            client.status_many(inns)
+        except CounterpartyError:
+            pass
+
+    def _validate_unique(self, field, objs: dict, errors: dict):
+        # Values of the batch are kept in compact index (see dedup.py), existing ones are queried in chunks
+        finder = DuplicateFinder(fields=(field.attname,))
+        chunk = {}
+        for key, obj in objs.items():
+            value = getattr(obj, field.attname)
+            if value in (None, "") or field.name in errors.get(key, {}) or (self.fail_fast and key in errors):
+                continue
+            if finder.check({field.attname: str(value)}):
+                # Duplicate in the same batch
+                _add_errors(errors, key, _unique_error(self.model, obj, field))
+                continue
+            chunk[value] = key
+            if len(chunk) == IN_LOOKUP_CHUNK_SIZE:
+                self._query_existing(field, chunk, objs, errors)
+                chunk = {}
+        if chunk:
+            self._query_existing(field, chunk, objs, errors)
+
+    def _query_existing(self, field, chunk: dict, objs: dict, errors: dict):
+        """
+        chunk is a dict: value -> key of its instance.
+        """
+        queryset = self.model._default_manager.using(self.using).filter(**{field.name + "__in": list(chunk)})
+        for value, pk in queryset.values_list(field.attname, "pk"):
+            key = chunk[value]
+            obj = objs[key]
+            if obj.pk is not None and obj.pk == pk:
+                continue
+            _add_errors(errors, key, _unique_error(self.model, obj, field))
+
+def _derived_fields(model) -> dict:
+    get_derived_fields = getattr(model, "get_derived_fields", None)
+    return get_derived_fields() if get_derived_fields is not None else {}
+
+### QUERYSET ###
+
+class DerivedFieldsQuerySet(models.QuerySet):
+    """
+    QuerySet which fills columns derived from codes (see models.DerivedFieldsMixin)
+    in bulk_create(), bulk_update() and update().
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        if _derived_fields(self.model):
+            for obj in objs:
+                obj.fill_derived_fields()
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        field_names = {self.model._meta.get_field(name).name for name in fields}
+        derived = [name for name, (source, start, length) in _derived_fields(self.model).items()
+                   if source in field_names and name not in field_names]
+        if derived:
+            objs = list(objs)
+            for obj in objs:
+                obj.fill_derived_fields(sources=field_names)
+            fields = list(fields) + derived
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        for name, (source, start, length) in _derived_fields(self.model).items():
+            if source not in kwargs or name in kwargs:
+                continue
+            value = kwargs[source]
+            if hasattr(value, "resolve_expression"):
+                kwargs[name] = Substr(value, start + 1, length)
+            else:
+                kwargs[name] = (value or "")[start:start + length]
+        return super().update(**kwargs)
+
+    def fill_derived_fields(self) -> int:
+        """
+        Recomputes derived columns of all rows with one query (e.g. in data migration after adding the columns).
+        """
+        values = {name: Substr(source, start + 1, length)
+                  for name, (source, start, length) in _derived_fields(self.model).items()}
+        return models.QuerySet.update(self, **values) if values else 0
+
+DerivedFieldsManager = models.Manager.from_queryset(DerivedFieldsQuerySet)
+
+class BankDetailsQuerySet(DerivedFieldsQuerySet):
+    """
+    QuerySet which validates rows in bulk_create(), bulk_update() and update() before writing.
+
+    invalid_rows argument of bulk_create(), bulk_update() and validated_update() defines
+    what to do with invalid rows:
+    "raise" (default) - raise BulkValidationError with errors of all invalid rows, nothing is written;
+    "skip" - write only valid rows. Errors of skipped instances are set to their validation_errors attribute.
+    Pass validate=False to bulk methods to write without validation.
+    update() takes only field values, so it raises on invalid rows.
+    """
+
+    def bulk_create(self, objs, *args, validate: bool = True, invalid_rows: str = RAISE, **kwargs):
+        if not validate:
+            return super().bulk_create(objs, *args, **kwargs)
+        _check_mode(invalid_rows)
+        objs = list(objs)
+        errors = _RowsValidator(self.model, self.db).validate(dict(enumerate(objs)))
+        objs = self._handle_errors(objs, errors, invalid_rows)
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, validate: bool = True, invalid_rows: str = RAISE, **kwargs):
+        if not validate:
+            return super().bulk_update(objs, fields, *args, **kwargs)
+        _check_mode(invalid_rows)
+        objs = list(objs)
+        field_names = {self.model._meta.get_field(name).name for name in fields}
+        errors = _RowsValidator(self.model, self.db, fields=field_names).validate(dict(enumerate(objs)))
+        objs = self._handle_errors(objs, errors, invalid_rows)
+        if not objs:
+            return 0
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        return self.validated_update(kwargs)
+
+    def validated_update(self, values: dict, invalid_rows: str = RAISE) -> int:
+        """
+        Same as update(**values). Validates new values with values of other fields of every affected row.
+        Values which are expressions (F(), functions, etc.) are not validated.
+        """
+        _check_mode(invalid_rows)
+        new_values = {name: value for name, value in values.items() if not hasattr(value, "resolve_expression")}
+        if not new_values:
+            return super().update(**values)
+        field_names = {self.model._meta.get_field(name).name for name in new_values}
+        validator = _RowsValidator(self.model, self.db, fields=field_names)
+        load_fields = field_names | (set(CLEAN_FIELDS) if validator.run_clean else set())
+
+        errors = {}
+        objs = {}
+        pks = []
+        for obj in self.only(*load_fields).iterator(chunk_size=DB_CHUNK_SIZE):
+            for name, value in new_values.items():
+                setattr(obj, self.model._meta.get_field(name).attname, value)
+            objs[obj.pk] = obj
+            pks.append(obj.pk)
+            if len(objs) == DB_CHUNK_SIZE:
+                errors.update(validator.validate(objs))
+                objs = {}
+        if objs:
+            errors.update(validator.validate(objs))
+        # All rows get the same value, so unique field can't be updated in several rows
+        if validator.unique_fields and self.count() > 1:
+            for obj_pk in self.values_list("pk", flat=True):
+                obj = self.model(pk=obj_pk)
+                for field in validator.unique_fields:
+                    _add_errors(errors, obj_pk, _unique_error(self.model, obj, field))
+
+        if not errors:
+            return super().update(**values)
+        if invalid_rows == RAISE:
+            raise BulkValidationError(errors)
+        # Valid rows are updated by pk in chunks, so query doesn't exceed limit of bind parameters
+        valid_pks = [pk for pk in pks if pk not in errors]
+        count = 0
+        for start in range(0, len(valid_pks), IN_LOOKUP_CHUNK_SIZE):
+            queryset = self.filter(pk__in=valid_pks[start:start + IN_LOOKUP_CHUNK_SIZE])
+            count += super(BankDetailsQuerySet, queryset).update(**values)
+        return count
+
+    def _handle_errors(self, objs: list, errors: dict, invalid_rows: str) -> list:
+        if not errors:
+            return objs
+        if invalid_rows == RAISE:
+            raise BulkValidationError(errors)
+        for index, row_errors in errors.items():
+            objs[index].validation_errors = row_errors
+        return [obj for index, obj in enumerate(objs) if index not in errors]
+
+BankDetailsManager = models.Manager.from_queryset(BankDetailsQuerySet)
@@ -0,0 +1,157 @@
+import mmap
+import struct
+
+from .bik_directory import BankInfo
+from .utils import atomic_write
+
+MAGIC = b"BRMR"
+FORMAT_VERSION = 1
+# magic, format version, key size, value size, number of records
+HEADER = struct.Struct("<4sBHHQ")
+BIK_KEY_SIZE = 9
+BIK_VALUE_SIZE = 256
+INN_KEY_SIZE = 12
+# Separator of bank name and accounts in BIK registry values
+VALUE_SEPARATOR = b"\n"
+
+### FILE FORMAT ###
+
+def _to_bytes(value, size: int, what: str) -> bytes:
+    if isinstance(value, str):
+        value = value.encode()
+    if len(value) > size:
+        raise ValueError("{} {!r} is longer than {} bytes".format(what, value, size))
+    return value.ljust(size, b"\0")
+
+def write_registry(path: str, items, key_size: int, value_size: int = 0) -> int:
+    """
+    Writes registry file: header and fixed size records (key, value) sorted by key.
+    Keys and values are str or bytes padded with zero bytes. If a key is repeated, the last value is used.
+    The file is replaced atomically. Returns number of records.
+    """
+    records = {}
+    for item in items:
+        key, value = item if value_size else (item, b"")
+        records[_to_bytes(key, key_size, "Key")] = _to_bytes(value, value_size, "Value")
+    with atomic_write(path, prefix=".registry-") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, key_size, value_size, len(records)))
+        for key in sorted(records):
+            f.write(key)
+            f.write(records[key])
+    return len(records)
+
+class MappedRegistry:
+    """
+    Read-only sorted registry in a memory-mapped file.
+
+    The file is mapped, not read: pages are shared by all processes which open it
+    (e.g. gunicorn workers) through the OS page cache, and opening is instant.
+    Lookups are binary searches over fixed size records.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < HEADER.size:
+            self._mmap.close()
+            raise ValueError("{} is not a registry file".format(path))
+        magic, version, self.key_size, self.value_size, self._count = HEADER.unpack_from(self._mmap)
+        self._record_size = self.key_size + self.value_size
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mmap.close()
+            raise ValueError("{} is not a registry file".format(path))
+        if len(self._mmap) != HEADER.size + self._count * self._record_size:
+            self._mmap.close()
+            raise ValueError("{} is truncated".format(path))
+
+    def _key_at(self, index: int) -> bytes:
+        offset = HEADER.size + index * self._record_size
+        return self._mmap[offset:offset + self.key_size]
+
+    def _find(self, key) -> int:
+        """
+        Returns index of record with the key or -1.
+        """
+        if isinstance(key, str):
+            key = key.encode()
+        if len(key) > self.key_size:
+            return -1
+        key = key.ljust(self.key_size, b"\0")
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count and self._key_at(low) == key:
+            return low
+        return -1
+
+    def get_value(self, key) -> bytes:
+        """
+        Returns value of the key (without padding) or None.
+        """
+        index = self._find(key)
+        if index < 0:
+            return None
+        offset = HEADER.size + index * self._record_size + self.key_size
+        return self._mmap[offset:offset + self.value_size].rstrip(b"\0")
+
+    def __contains__(self, key) -> bool:
+        return self._find(key) >= 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def keys(self):
+        for index in range(self._count):
+            yield self._key_at(index).rstrip(b"\0").decode()
+
+    def close(self):
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+### REGISTRIES ###
+
+def write_bik_registry(path: str, directory) -> int:
+    """
+    Writes BIK registry from BikDirectory (or any iterable of BankInfo).
+    Value is bank name and correspondent accounts, too long names are truncated.
+    """
+
+    def items():
+        for info in directory:
+            accounts = [account.encode() for account in info.accounts]
+            tail = b"".join(VALUE_SEPARATOR + account for account in accounts)
+            name = info.name.encode()[:BIK_VALUE_SIZE - len(tail)].decode(errors="ignore").encode()
+            yield info.bik, name + tail
+
+    return write_registry(path, items(), key_size=BIK_KEY_SIZE, value_size=BIK_VALUE_SIZE)
+
+def write_inn_registry(path: str, inns) -> int:
+    """
+    Writes set of known INNs. Empty values are skipped.
+    """
+    return write_registry(path, (inn for inn in inns if inn), key_size=INN_KEY_SIZE)
+
+class MappedBikDirectory(MappedRegistry):
+    """
+    BIK registry with the same lookups as BikDirectory.
+    """
+
+    def get(self, bik: str) -> BankInfo:
+        value = self.get_value(bik)
+        if value is None:
+            return None
+        name, *accounts = value.split(VALUE_SEPARATOR)
+        return BankInfo(bik=bik, name=name.decode(), accounts=tuple(account.decode() for account in accounts))
+
+    def is_ks_valid(self, ks: str, bik: str) -> bool:
+        info = self.get(bik)
+        return info is not None and ks in info.accounts
@@ -1,7 +1,130 @@
+import contextvars
+import copy
+from contextlib import contextmanager
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import IntegrityError, router, transaction
+from django.db.models import Q
 from rest_framework import serializers
+from rest_framework.fields import get_error_detail
+from rest_framework.relations import ManyRelatedField, RelatedField
+from rest_framework.validators import BaseUniqueForValidator, UniqueTogetherValidator, UniqueValidator
 
-from .base_validators import is_bank_account_code_check_num_valid, is_ks_3_last_digits_valid
+from .base_validators import is_bank_account_code_check_num_valid, is_ks_3_last_digits_valid, normalize_code
 from .django_validators import *
+from .bloom import filter_key, get_unique_filter
+from .conf import get_setting, is_fail_fast_mode
+from .deferred import defer_validation
+from .errors import first_error
+from .profiling import profiled
+
+# Fields which are checked by clean() of BankDetailsValidated
+CLEAN_FIELDS = ("inn", "rs", "ks", "bik")
+# Values of instances which were validated by ValidatedModelSerializerMixin and are being saved
+_validated_values = contextvars.ContextVar("bank_requisites_validated_values", default=frozenset())
+
+### HELPER FUNCS ###
+
+def _clean_values(model, values) -> tuple:
+    # Omitted values are saved as defaults of model fields
+    return (model._meta.label_lower,) + tuple(values[field] if field in values else
+                                              model._meta.get_field(field).get_default()
+                                              for field in CLEAN_FIELDS)
+
+def is_validated(instance) -> bool:
+    """
+    Returns True if clean() of the instance with current values has already passed
+    in ValidatedModelSerializerMixin.validate().
+    """
+    return _clean_values(type(instance), vars(instance)) in _validated_values.get()
+
+def _pop_unique_validators(fields: dict, names) -> dict:
+    """
+    Removes UniqueValidator from validators of fields. Returns dict field -> removed validator.
+    """
+    unique_validators = {}
+    for name in names:
+        if name not in fields:
+            continue
+        validators = []
+        for validator in fields[name].validators:
+            if isinstance(validator, UniqueValidator):
+                unique_validators[name] = validator
+            else:
+                validators.append(validator)
+        fields[name].validators = validators
+    return unique_validators
+
+def _queries_db(serializer) -> bool:
+    """
+    Returns True if validators of serializer or its writable fields query database
+    (other unique validators, related fields).
+    """
+    if any(isinstance(validator, (UniqueTogetherValidator, BaseUniqueForValidator))
+           for validator in serializer.validators):
+        return True
+    for field in serializer._writable_fields:
+        if isinstance(field, (RelatedField, ManyRelatedField)):
+            return True
+        if any(isinstance(validator, UniqueValidator) for validator in field.validators):
+            return True
+    return False
+
+def _unique_queryset(unique_validators: dict, values: dict, instance=None) -> tuple:
+    """
+    Returns (queryset of rows with any of values, dict field -> value to look up),
+    queryset is None if there is nothing to check.
+    """
+    lookups = {field: values[field] for field in unique_validators if values.get(field) not in (None, "")}
+    if not lookups:
+        return None, lookups
+    condition = Q()
+    for field, value in lookups.items():
+        condition |= Q(**{"{}__{}".format(field, unique_validators[field].lookup): value})
+    queryset = next(iter(unique_validators.values())).queryset.filter(condition)
+    if instance is not None and instance.pk is not None:
+        queryset = queryset.exclude(pk=instance.pk)
+    return queryset, lookups
+
+def _raise_unique_errors(unique_validators: dict, lookups: dict, rows):
+    errors = {}
+    for row in rows:
+        for field, value in lookups.items():
+            if row[field] == value:
+                errors[field] = [unique_validators[field].message]
+    if errors:
+        raise serializers.ValidationError(errors, code="unique")
+
+@contextmanager
+def validated(model, values: dict):
+    """
+    Marks values of model as validated, so SaveMethodMixin.save() doesn't call clean() again.
+    """
+    token = _validated_values.set(_validated_values.get() | {_clean_values(model, values)})
+    try:
+        yield
+    finally:
+        _validated_values.reset(token)
+
+def _bloom_conflicts(model, values: dict, pk=None, using=None) -> list:
+    """
+    Returns fields of values which already exist in other rows (e.g. after IntegrityError).
+    Found values are added to bloom filter of the current process.
+    """
+    conflicts = []
+    bloom_filter = get_unique_filter()
+    for field, value in values.items():
+        if not value:
+            continue
+        queryset = model._default_manager.using(using).filter(**{field: value})
+        if pk is not None:
+            queryset = queryset.exclude(pk=pk)
+        if queryset.exists():
+            conflicts.append(field)
+            if bloom_filter is not None:
+                bloom_filter.add(filter_key(field, value))
+    return conflicts
 
 class SaveMethodMixin:
     """
@@ -21,12 +144,218 @@ class SaveMethodMixin:
         'EXCEPTION_HANDLER': 'bank_details.exception_handler.exception_handler',
         .....
     }
+
+    If writes must be accepted immediately, set deferred_validation = True
+    on your model (or BANK_REQUISITES_DEFERRED_VALIDATION = True in settings).
+    Then save() doesn't call clean(), the instance is marked as pending
+    and validated in background pool (see deferred.py).
+
+    save() doesn't call clean() either when the instance was just validated
+    by serializer with ValidatedModelSerializerMixin.
     """
 
+    # None means value from BANK_REQUISITES_DEFERRED_VALIDATION setting
+    deferred_validation = None
+
+    def is_validation_deferred(self) -> bool:
+        if self.deferred_validation is None:
+            return get_setting("DEFERRED_VALIDATION")
+        return self.deferred_validation
+
     def save(self, *args, **kwargs):
-        self.clean()
+        if self.is_validation_deferred():
+            super().save(*args, **kwargs)
+            defer_validation(self)
+            return
+        if not is_validated(self):
+            self.clean()
         super().save(*args, **kwargs)
 
+    async def asave(self, *args, **kwargs):
+        """
+        Async counterpart of save(): aclean() runs in the event loop,
+        then the instance is saved without repeating clean().
+        """
+        if not self.is_validation_deferred() and not is_validated(self):
+            await self.aclean()
+        with validated(type(self), vars(self)):
+            await super().asave(*args, **kwargs)
+
+class BloomUniqueCheckMixin:
+    """
+    Skips uniqueness queries for inn and rs in validate_unique() (full_clean(), admin, forms)
+    when bloom filter from BANK_REQUISITES_BLOOM_FILTER_PATH says the value is definitely new.
+    Values of saved instances are added to the filter of the current process.
+
+    class MyModel(BloomUniqueCheckMixin, SaveMethodMixin, BankDetailsValidated):
+
+        pass
+
+    Build the filter with build_bloom_filter management command and rebuild it periodically:
+    values saved by other processes are unknown to the loaded filter. Such duplicates
+    are rejected by database unique constraint, save() converts IntegrityError
+    into usual unique ValidationError.
+    """
+
+    bloom_filter_fields = ("inn", "rs")
+
+    def validate_unique(self, exclude=None):
+        bloom_filter = get_unique_filter()
+        if bloom_filter is not None:
+            exclude = set(exclude or ())
+            for field in self.bloom_filter_fields:
+                value = getattr(self, field)
+                if value and filter_key(field, value) not in bloom_filter:
+                    exclude.add(field)
+        super().validate_unique(exclude=exclude)
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get("using") or router.db_for_write(type(self), instance=self)
+        try:
+            with transaction.atomic(using=using):
+                super().save(*args, **kwargs)
+        except IntegrityError:
+            values = {field: getattr(self, field) for field in self.bloom_filter_fields}
+            conflicts = _bloom_conflicts(type(self), values, pk=self.pk if not self._state.adding else None,
+                                         using=using)
+            if not conflicts:
+                raise
+            raise DjangoValidationError({field: self.unique_error_message(type(self), (field,))
+                                         for field in conflicts})
+        bloom_filter = get_unique_filter()
+        if bloom_filter is not None:
+            for field in self.bloom_filter_fields:
+                value = getattr(self, field)
+                if value:
+                    bloom_filter.add(filter_key(field, value))
+
+class BloomUniqueValidator(UniqueValidator):
+    """
+    DRF UniqueValidator which doesn't query database when bloom filter
+    says the value is definitely new.
+    """
+
+    def __call__(self, value, serializer_field):
+        bloom_filter = get_unique_filter()
+        field_name = serializer_field.source_attrs[-1]
+        if bloom_filter is not None and value and filter_key(field_name, value) not in bloom_filter:
+            return
+        super().__call__(value, serializer_field)
+
+class BloomUniqueValidatorMixin:
+    """
+    Replaces UniqueValidator of inn and rs fields of ModelSerializer with BloomUniqueValidator:
+
+    class MySerializer(BloomUniqueValidatorMixin, serializers.ModelSerializer):
+
+        class Meta:
+            model = <your model with BloomUniqueCheckMixin>
+            fields = "__all__"
+
+    Duplicates unknown to the filter are rejected by database, save() converts
+    IntegrityError (or ValidationError of BloomUniqueCheckMixin) into serializer unique errors.
+    """
+
+    bloom_filter_fields = ("inn", "rs")
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for name in self.bloom_filter_fields:
+            if name not in fields:
+                continue
+            fields[name].validators = [
+                (BloomUniqueValidator(queryset=validator.queryset, message=validator.message, lookup=validator.lookup)
+                 if type(validator) is UniqueValidator
+                 else validator)
+                for validator in fields[name].validators
+            ]
+        return fields
+
+    def save(self, **kwargs):
+        model = self.Meta.model
+        try:
+            with transaction.atomic(using=router.db_for_write(model)):
+                return super().save(**kwargs)
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(get_error_detail(e))
+        except IntegrityError:
+            values = dict(self.validated_data, **kwargs)
+            values = {field: values.get(field) for field in self.bloom_filter_fields}
+            conflicts = _bloom_conflicts(model, values, pk=self.instance.pk if self.instance is not None else None)
+            if not conflicts:
+                raise
+            raise serializers.ValidationError({field: [self._unique_message(field)] for field in conflicts},
+                                              code="unique")
+
+    def _unique_message(self, field: str) -> str:
+        for validator in self.fields[field].validators if field in self.fields else ():
+            if isinstance(validator, UniqueValidator):
+                return validator.message
+        return UniqueValidator.message
+
+class ValidatedModelSerializerMixin:
+    """
+    Validates model with SaveMethodMixin and BankDetailsValidated in a single pass:
+
+    class MySerializer(ValidatedModelSerializerMixin, serializers.ModelSerializer):
+
+        class Meta:
+            model = <your model>
+            fields = "__all__"
+
+    is_valid() runs model clean() (errors are returned as usual serializer errors,
+    exception handler is not needed) and checks uniqueness of inn and rs with one query
+    instead of a query per field. Then save() doesn't call clean() again
+    unless values were changed after validation.
+    """
+
+    unique_fields = ("inn", "rs")
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # dict field -> removed UniqueValidator
+        self._unique_validators = _pop_unique_validators(fields, self.unique_fields)
+        return fields
+
+    def _get_instance(self, data):
+        """
+        Returns unsaved copy of the instance (or new instance) with validated data.
+        """
+        model = self.Meta.model
+        instance = copy.copy(self.instance) if self.instance is not None else model()
+        # Validated data has related instances, so foreign keys are set by name
+        for field in model._meta.concrete_fields:
+            if field.name in data:
+                setattr(instance, field.name, data[field.name])
+        return instance
+
+    def validate_unique_fields(self, instance):
+        """
+        Checks all unique fields with one query.
+        """
+        self.fields  # populates _unique_validators
+        values = {field: getattr(instance, field) for field in self._unique_validators}
+        queryset, lookups = _unique_queryset(self._unique_validators, values, instance=self.instance)
+        if queryset is not None:
+            _raise_unique_errors(self._unique_validators, lookups, queryset.values(*lookups))
+
+    def validate(self, data):
+        data = super().validate(data)
+        instance = self._get_instance(data)
+        try:
+            instance.clean()
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(get_error_detail(e))
+        self.validate_unique_fields(instance)
+        return data
+
+    def save(self, **kwargs):
+        values = dict(self.validated_data, **kwargs)
+        if self.instance is not None:
+            values = dict({field: getattr(self.instance, field) for field in CLEAN_FIELDS}, **values)
+        with validated(self.Meta.model, values):
+            return super().save(**kwargs)
+
 class BankDetailsValidationMixin:
     """
     Mixin includes different levels of serializer validation.
@@ -50,8 +379,24 @@ class BankDetailsValidationMixin:
     class MySerializer(BankDetailsValidationMixin, serializers.ModelSerializer):
 
         pass
+
+    Set normalize_codes = True to remove spaces and dashes from codes
+    and replace full-width digits before validation.
+
+    Set validation_mode = "fail_fast" (or BANK_REQUISITES_VALIDATION_MODE setting)
+    to stop at the first invalid code: codes are checked cheapest first
+    before field validators and uniqueness queries.
+
+    In async views use "await serializer.ais_valid()" instead of is_valid().
     """
 
+    normalize_codes = False
+    code_fields = ("inn", "kpp", "ogrn", "rs", "ks", "bik")
+    # Fields with UniqueValidator which are checked with one async query in ais_valid()
+    unique_fields = ("inn", "rs")
+    # "collect_all" or "fail_fast", None means value from BANK_REQUISITES_VALIDATION_MODE setting
+    validation_mode = None
+
     class Meta:
         extra_kwargs = {
             "inn": {
@@ -70,8 +415,67 @@ class BankDetailsValidationMixin:
                 "validators": [validate_bik]
             }
         }
-    
+
+    def is_fail_fast(self) -> bool:
+        return is_fail_fast_mode(self.validation_mode)
+
+    async def ais_valid(self, raise_exception=False) -> bool:
+        """
+        Async counterpart of is_valid(). Code checks don't do I/O and run in the event loop,
+        uniqueness of unique_fields is checked after other validation with one async query.
+        If other validators or related fields query database, is_valid() runs in a thread (sync_to_async).
+        """
+        if not hasattr(self, "_validated_data"):
+            validators = {name: self.fields[name].validators for name in self.unique_fields if name in self.fields}
+            unique_validators = _pop_unique_validators(self.fields, self.unique_fields)
+            try:
+                if _queries_db(self):
+                    await sync_to_async(self.is_valid)()
+                else:
+                    self.is_valid()
+                if not self._errors:
+                    queryset, lookups = _unique_queryset(unique_validators, self._validated_data,
+                                                         instance=self.instance)
+                    if queryset is not None:
+                        rows = [row async for row in queryset.values(*lookups)]
+                        _raise_unique_errors(unique_validators, lookups, rows)
+            except serializers.ValidationError as e:
+                self._validated_data = {}
+                self._errors = e.detail
+            finally:
+                for name, field_validators in validators.items():
+                    self.fields[name].validators = field_validators
+        if self._errors and raise_exception:
+            raise serializers.ValidationError(self.errors)
+        return not self._errors
+
+    def to_internal_value(self, data):
+        if self.normalize_codes and hasattr(data, "items"):
+            data = data.copy()
+            for field in self.code_fields:
+                if isinstance(data.get(field), str):
+                    data[field] = normalize_code(data[field])
+        if self.is_fail_fast() and hasattr(data, "items"):
+            self.check_first_error(data)
+        return super().to_internal_value(data)
+
+    def check_first_error(self, data):
+        """
+        Raises ValidationError of the first invalid code (see errors.first_error).
+        """
+        error = first_error({field: data[field].strip() for field in self.code_fields
+                             if field in self.fields and isinstance(data.get(field), str)})
+        if error is not None:
+            field, error_code = error
+            key, code = ERROR_CODES[error_code]
+            raise serializers.ValidationError({field: [error_messages[key]]}, code=code)
+
+    @profiled
     def validate(self, data):
+        if self.is_fail_fast():
+            # Cross field checks are done by check_first_error()
+            self.check_bank_directory(data)
+            return data
         # In serializers we don't need the extra validators,
         # that were at the field level, again like in models.
         # This method will work if all field level validators are pass.
@@ -94,5 +498,17 @@ class BankDetailsValidationMixin:
 
         if errors_dict:
             raise serializers.ValidationError(errors_dict)
-            
-        return data
\ No newline at end of file
+        self.check_bank_directory(data)
+
+        return data
+
+    def check_bank_directory(self, data):
+        """
+        Validates BIK and KS in the BIK directory if BANK_REQUISITES_BIK_DIRECTORY_CHECK is set.
+        """
+        if not get_setting("BIK_DIRECTORY_CHECK") or "bik" not in data:
+            return
+        try:
+            validate_bank_directory(data["bik"], data.get("ks", ""))
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(get_error_detail(e))
\ No newline at end of file
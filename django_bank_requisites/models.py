@@ -1,13 +1,22 @@
+from asgiref.sync import sync_to_async
 from django.db import models
-from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
 from django.utils.translation import gettext_lazy as _
 
 from .base_validators import (is_bik_valid,
                               is_bank_account_code_check_num_valid,
                               is_ks_3_last_digits_valid,
                               is_code_length_valid,
-                              is_code_structure_valid)
+                              is_code_structure_valid,
+                              is_inn_valid)
+from .accounts import BALANCE_ACCOUNT_LENGTH, CURRENCY_CODE_LENGTH, category_ranges, classify_account
+from .conf import get_setting, is_fail_fast_mode
+from .errors import FIELDS, first_error
 from .django_validators import *
+from .managers import BankDetailsManager, DerivedFieldsManager
+from .profiling import profiled
+from .regions import REGION_CODE_LENGTH, TAX_OFFICE_CODE_LENGTH, region_name, tax_office_name
 
 
 class BankDetailsUnvalidated(models.Model):
@@ -29,6 +38,8 @@ class BankDetailsUnvalidated(models.Model):
 class BankDetailsValidated(models.Model):
     """
     Abstract model with bank details validation.
+    Manager validated validates rows in bulk_create(), bulk_update() and update() (see managers.py),
+    default manager objects writes rows without validation as usual.
     """
 
     legal_address = models.CharField(verbose_name=_("Legal address"), max_length=255)
@@ -39,15 +50,167 @@ class BankDetailsValidated(models.Model):
     bik = models.CharField(verbose_name=_("BIK"), max_length=9, validators=[validate_bik])
     bank_name = models.CharField(verbose_name=_("Bank name"), max_length=255)
 
+    objects = DerivedFieldsManager()
+    validated = BankDetailsManager()
+    # "collect_all" or "fail_fast", None means value from BANK_REQUISITES_VALIDATION_MODE setting
+    validation_mode = None
+
     class Meta:
         abstract = True
 
-    def clean(self):
-        # Since RS and KS depends on BIK, validate it one more time
-        if not is_bik_valid(bik=self.bik):
+    def is_fail_fast(self) -> bool:
+        return is_fail_fast_mode(self.validation_mode)
+
+    def _raise_first_error(self, fields):
+        """
+        Raises ValidationError of the first failure of code fields (cheapest checks first).
+        """
+        error = first_error({field: getattr(self, field) for field in fields})
+        if error is not None:
+            field, error_code = error
+            raise ValidationError({field: validation_error(error_code)})
+
+    def full_clean(self, exclude=None, validate_unique=True, *args, **kwargs):
+        """
+        In fail-fast mode stops at the first error: code fields are checked first (cheapest checks first),
+        then other fields, then clean(), then uniqueness and model constraints (Django 4.1+).
+        """
+        if not self.is_fail_fast():
+            return super().full_clean(exclude, validate_unique, *args, **kwargs)
+        validate_constraints = args[0] if args else kwargs.get("validate_constraints", True)
+        exclude = set(exclude or ())
+        self._clean_fields_fail_fast(exclude)
+        self.clean()
+        if validate_unique:
+            self._raise_first_of(self.validate_unique, exclude)
+        if validate_constraints and hasattr(self, "validate_constraints"):
+            self._raise_first_of(self.validate_constraints, exclude)
+
+    @staticmethod
+    def _raise_first_of(validate, exclude: set):
+        try:
+            validate(exclude=exclude)
+        except ValidationError as e:
+            if not hasattr(e, "error_dict"):
+                raise ValidationError(e.error_list[:1])
+            field, errors = next(iter(e.error_dict.items()))
+            raise ValidationError({field: errors[:1]})
+
+    def _clean_fields_fail_fast(self, exclude: set):
+        self._raise_first_error([field for field in FIELDS if field not in exclude and hasattr(self, field)])
+        try:
+            self.clean_fields(exclude=exclude)
+        except ValidationError as e:
+            field, errors = next(iter(e.error_dict.items()))
+            raise ValidationError({field: errors[:1]})
+
+    async def afull_clean(self, exclude=None, validate_unique=True):
+        """
+        Async counterpart of full_clean() (model constraints are not validated).
+        Code checks don't do I/O and run in the event loop,
+        uniqueness of all unique fields is checked with one async query.
+        """
+        exclude = set(exclude or ())
+        if self.is_fail_fast():
+            self._clean_fields_fail_fast(exclude)
+            await self.aclean()
+            errors = await self._aunique_errors(exclude) if validate_unique else {}
+            if errors:
+                field, error = next(iter(errors.items()))
+                raise ValidationError({field: error})
             return
+        errors = {}
+        try:
+            self.clean_fields(exclude=exclude)
+        except ValidationError as e:
+            errors = e.update_error_dict(errors)
+        try:
+            await self.aclean()
+        except ValidationError as e:
+            errors = e.update_error_dict(errors)
+        if validate_unique:
+            exclude.update(field for field in errors if field != NON_FIELD_ERRORS)
+            errors.update(await self._aunique_errors(exclude))
+        if errors:
+            raise ValidationError(errors)
+
+    async def _aunique_errors(self, exclude: set) -> dict:
+        """
+        Returns dict field -> ValidationError of unique fields with values of other rows.
+        """
+        lookups = {field.name: getattr(self, field.attname) for field in self._meta.concrete_fields
+                   if field.unique and not field.primary_key and field.name not in exclude
+                   and getattr(self, field.attname) is not None}
+        if not lookups:
+            return {}
+        condition = Q()
+        for field, value in lookups.items():
+            condition |= Q(**{field: value})
+        queryset = type(self)._default_manager.filter(condition)
+        if not self._state.adding and self.pk is not None:
+            queryset = queryset.exclude(pk=self.pk)
+        errors = {}
+        async for row in queryset.values(*lookups):
+            for field, value in lookups.items():
+                if row[field] == value and field not in errors:
+                    errors[field] = self.unique_error_message(type(self), (field,))
+        return errors
+
+    async def aclean(self):
+        """
+        Async counterpart of clean(). Code checks run in the event loop,
+        tax registry is requested in a thread only if BANK_REQUISITES_COUNTERPARTY_CHECK is set.
+        """
+        errors_dict = {}
+        if self.is_fail_fast():
+            self._raise_first_error(("bik", "rs", "ks"))
+        elif is_bik_valid(bik=self.bik):
+            self._clean_bank_accounts(errors_dict)
+        self._clean_bank_directory(errors_dict)
+        if get_setting("COUNTERPARTY_CHECK"):
+            await sync_to_async(self._clean_counterparty)(errors_dict)
+
+        if errors_dict:
+            raise ValidationError(errors_dict)
+
+    @profiled
+    def clean(self):
         errors_dict = {}
+        if self.is_fail_fast():
+            self._raise_first_error(("bik", "rs", "ks"))
+        # Since RS and KS depends on BIK, validate it one more time
+        elif is_bik_valid(bik=self.bik):
+            self._clean_bank_accounts(errors_dict)
+        self._clean_bank_directory(errors_dict)
+        self._clean_counterparty(errors_dict)
+
+        if errors_dict:
+            raise ValidationError(errors_dict)
+
+    def _clean_counterparty(self, errors_dict: dict):
+        """
+        Validates INN in tax registry if BANK_REQUISITES_COUNTERPARTY_CHECK is set.
+        """
+        if get_setting("COUNTERPARTY_CHECK") and is_inn_valid(inn=self.inn):
+            try:
+                validate_counterparty(self.inn)
+            except ValidationError as e:
+                errors_dict.update(inn=e)
 
+    def _clean_bank_directory(self, errors_dict: dict):
+        """
+        Validates BIK and KS in the BIK directory if BANK_REQUISITES_BIK_DIRECTORY_CHECK is set.
+        """
+        if get_setting("BIK_DIRECTORY_CHECK") and is_bik_valid(bik=self.bik) and "ks" not in errors_dict:
+            try:
+                validate_bank_directory(self.bik, self.ks)
+            except ValidationError as e:
+                errors_dict.update(e.error_dict)
+
+    def _clean_bank_accounts(self, errors_dict: dict):
+        """
+        Validates RS and KS with valid BIK.
+        """
         # Validate RS check num if code length and structure are valid
         rs_bik_digits = self.bik[-3:]
         if (is_code_length_valid(code=self.rs, length=(20,)) and
@@ -67,5 +230,123 @@ class BankDetailsValidated(models.Model):
                     not is_bank_account_code_check_num_valid(code=self.ks, bik_digits=ks_bik_digits)):
                     errors_dict.update(ks=ValidationError(message=error_messages["check_num_bik"], code="invalid_check_num_or_bik"))
 
-        if errors_dict:
-            raise ValidationError(errors_dict)
\ No newline at end of file
+class DerivedFieldsMixin(models.Model):
+    """
+    Abstract base of models with columns which store parts of codes,
+    so the parts can be indexed instead of scans with startswith.
+
+    derived_fields is a dict: column -> (source field, start (0-based), length) of the part.
+    Columns are filled in save() and in bulk_create(), bulk_update() and update()
+    of DerivedFieldsQuerySet (BankDetailsQuerySet inherits it).
+    """
+
+    derived_fields = {}
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def get_derived_fields(cls) -> dict:
+        """
+        Returns derived_fields of all mixins of the model.
+        """
+        derived_fields = {}
+        for klass in reversed(cls.__mro__):
+            derived_fields.update(vars(klass).get("derived_fields", {}))
+        return derived_fields
+
+    def fill_derived_fields(self, sources=None):
+        for name, (source, start, length) in self.get_derived_fields().items():
+            if sources is None or source in sources:
+                setattr(self, name, (getattr(self, source) or "")[start:start + length])
+
+    def save(self, *args, **kwargs):
+        self.fill_derived_fields()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            kwargs["update_fields"] = update_fields | {name for name, (source, start, length)
+                                                       in self.get_derived_fields().items()
+                                                       if source in update_fields}
+        super().save(*args, **kwargs)
+
+class RegionIndexMixin(DerivedFieldsMixin):
+    """
+    Adds indexed columns with region and tax office codes of INN and KPP:
+
+    class MyModel(RegionIndexMixin, SaveMethodMixin, BankDetailsValidated):
+
+        pass
+
+    MyModel.objects.filter(inn_region="77")
+    MyModel.objects.values("inn_region").annotate(count=Count("pk"))
+
+    Models based on BankDetailsUnvalidated need objects = DerivedFieldsManager()
+    to fill the columns in bulk operations.
+    """
+
+    inn_region = models.CharField(verbose_name=_("INN region"), max_length=REGION_CODE_LENGTH,
+                                  blank=True, editable=False, db_index=True)
+    inn_tax_office = models.CharField(verbose_name=_("INN tax office"), max_length=TAX_OFFICE_CODE_LENGTH,
+                                      blank=True, editable=False, db_index=True)
+    kpp_tax_office = models.CharField(verbose_name=_("KPP tax office"), max_length=TAX_OFFICE_CODE_LENGTH,
+                                      blank=True, editable=False, db_index=True)
+
+    derived_fields = {
+        "inn_region": ("inn", 0, REGION_CODE_LENGTH),
+        "inn_tax_office": ("inn", 0, TAX_OFFICE_CODE_LENGTH),
+        "kpp_tax_office": ("kpp", 0, TAX_OFFICE_CODE_LENGTH),
+    }
+
+    class Meta:
+        abstract = True
+
+    def get_region_name(self):
+        return region_name(self.inn_region)
+
+    def get_tax_office_name(self):
+        """
+        Name of tax office where organization is registered (see regions.load_tax_offices).
+        """
+        return tax_office_name(self.kpp_tax_office)
+
+class AccountIndexMixin(DerivedFieldsMixin):
+    """
+    Adds indexed columns with balance account (the first 5 digits) and currency code (digits 6-8) of RS:
+
+    class MyModel(AccountIndexMixin, SaveMethodMixin, BankDetailsValidated):
+
+        pass
+
+    MyModel.objects.filter(MyModel.account_category_q(accounts.BUDGET))
+    MyModel.objects.filter(rs_balance_account="40702", rs_currency="810")
+
+    Models based on BankDetailsUnvalidated need objects = DerivedFieldsManager()
+    to fill the columns in bulk operations.
+    """
+
+    rs_balance_account = models.CharField(verbose_name=_("RS balance account"), max_length=BALANCE_ACCOUNT_LENGTH,
+                                          blank=True, editable=False, db_index=True)
+    rs_currency = models.CharField(verbose_name=_("RS currency"), max_length=CURRENCY_CODE_LENGTH,
+                                   blank=True, editable=False, db_index=True)
+
+    derived_fields = {
+        "rs_balance_account": ("rs", 0, BALANCE_ACCOUNT_LENGTH),
+        "rs_currency": ("rs", BALANCE_ACCOUNT_LENGTH, CURRENCY_CODE_LENGTH),
+    }
+
+    class Meta:
+        abstract = True
+
+    @staticmethod
+    def account_category_q(category: str) -> Q:
+        """
+        Returns condition of RS category (see accounts.CATEGORIES) as range lookups on indexed column.
+        """
+        condition = Q()
+        for first, last in category_ranges(category):
+            condition |= Q(rs_balance_account__range=(first, last))
+        return condition
+
+    def get_account_category(self):
+        return classify_account(self.rs)
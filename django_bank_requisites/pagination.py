@@ -0,0 +1,66 @@
+from rest_framework.pagination import CursorPagination
+
+from .conf import get_setting
+
+# Unique indexed fields of bank details models which can be used as keyset
+KEYSET_FIELDS = ("inn", "rs")
+
+### KEYSET HELPERS ###
+
+def _key(row, field: str):
+    return row[field] if isinstance(row, dict) else getattr(row, field)
+
+def keyset_page(queryset, field: str = "inn", after=None, size: int = 1000):
+    """
+    Returns queryset of the next size rows ordered by unique field with value greater than after.
+    Database reads only these rows from the index instead of skipping OFFSET rows.
+    """
+    queryset = queryset.order_by(field)
+    if after is not None:
+        queryset = queryset.filter(**{field + "__gt": after})
+    return queryset[:size]
+
+def iter_keyset_pages(queryset, field: str = "inn", size: int = 1000):
+    """
+    Yields lists of rows (instances or dicts of values()) of the whole queryset page by page.
+    Every page is read with keyset_page(), so time of a page doesn't depend on its position.
+    """
+    after = None
+    while True:
+        page = list(keyset_page(queryset, field=field, after=after, size=size))
+        if page:
+            yield page
+        if len(page) < size:
+            return
+        after = _key(page[-1], field)
+
+### DRF PAGINATION ###
+
+class BankDetailsCursorPagination(CursorPagination):
+    """
+    Cursor pagination over unique index of inn (or rs) for models
+    based on BankDetailsValidated/BankDetailsUnvalidated:
+
+    class MyViewSet(viewsets.ModelViewSet):
+
+        pagination_class = BankDetailsCursorPagination
+
+    Clients choose the index with ?order_by=rs (or -rs for reverse order)
+    and page size with ?page_size=<n> (up to max_page_size).
+    Default page size is BANK_REQUISITES_CURSOR_PAGE_SIZE.
+    """
+
+    ordering = "inn"
+    ordering_param = "order_by"
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+    def get_page_size(self, request):
+        page_size = super().get_page_size(request)
+        return get_setting("CURSOR_PAGE_SIZE") if page_size is None else page_size
+
+    def get_ordering(self, request, queryset, view):
+        ordering = request.query_params.get(self.ordering_param)
+        if ordering and ordering.lstrip("-") in KEYSET_FIELDS:
+            return (ordering,)
+        return (self.ordering,)
@@ -0,0 +1,144 @@
+import typing
+from xml.etree.ElementTree import iterparse
+
+from .dedup import DuplicateFinder
+from .errors import iter_chunks, parties_errors
+from .utils import EMPTY_VALUES, local_name, split_tag
+
+# Payment messages of the Bank of Russia (UFEBS): payment order and payment request order
+ED_DOCUMENTS = ("ED101", "ED105")
+# Packet of ED documents, all its children (also ED103, ED104, ED108 etc.) are removed after processing
+ED_PACKET = "PacketEPD"
+ED_PARTIES = {
+    "payer": "Payer",
+    "payee": "Payee",
+}
+# ISO 20022 transaction element (pain.001 and pacs.008)
+ISO_DOCUMENT = "CdtTrfTxInf"
+# pain.001 has debtor elements in PmtInf, they are shared by its transactions
+ISO_PAYMENT_INFO = "PmtInf"
+ISO_PARTIES = {
+    "payer": "Dbtr",
+    "payee": "Cdtr",
+}
+# Schemes of party identifiers
+INN_SCHEMES = ("INN", "TXID")
+KPP_SCHEMES = ("KPP",)
+
+class PaymentResult(typing.NamedTuple):
+    # Position of the document in the file (0-based)
+    index: int
+    # "ED101", "ED105" or ISO 20022 message name, e.g. "pacs.008.001.08"
+    kind: str
+    # EDNo of ED documents or EndToEndId of ISO 20022 transactions
+    reference: str
+    # dict party ("payer" or "payee") -> dict field -> ErrorCode, only failed fields
+    errors: dict
+    # The reference is repeated in the file (see dedup.DuplicateFinder)
+    duplicate: bool = False
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+### HELPER FUNCS ###
+
+def _find(element, *path):
+    """
+    Finds descendant by path of local names (namespaces differ between message versions).
+    """
+    for name in path:
+        if element is None:
+            return None
+        element = next((child for child in element if local_name(child.tag) == name), None)
+    return element
+
+def _text(element, *path) -> str:
+    element = _find(element, *path)
+    return (element.text or "").strip() if element is not None else ""
+
+def _clean(record: dict) -> dict:
+    return {field: value.strip() for field, value in record.items()
+            if value is not None and value.strip() not in EMPTY_VALUES}
+
+def _ed_party(document, name: str) -> dict:
+    party = _find(document, name)
+    if party is None:
+        return {}
+    bank = _find(party, "Bank")
+    return _clean({
+        "inn": party.get("INN"),
+        "kpp": party.get("KPP"),
+        "rs": party.get("PersonalAcc"),
+        "bik": bank.get("BIC") if bank is not None else None,
+        "ks": bank.get("CorrespAcc") if bank is not None else None,
+    })
+
+def _iso_party(container, prefix: str) -> dict:
+    """
+    Reads Dbtr/Cdtr identifiers, DbtrAcct/CdtrAcct, DbtrAgt/CdtrAgt and DbtrAgtAcct/CdtrAgtAcct.
+    """
+    record = {}
+    party = _find(container, prefix, "Id")
+    for identifier in (party if party is not None else ()):
+        for other in identifier:
+            if local_name(other.tag) != "Othr":
+                continue
+            scheme = (_text(other, "SchmeNm", "Cd") or _text(other, "SchmeNm", "Prtry")).upper()
+            if scheme in INN_SCHEMES:
+                record["inn"] = _text(other, "Id")
+            elif scheme in KPP_SCHEMES:
+                record["kpp"] = _text(other, "Id")
+    if _find(container, prefix + "Acct") is not None:
+        record["rs"] = _text(container, prefix + "Acct", "Id", "Othr", "Id")
+    if _find(container, prefix + "Agt") is not None:
+        record["bik"] = _text(container, prefix + "Agt", "FinInstnId", "ClrSysMmbId", "MmbId")
+    if _find(container, prefix + "AgtAcct") is not None:
+        record["ks"] = _text(container, prefix + "AgtAcct", "Id", "Othr", "Id")
+    return _clean(record)
+
+### VALIDATOR ###
+
+def _iter_documents(source):
+    """
+    Yields (kind, reference, dict party -> record) of documents.
+    Every processed document is removed from the tree.
+    """
+    stack = []
+    for event, element in iterparse(source, events=("start", "end")):
+        if event == "start":
+            stack.append(element)
+            continue
+        stack.pop()
+        parent = stack[-1] if stack else None
+        namespace, name = split_tag(element.tag)
+        if name in ED_DOCUMENTS:
+            parties = {party: _ed_party(element, tag) for party, tag in ED_PARTIES.items()}
+            yield name, element.get("EDNo", ""), parties
+        elif name == ISO_DOCUMENT:
+            parties = {party: _iso_party(element, prefix) for party, prefix in ISO_PARTIES.items()}
+            if parent is not None and local_name(parent.tag) == ISO_PAYMENT_INFO:
+                # Debtor of pain.001 is in PmtInf, before its transactions
+                parties["payer"] = dict(_iso_party(parent, ISO_PARTIES["payer"]), **parties["payer"])
+            yield namespace.rsplit(":", 1)[-1], _text(element, "PmtId", "EndToEndId"), parties
+        elif name != ISO_PAYMENT_INFO and (parent is None or local_name(parent.tag) != ED_PACKET):
+            continue
+        if parent is not None:
+            parent.remove(element)
+
+def validate_payment_xml(source):
+    """
+    Validates requisites of payer and payee of ED101/ED105 documents (also inside packets)
+    and of pain.001/pacs.008 transactions in XML file or binary stream. Yields PaymentResult.
+
+    The file is parsed incrementally and every processed document is removed from the tree,
+    so memory usage doesn't depend on file size. Parties of a chunk of documents
+    are validated in batch (see errors.records_errors). Documents with a reference repeated in the file
+    are marked as duplicate.
+    """
+    finder = DuplicateFinder(fields=("reference",))
+    for chunk in iter_chunks(enumerate(_iter_documents(source))):
+        errors = parties_errors([parties for _, (_, _, parties) in chunk])
+        for (index, (kind, reference, _)), document_errors in zip(chunk, errors):
+            yield PaymentResult(index=index, kind=kind, reference=reference, errors=document_errors,
+                                duplicate=bool(finder.check({"reference": reference})))
@@ -0,0 +1,154 @@
+import atexit
+import cProfile
+import functools
+import os
+import pstats
+import random
+import threading
+
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .conf import SETTINGS_PREFIX, get_setting
+
+_config = None
+# One profiler per process: since Python 3.12 only one profiler can be active at a time
+_profiler = None
+# Held while a sampled call is profiled, sampled calls of other threads are not profiled meanwhile
+_profiler_lock = threading.Lock()
+_lock = threading.Lock()
+_profiled_calls = 0
+# Set when stats should be written by the dump thread (outside of validation calls)
+_dump_requested = threading.Event()
+_dump_thread = None
+_exit_hook_registered = False
+
+### HELPER FUNCS ###
+
+def _get_config() -> dict:
+    """
+    Returns profiling settings. They are read once, because
+    profiled functions are called on every validation.
+    """
+    global _config
+    if _config is None:
+        _config = {
+            "enabled": get_setting("PROFILING_ENABLED"),
+            "sample_rate": get_setting("PROFILING_SAMPLE_RATE"),
+            "output_dir": get_setting("PROFILING_OUTPUT_DIR"),
+            "dump_interval": get_setting("PROFILING_DUMP_INTERVAL"),
+        }
+    return _config
+
+@receiver(setting_changed)
+def _reset_config(setting, **kwargs):
+    global _config
+    if setting.startswith(SETTINGS_PREFIX + "PROFILING"):
+        _config = None
+
+def _get_profiler():
+    global _profiler, _exit_hook_registered
+    if _profiler is None:
+        _profiler = cProfile.Profile()
+        # Stats are written at exit only by processes which profiled something
+        if not _exit_hook_registered:
+            atexit.register(flush_stats)
+            _exit_hook_registered = True
+    return _profiler
+
+def _dump_loop():
+    while True:
+        _dump_requested.wait()
+        _dump_requested.clear()
+        try:
+            flush_stats()
+        except OSError:
+            pass
+
+def _request_dump():
+    global _dump_thread
+    with _lock:
+        if _dump_thread is None:
+            _dump_thread = threading.Thread(target=_dump_loop, name="bank-requisites-profiling", daemon=True)
+            _dump_thread.start()
+    _dump_requested.set()
+
+def _count_call():
+    global _profiled_calls
+    with _lock:
+        _profiled_calls += 1
+        profiled_calls = _profiled_calls
+    dump_interval = _get_config()["dump_interval"]
+    if dump_interval and _get_config()["output_dir"] and profiled_calls % dump_interval == 0:
+        _request_dump()
+
+### PUBLIC API ###
+
+def get_stats_path() -> str:
+    """
+    Returns path of the file with aggregated stats of the current process.
+    Stats can be read with pstats or snakeviz.
+    """
+    return os.path.join(_get_config()["output_dir"] or "", "bank_requisites_{}.prof".format(os.getpid()))
+
+def get_stats():
+    """
+    Returns aggregated pstats.Stats of sampled calls or None if nothing was profiled.
+    """
+    with _profiler_lock:
+        if not _profiled_calls:
+            return None
+        return pstats.Stats(_get_profiler())
+
+def flush_stats():
+    """
+    Writes aggregated stats to BANK_REQUISITES_PROFILING_OUTPUT_DIR.
+    """
+    stats = get_stats()
+    if stats is None:
+        return
+    output_dir = _get_config()["output_dir"]
+    if not output_dir:
+        return
+    os.makedirs(output_dir, exist_ok=True)
+    stats.dump_stats(get_stats_path())
+
+def reset_stats():
+    global _profiler, _profiled_calls
+    with _profiler_lock, _lock:
+        _profiler = None
+        _profiled_calls = 0
+
+def profiled(func):
+    """
+    Profiles a fraction of calls (BANK_REQUISITES_PROFILING_SAMPLE_RATE) of decorated function
+    with cProfile if BANK_REQUISITES_PROFILING_ENABLED is True.
+    Nested profiled calls are included in the stats of the outer call.
+    Only one call is profiled at a time, sample is skipped when profiler is busy
+    or another profiling tool is active. Stats are written by a background thread.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        config = _get_config()
+        if not config["enabled"] or random.random() >= config["sample_rate"]:
+            return func(*args, **kwargs)
+        # Profiler is busy (another thread or outer profiled call of this thread)
+        if not _profiler_lock.acquire(blocking=False):
+            return func(*args, **kwargs)
+        try:
+            profiler = _get_profiler()
+            try:
+                profiler.enable()
+            except (ValueError, RuntimeError):
+                # Another profiling tool is active, skip the sample
+                return func(*args, **kwargs)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.disable()
+                _count_call()
+        finally:
+            _profiler_lock.release()
+
+    return wrapper
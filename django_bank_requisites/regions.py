@@ -0,0 +1,193 @@
+import csv
+import typing
+from array import array
+
+from .base_validators import is_code_structure_valid
+
+# Names of regions by tax code of region (the first 2 digits of INN and KPP), index is the code
+REGION_NAMES = (None,) + (
+    "Республика Адыгея",
+    "Республика Башкортостан",
+    "Республика Бурятия",
+    "Республика Алтай",
+    "Республика Дагестан",
+    "Республика Ингушетия",
+    "Кабардино-Балкарская Республика",
+    "Республика Калмыкия",
+    "Карачаево-Черкесская Республика",
+    "Республика Карелия",
+    "Республика Коми",
+    "Республика Марий Эл",
+    "Республика Мордовия",
+    "Республика Саха (Якутия)",
+    "Республика Северная Осетия - Алания",
+    "Республика Татарстан",
+    "Республика Тыва",
+    "Удмуртская Республика",
+    "Республика Хакасия",
+    "Чеченская Республика",
+    "Чувашская Республика",
+    "Алтайский край",
+    "Краснодарский край",
+    "Красноярский край",
+    "Приморский край",
+    "Ставропольский край",
+    "Хабаровский край",
+    "Амурская область",
+    "Архангельская область",
+    "Астраханская область",
+    "Белгородская область",
+    "Брянская область",
+    "Владимирская область",
+    "Волгоградская область",
+    "Вологодская область",
+    "Воронежская область",
+    "Ивановская область",
+    "Иркутская область",
+    "Калининградская область",
+    "Калужская область",
+    "Камчатский край",
+    "Кемеровская область",
+    "Кировская область",
+    "Костромская область",
+    "Курганская область",
+    "Курская область",
+    "Ленинградская область",
+    "Липецкая область",
+    "Магаданская область",
+    "Московская область",
+    "Мурманская область",
+    "Нижегородская область",
+    "Новгородская область",
+    "Новосибирская область",
+    "Омская область",
+    "Оренбургская область",
+    "Орловская область",
+    "Пензенская область",
+    "Пермский край",
+    "Псковская область",
+    "Ростовская область",
+    "Рязанская область",
+    "Самарская область",
+    "Саратовская область",
+    "Сахалинская область",
+    "Свердловская область",
+    "Смоленская область",
+    "Тамбовская область",
+    "Тверская область",
+    "Томская область",
+    "Тульская область",
+    "Тюменская область",
+    "Ульяновская область",
+    "Челябинская область",
+    "Забайкальский край",
+    "Ярославская область",
+    "г. Москва",
+    "г. Санкт-Петербург",
+    "Еврейская автономная область",
+) + (None,) * 3 + (
+    "Ненецкий автономный округ",
+) + (None,) * 2 + (
+    "Ханты-Мансийский автономный округ - Югра",
+    "Чукотский автономный округ",
+    None,
+    "Ямало-Ненецкий автономный округ",
+    "Запорожская область",
+    "Республика Крым",
+    "г. Севастополь",
+    "Донецкая Народная Республика",
+    "Луганская Народная Республика",
+    "Херсонская область",
+) + (None,) * 3 + (
+    "Межрегиональные инспекции ФНС России",
+)
+REGION_CODE_LENGTH = 2
+TAX_OFFICE_CODE_LENGTH = 4
+
+### CODES ###
+
+def _prefix(code: str, length: int, code_lengths: tuple) -> typing.Optional[str]:
+    if not isinstance(code, str) or len(code) not in code_lengths or not is_code_structure_valid(code):
+        return None
+    return code[:length]
+
+def inn_region(inn: str) -> typing.Optional[str]:
+    """
+    Returns region code (the first 2 digits) of INN or None if INN is malformed.
+    """
+    return _prefix(inn, REGION_CODE_LENGTH, (10, 12))
+
+def inn_tax_office(inn: str) -> typing.Optional[str]:
+    """
+    Returns code of tax office which assigned INN (the first 4 digits) or None if INN is malformed.
+    """
+    return _prefix(inn, TAX_OFFICE_CODE_LENGTH, (10, 12))
+
+def kpp_tax_office(kpp: str) -> typing.Optional[str]:
+    """
+    Returns code of tax office where organization is registered (the first 4 digits of KPP)
+    or None if KPP is malformed.
+    """
+    return _prefix(kpp, TAX_OFFICE_CODE_LENGTH, (9,))
+
+def region_name(code: str) -> typing.Optional[str]:
+    """
+    Returns name of region by 2-digit region code or 4-digit tax office code.
+    """
+    if (not isinstance(code, str) or len(code) < REGION_CODE_LENGTH or
+        not is_code_structure_valid(code[:REGION_CODE_LENGTH])):
+        return None
+    return REGION_NAMES[int(code[:REGION_CODE_LENGTH])]
+
+### TAX OFFICES ###
+
+class TaxOfficeTable:
+    """
+    Names of tax offices by 4-digit code. Codes are indexes of packed array
+    of name numbers, so lookup doesn't hash strings.
+    """
+
+    def __init__(self, names: dict = None):
+        # Name number 0 means unknown code
+        self._index = array("H", bytes(2 * 10 ** TAX_OFFICE_CODE_LENGTH))
+        self._names = [None]
+        for code, name in (names or {}).items():
+            if len(code) != TAX_OFFICE_CODE_LENGTH or not is_code_structure_valid(code):
+                raise ValueError("Invalid tax office code: {}".format(code))
+            self._index[int(code)] = len(self._names)
+            self._names.append(name)
+
+    @classmethod
+    def from_csv(cls, path: str, delimiter: str = ";", encoding: str = "utf-8") -> "TaxOfficeTable":
+        """
+        Loads table from CSV file with code and name columns (e.g. SONO directory of FNS) without header.
+        """
+        with open(path, newline="", encoding=encoding) as f:
+            return cls({row[0].strip(): row[1].strip() for row in csv.reader(f, delimiter=delimiter) if row})
+
+    def __len__(self) -> int:
+        return len(self._names) - 1
+
+    def __contains__(self, code: str) -> bool:
+        return self.get(code) is not None
+
+    def get(self, code: str) -> typing.Optional[str]:
+        if not isinstance(code, str) or len(code) != TAX_OFFICE_CODE_LENGTH or not is_code_structure_valid(code):
+            return None
+        return self._names[self._index[int(code)]]
+
+tax_offices = TaxOfficeTable()
+
+def tax_office_name(code: str) -> typing.Optional[str]:
+    """
+    Returns name of tax office from module level table (see load_tax_offices).
+    """
+    return tax_offices.get(code)
+
+def load_tax_offices(path: str, **kwargs) -> TaxOfficeTable:
+    """
+    Replaces module level tax_offices table with table loaded from CSV file (see TaxOfficeTable.from_csv).
+    """
+    global tax_offices
+    tax_offices = TaxOfficeTable.from_csv(path, **kwargs)
+    return tax_offices
@@ -0,0 +1,66 @@
+import hashlib
+import json
+
+from django.core.cache import caches
+
+from . import __version__
+from .conf import get_setting
+
+KEY_PREFIX = "bank_requisites"
+COUNTERPARTY_NAMESPACE = "counterparty"
+
+### KEYS ###
+
+def content_key(namespace: str, content) -> str:
+    """
+    Returns cache key of JSON serializable content: hash of the content in namespace
+    of the package version, so results of older versions are never reused.
+    """
+    digest = hashlib.sha256(json.dumps(content, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+    return "{}:{}:{}:{}".format(KEY_PREFIX, __version__, namespace, digest)
+
+def get_result_cache():
+    """
+    Returns cache from BANK_REQUISITES_RESULT_CACHE alias (key of CACHES setting)
+    or None if the setting is not set.
+    """
+    alias = get_setting("RESULT_CACHE")
+    return caches[alias] if alias else None
+
+class SharedCache:
+    """
+    Namespace of Django cache with content hash keys.
+    """
+
+    def __init__(self, cache, namespace: str, timeout: int = None):
+        self.cache = cache
+        self.namespace = namespace
+        self.timeout = timeout
+
+    def get(self, content):
+        return self.cache.get(content_key(self.namespace, content))
+
+    def set(self, content, value):
+        self.cache.set(content_key(self.namespace, content), value, timeout=self.timeout)
+
+    def get_many(self, contents) -> dict:
+        """
+        Returns dict content -> value of found contents (contents must be hashable).
+        """
+        keys = {content_key(self.namespace, content): content for content in contents}
+        return {keys[key]: value for key, value in self.cache.get_many(list(keys)).items()}
+
+    def set_many(self, values: dict):
+        self.cache.set_many({content_key(self.namespace, content): value for content, value in values.items()},
+                            timeout=self.timeout)
+
+def get_shared_cache(namespace: str, timeout: int = None):
+    """
+    Returns SharedCache in the result cache or None if it is not configured.
+    By default timeout is BANK_REQUISITES_RESULT_CACHE_TIMEOUT.
+    """
+    cache = get_result_cache()
+    if cache is None:
+        return None
+    return SharedCache(cache, namespace,
+                       timeout=get_setting("RESULT_CACHE_TIMEOUT") if timeout is None else timeout)
@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Sent by deferred validation pool when background validation of an instance is finished.
+# Arguments: sender (model class), instance, errors (dict field -> list of messages)
+bank_details_validated = Signal()
+bank_details_validation_failed = Signal()
@@ -0,0 +1,144 @@
+import codecs
+import json
+import re
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = " \t\n\r"
+# Values which can be split between chunks: literals, numbers and \uXXXX escapes of strings
+LITERALS = ("true", "false", "null", "NaN", "Infinity", "-Infinity")
+NUMBER_TAIL = re.compile(r"[-+.eE0-9]+\Z")
+ESCAPE_TAIL = re.compile(r"u[0-9a-fA-F]{0,4}\Z")
+
+### HELPER FUNCS ###
+
+class _TextReader:
+    """
+    Reads text chunks from binary or text stream.
+    """
+
+    def __init__(self, stream, chunk_size: int, encoding: str):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder(encoding)()
+        self.eof = stream is None
+
+    def read(self) -> str:
+        if self.eof:
+            return ""
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return self.decoder.decode(b"", final=True)
+        if isinstance(chunk, str):
+            return chunk
+        return self.decoder.decode(chunk)
+
+def _skip_whitespace(buffer: str, pos: int) -> int:
+    while pos < len(buffer) and buffer[pos] in WHITESPACE:
+        pos += 1
+    return pos
+
+def _iter_ndjson(reader: _TextReader, buffer: str):
+    line_num = 0
+    while True:
+        lines = buffer.split("\n")
+        # The last line may be incomplete until the end of the stream
+        buffer = lines.pop()
+        for line in lines:
+            line_num += 1
+            if line.strip():
+                yield _loads_line(line, line_num)
+        chunk = reader.read()
+        if not chunk and reader.eof:
+            break
+        buffer += chunk
+    if buffer.strip():
+        yield _loads_line(buffer, line_num + 1)
+
+def _loads_line(line: str, line_num: int):
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        raise ValueError("Invalid JSON at line {}: {}".format(line_num, e))
+
+def _is_truncated(buffer: str, error: json.JSONDecodeError) -> bool:
+    """
+    Returns True if decoding error is caused by the end of the buffer,
+    so the value can be complete after the next chunk is read.
+    """
+    tail = buffer[error.pos:]
+    return bool(not tail or
+                error.msg.startswith("Unterminated string") or
+                any(literal.startswith(tail) for literal in LITERALS) or
+                NUMBER_TAIL.match(tail) or
+                ESCAPE_TAIL.match(tail))
+
+def _iter_json_array(reader: _TextReader, buffer: str):
+    decoder = json.JSONDecoder()
+    # Skip opening bracket
+    pos = buffer.index("[") + 1
+    expect_value = True
+    first = True
+    while True:
+        pos = _skip_whitespace(buffer, pos)
+        if pos < len(buffer):
+            char = buffer[pos]
+            if char == "]" and (first or not expect_value):
+                return
+            if not expect_value:
+                if char != ",":
+                    raise ValueError("Expected ',' or ']' at position {}".format(pos))
+                pos += 1
+                expect_value = True
+                continue
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                # Malformed value is reported at once, without reading the rest of the stream
+                if not _is_truncated(buffer, e):
+                    raise ValueError("Invalid JSON at position {}: {}".format(pos, e))
+                value, end = None, None
+            # Value must be followed by something, otherwise it can be incomplete (e.g. number)
+            if end is not None and (_skip_whitespace(buffer, end) < len(buffer) or reader.eof):
+                yield value
+                pos = end
+                expect_value = False
+                first = False
+                continue
+            if end is None and reader.eof:
+                raise ValueError("Invalid JSON at position {}".format(pos))
+        elif reader.eof:
+            raise ValueError("Unexpected end of JSON array")
+        # Need more data. Drop already processed part of the buffer
+        buffer = buffer[pos:] + reader.read()
+        pos = 0
+
+### STREAMING PARSER ###
+
+def iter_json_records(stream, chunk_size: int = CHUNK_SIZE, encoding: str = "utf-8"):
+    """
+    Incrementally parses JSON array or NDJSON (JSON Lines) from stream
+    and yields records one by one without reading the whole stream into memory.
+    The format is detected by the first non-whitespace character.
+
+    Params:
+            stream: Any object with read(size) method returning bytes or str
+            chunk_size (int): Size of chunks to read from stream
+            encoding (str): Encoding of binary stream
+
+    Raises ValueError on malformed input.
+    """
+    reader = _TextReader(stream, chunk_size, encoding)
+    buffer = ""
+    while True:
+        pos = _skip_whitespace(buffer, 0)
+        if pos < len(buffer) or reader.eof:
+            break
+        buffer += reader.read()
+    buffer = buffer[pos:]
+    if not buffer:
+        return
+    if buffer[0] == "[":
+        yield from _iter_json_array(reader, buffer)
+    else:
+        yield from _iter_ndjson(reader, buffer)
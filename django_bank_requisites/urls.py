@@ -0,0 +1,10 @@
+from django.urls import path
+
+from .views import BulkValidationView, CodeValidationView
+
+app_name = "bank_requisites"
+
+urlpatterns = [
+    path("validate/bulk/", BulkValidationView.as_view(), name="bulk-validation"),
+    path("validate/<str:kind>/<str:code>/", CodeValidationView.as_view(), name="code-validation"),
+]
@@ -0,0 +1,40 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+# Number of rows fetched from database at once by queryset iterator()
+DB_CHUNK_SIZE = 10000
+# Values used in payment documents when code is unknown
+EMPTY_VALUES = ("", "0")
+
+def split_tag(tag: str) -> tuple:
+    """
+    Returns (namespace, local name) of XML element tag.
+    """
+    if tag.startswith("{"):
+        namespace, _, name = tag[1:].partition("}")
+        return namespace, name
+    return "", tag
+
+def local_name(tag: str) -> str:
+    """
+    Returns XML element tag without namespace (namespaces differ between message versions).
+    """
+    return split_tag(tag)[1]
+
+@contextmanager
+def atomic_write(path: str, prefix: str = ".tmp-"):
+    """
+    Yields binary file opened in the directory of path, which replaces path on exit,
+    so processes which read it at the same time never see a partial file.
+    The temporary file is removed on error.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=prefix)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
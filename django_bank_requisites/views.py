@@ -0,0 +1,134 @@
+import hashlib
+import json
+from functools import lru_cache
+
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import __version__
+from .base_validators import (is_inn_valid,
+                              is_kpp_valid,
+                              is_ogrn_valid,
+                              is_bik_valid,
+                              is_rs_valid,
+                              is_ks_valid,
+                              normalize_code)
+from .conf import get_setting
+from .serializers import BankDetailsSerializer
+from .streaming import iter_json_records
+
+CODE_VALIDATORS = {
+    "inn": is_inn_valid,
+    "kpp": is_kpp_valid,
+    "ogrn": is_ogrn_valid,
+    "bik": is_bik_valid,
+}
+# These validators also need BIK
+BANK_ACCOUNT_VALIDATORS = {
+    "rs": is_rs_valid,
+    "ks": is_ks_valid,
+}
+CODE_CACHE_SIZE = 65536
+
+### HELPER FUNCS ###
+
+@lru_cache(maxsize=CODE_CACHE_SIZE)
+def _validate_code(kind: str, code: str, bik: str) -> tuple:
+    """
+    Validates single code and returns (response data, ETag).
+    Result of validation never changes for the same input and package version,
+    so it is cached in process.
+    """
+    if kind in BANK_ACCOUNT_VALIDATORS:
+        valid = BANK_ACCOUNT_VALIDATORS[kind](code, bik)
+        data = {"kind": kind, "code": code, "bik": bik, "valid": valid}
+    else:
+        valid = CODE_VALIDATORS[kind](code)
+        data = {"kind": kind, "code": code, "valid": valid}
+    digest = hashlib.sha1("{}:{}:{}:{}:{}".format(__version__, kind, code, bik, valid).encode()).hexdigest()
+    return data, '"{}"'.format(digest)
+
+class BulkValidationView(APIView):
+    """
+    Validates large JSON array or NDJSON body of bank details records.
+
+    Records are read from request stream and validated one by one,
+    results are streamed back as NDJSON lines while they are computed:
+
+    {"index": 0, "valid": true}
+    {"index": 1, "valid": false, "errors": {"rs": ["..."]}}
+
+    If the body is malformed, the last line contains {"error": "..."}.
+    """
+
+    serializer_class = BankDetailsSerializer
+    # Remove spaces and dashes from codes and replace full-width digits
+    normalize_codes = True
+    # Body is parsed incrementally from request stream, not by DRF parsers
+    parser_classes = []
+    content_type = "application/x-ndjson"
+
+    def post(self, request, *args, **kwargs):
+        records = iter_json_records(request.stream)
+        return StreamingHttpResponse(self.iter_results(records), content_type=self.content_type)
+
+    def validate_record(self, record) -> dict:
+        serializer = self.serializer_class(data=record)
+        serializer.normalize_codes = self.normalize_codes
+        if serializer.is_valid():
+            return {"valid": True}
+        return {"valid": False, "errors": serializer.errors}
+
+    def iter_results(self, records):
+        try:
+            for index, record in enumerate(records):
+                result = {"index": index}
+                result.update(self.validate_record(record))
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+        except ValueError as e:
+            yield json.dumps({"error": str(e)}, ensure_ascii=False) + "\n"
+
+class CodeValidationView(APIView):
+    """
+    Read-only validation of a single code with base validators:
+
+    GET validate/inn/<code>/
+    GET validate/rs/<code>/?bik=<bik>
+
+    Codes are normalized (spaces and dashes are removed, full-width digits are replaced).
+    Responses are deterministic, so they have strong ETag and long Cache-Control
+    lifetime and can be cached by browsers and CDN. Authentication is disabled
+    for the same reason, override authentication_classes and permission_classes
+    if needed. Responses are always rendered as JSON, so ETag of the body
+    doesn't depend on Accept header.
+    """
+
+    authentication_classes = []
+    permission_classes = []
+    renderer_classes = [JSONRenderer]
+
+    def get(self, request, kind, code, *args, **kwargs):
+        if kind not in CODE_VALIDATORS and kind not in BANK_ACCOUNT_VALIDATORS:
+            raise NotFound()
+        code = normalize_code(code)
+        bik = ""
+        if kind in BANK_ACCOUNT_VALIDATORS:
+            bik = normalize_code(request.query_params.get("bik", ""))
+            if not bik:
+                raise ValidationError({"bik": ["This query parameter is required."]})
+        data, etag = _validate_code(kind, code, bik)
+
+        if etag in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", "")):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(dict(data))
+        response["ETag"] = etag
+        patch_cache_control(response, public=True, immutable=True,
+                            max_age=get_setting("CODE_VALIDATION_MAX_AGE"))
+        return response
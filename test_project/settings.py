@@ -40,6 +40,7 @@ INSTALLED_APPS = [
 
     # Third party apps
     'rest_framework',
+    'django_bank_requisites',
 
     # Your apps
     'test_project.test_app',
@@ -0,0 +1,36 @@
+# Generated by Django 4.0.6 on 2026-10-19 12:00
+
+from django.db import migrations, models
+import django_bank_requisites.django_validators
+import django_bank_requisites.mixins
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('test_app', '0001_org_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegionalOrganization',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('legal_address', models.CharField(max_length=255, verbose_name='Legal address')),
+                ('inn', models.CharField(max_length=12, unique=True, validators=[django_bank_requisites.django_validators.validate_inn], verbose_name='INN')),
+                ('kpp', models.CharField(max_length=9, validators=[django_bank_requisites.django_validators.validate_kpp], verbose_name='KPP')),
+                ('rs', models.CharField(max_length=20, unique=True, validators=[django_bank_requisites.django_validators.validate_rs], verbose_name='RS')),
+                ('ks', models.CharField(blank=True, max_length=20, validators=[django_bank_requisites.django_validators.validate_ks], verbose_name='KS')),
+                ('bik', models.CharField(max_length=9, validators=[django_bank_requisites.django_validators.validate_bik], verbose_name='BIK')),
+                ('bank_name', models.CharField(max_length=255, verbose_name='Bank name')),
+                ('inn_region', models.CharField(blank=True, db_index=True, editable=False, max_length=2, verbose_name='INN region')),
+                ('inn_tax_office', models.CharField(blank=True, db_index=True, editable=False, max_length=4, verbose_name='INN tax office')),
+                ('kpp_tax_office', models.CharField(blank=True, db_index=True, editable=False, max_length=4, verbose_name='KPP tax office')),
+                ('organization_name', models.CharField(max_length=255, verbose_name='Organization name')),
+            ],
+            options={
+                'abstract': False,
+            },
+            bases=(django_bank_requisites.mixins.SaveMethodMixin, models.Model),
+        ),
+    ]
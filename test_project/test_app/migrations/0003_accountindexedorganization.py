@@ -0,0 +1,32 @@
+# Generated by Django 4.0.6 on 2026-10-19 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('test_app', '0002_regionalorganization'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountIndexedOrganization',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('legal_address', models.CharField(max_length=255, verbose_name='Legal address')),
+                ('inn', models.CharField(max_length=12, unique=True, verbose_name='INN')),
+                ('kpp', models.CharField(max_length=9, verbose_name='KPP')),
+                ('rs', models.CharField(max_length=20, unique=True, verbose_name='RS')),
+                ('ks', models.CharField(blank=True, max_length=20, verbose_name='KS')),
+                ('bik', models.CharField(max_length=9, verbose_name='BIK')),
+                ('bank_name', models.CharField(max_length=255, verbose_name='Bank name')),
+                ('rs_balance_account', models.CharField(blank=True, db_index=True, editable=False, max_length=5, verbose_name='RS balance account')),
+                ('rs_currency', models.CharField(blank=True, db_index=True, editable=False, max_length=3, verbose_name='RS currency')),
+                ('organization_name', models.CharField(max_length=255, verbose_name='Organization name')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
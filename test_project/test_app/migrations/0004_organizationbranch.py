@@ -0,0 +1,35 @@
+# Generated by Django 4.0.6 on 2026-10-19 14:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django_bank_requisites.django_validators
+import django_bank_requisites.mixins
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('test_app', '0003_accountindexedorganization'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrganizationBranch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('legal_address', models.CharField(max_length=255, verbose_name='Legal address')),
+                ('inn', models.CharField(max_length=12, unique=True, validators=[django_bank_requisites.django_validators.validate_inn], verbose_name='INN')),
+                ('kpp', models.CharField(max_length=9, validators=[django_bank_requisites.django_validators.validate_kpp], verbose_name='KPP')),
+                ('rs', models.CharField(max_length=20, unique=True, validators=[django_bank_requisites.django_validators.validate_rs], verbose_name='RS')),
+                ('ks', models.CharField(blank=True, max_length=20, validators=[django_bank_requisites.django_validators.validate_ks], verbose_name='KS')),
+                ('bik', models.CharField(max_length=9, validators=[django_bank_requisites.django_validators.validate_bik], verbose_name='BIK')),
+                ('bank_name', models.CharField(max_length=255, verbose_name='Bank name')),
+                ('organization_name', models.CharField(max_length=255, verbose_name='Organization name')),
+                ('head', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='branches', to='test_app.organizationvalidated', verbose_name='Head organization')),
+            ],
+            options={
+                'abstract': False,
+            },
+            bases=(django_bank_requisites.mixins.SaveMethodMixin, models.Model),
+        ),
+    ]
@@ -1,5 +1,9 @@
 from django.db import models
-from django_bank_requisites.models import BankDetailsValidated, BankDetailsUnvalidated
+from django_bank_requisites.managers import DerivedFieldsManager
+from django_bank_requisites.models import (BankDetailsValidated,
+                                           BankDetailsUnvalidated,
+                                           RegionIndexMixin,
+                                           AccountIndexMixin)
 from django_bank_requisites.mixins import SaveMethodMixin
 
 class OrganizationValidated(SaveMethodMixin, BankDetailsValidated):
@@ -14,4 +18,30 @@ class OrganizationUnvalidated(BankDetailsUnvalidated):
     If you use unvalidated model don't forget to add BankDetailsValidationMixin to your serializer.
     """
 
-    organization_name = models.CharField(verbose_name='Organization name', max_length=255)
\ No newline at end of file
+    organization_name = models.CharField(verbose_name='Organization name', max_length=255)
+
+class RegionalOrganization(RegionIndexMixin, SaveMethodMixin, BankDetailsValidated):
+    """
+    Model with indexed region and tax office codes of INN and KPP.
+    """
+
+    organization_name = models.CharField(verbose_name='Organization name', max_length=255)
+
+class AccountIndexedOrganization(AccountIndexMixin, BankDetailsUnvalidated):
+    """
+    Model with indexed balance account and currency of RS.
+    Unvalidated model needs DerivedFieldsManager to fill these columns in bulk operations.
+    """
+
+    organization_name = models.CharField(verbose_name='Organization name', max_length=255)
+
+    objects = DerivedFieldsManager()
+
+class OrganizationBranch(SaveMethodMixin, BankDetailsValidated):
+    """
+    Model with foreign key to validated model.
+    """
+
+    organization_name = models.CharField(verbose_name='Organization name', max_length=255)
+    head = models.ForeignKey(OrganizationValidated, verbose_name='Head organization', on_delete=models.CASCADE,
+                             related_name='branches')
@@ -1,7 +1,7 @@
 from rest_framework import serializers
-from django_bank_requisites.mixins import BankDetailsValidationMixin
+from django_bank_requisites.mixins import BankDetailsValidationMixin, ValidatedModelSerializerMixin
 
-from .models import OrganizationValidated, OrganizationUnvalidated
+from .models import OrganizationBranch, OrganizationValidated, OrganizationUnvalidated
 
 class UnvalidatedModelSerializer(BankDetailsValidationMixin, serializers.ModelSerializer):
     """
@@ -21,4 +21,22 @@ class ValidatedModelSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = OrganizationValidated
-        fields = "__all__"
\ No newline at end of file
+        fields = "__all__"
+
+class SinglePassModelSerializer(ValidatedModelSerializerMixin, serializers.ModelSerializer):
+    """
+    Model validation runs once in is_valid(), save() doesn't repeat it.
+    """
+
+    class Meta:
+        model = OrganizationValidated
+        fields = "__all__"
+
+class BranchModelSerializer(ValidatedModelSerializerMixin, serializers.ModelSerializer):
+    """
+    Single-pass serializer of model with foreign key.
+    """
+
+    class Meta:
+        model = OrganizationBranch
+        fields = "__all__"
@@ -0,0 +1,45 @@
+from django.test import TestCase
+
+from django_bank_requisites import accounts
+from test_project.test_app.models import AccountIndexedOrganization
+
+class AccountIndexTestCase(TestCase):
+    """
+    Tests for indexed balance account and currency columns of AccountIndexMixin.
+    """
+
+    def setUp(self):
+        self.data = {
+            "organization_name": "ООО ‟ГидроТеплоСервис‟",
+            "legal_address": "107078, г Москва, пер. Б.Козловский, дом 5, стр.2",
+            "inn": "7701992807",
+            "kpp": "770101001",
+            "rs": "40702810100020002772",
+            "ks": "30101810000000000201",
+            "bik": "044525201",
+            "bank_name": "ПАО АКБ ‟Авангард‟"
+        }
+
+    def test_save(self):
+        organization = AccountIndexedOrganization.objects.create(**self.data)
+        organization.refresh_from_db()
+        self.assertEqual((organization.rs_balance_account, organization.rs_currency), ("40702", "810"))
+        self.assertEqual(organization.get_account_category(), accounts.SETTLEMENT)
+
+    def test_category_filter(self):
+        AccountIndexedOrganization.objects.bulk_create([
+            AccountIndexedOrganization(**self.data),
+            AccountIndexedOrganization(**dict(self.data, inn="7736207543", rs="40817810000000000001")),
+            AccountIndexedOrganization(**dict(self.data, inn="7707083893", rs="03100643000000017300")),
+        ])
+        for category, inn in ((accounts.SETTLEMENT, "7701992807"),
+                              (accounts.PERSONAL, "7736207543"),
+                              (accounts.TREASURY, "7707083893")):
+            queryset = AccountIndexedOrganization.objects.filter(AccountIndexedOrganization.account_category_q(category))
+            self.assertEqual(list(queryset.values_list("inn", flat=True)), [inn])
+        self.assertFalse(AccountIndexedOrganization.objects.filter(
+            AccountIndexedOrganization.account_category_q(accounts.DEPOSIT)).exists())
+        self.assertEqual(AccountIndexedOrganization.objects.filter(rs_currency="643").count(), 1)
+
+        AccountIndexedOrganization.objects.filter(inn="7736207543").update(rs="42301810000000000001")
+        self.assertEqual(AccountIndexedOrganization.objects.get(inn="7736207543").rs_balance_account, "42301")
@@ -0,0 +1,91 @@
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from rest_framework import serializers
+from rest_framework.validators import UniqueTogetherValidator, UniqueValidator
+
+from django_bank_requisites.django_validators import error_messages
+from django_bank_requisites.mixins import BankDetailsValidationMixin
+from test_project.test_app.models import OrganizationValidated
+
+class ValidatedModelMixinSerializer(BankDetailsValidationMixin, serializers.ModelSerializer):
+
+    class Meta:
+        model = OrganizationValidated
+        fields = "__all__"
+
+class RelatedFieldSerializer(ValidatedModelMixinSerializer):
+    # Fields and validators which query database in is_valid()
+    parent = serializers.PrimaryKeyRelatedField(queryset=OrganizationValidated.objects.all(), write_only=True)
+
+    class Meta(ValidatedModelMixinSerializer.Meta):
+        validators = [UniqueTogetherValidator(queryset=OrganizationValidated.objects.all(), fields=("kpp", "bik"))]
+
+class AsyncValidationTestCase(TestCase):
+    """
+    Tests for aclean(), afull_clean(), asave() and ais_valid().
+    """
+
+    def setUp(self):
+        self.data = {
+            "organization_name": "ООО ‟ГидроТеплоСервис‟",
+            "legal_address": "107078, г Москва, пер. Б.Козловский, дом 5, стр.2",
+            "inn": "7701992807",
+            "kpp": "770101001",
+            "rs": "40702810100020002772",
+            "ks": "30101810000000000201",
+            "bik": "044525201",
+            "bank_name": "ПАО АКБ ‟Авангард‟"
+        }
+
+    async def test_asave(self):
+        await OrganizationValidated(**self.data).asave()
+        self.assertEqual(await OrganizationValidated.objects.acount(), 1)
+
+        organization = OrganizationValidated(**dict(self.data, inn="7702038150", ks="30101810000000000200"))
+        with self.assertRaises(ValidationError) as context:
+            await organization.asave()
+        self.assertEqual(context.exception.message_dict["ks"], [error_messages["ks_last_3"]])
+        self.assertEqual(await OrganizationValidated.objects.acount(), 1)
+
+    async def test_afull_clean(self):
+        await OrganizationValidated.objects.acreate(**self.data)
+        organization = OrganizationValidated(**dict(self.data, kpp="7701010011"))
+        with self.assertRaises(ValidationError) as context:
+            await organization.afull_clean()
+        self.assertEqual(set(context.exception.message_dict), {"inn", "rs", "kpp"})
+
+        # Saved instance doesn't conflict with itself
+        organization = await OrganizationValidated.objects.aget(inn=self.data["inn"])
+        await organization.afull_clean()
+
+    async def test_ais_valid(self):
+        serializer = ValidatedModelMixinSerializer(data=self.data)
+        self.assertTrue(await serializer.ais_valid())
+        await OrganizationValidated.objects.acreate(**serializer.validated_data)
+
+        serializer = ValidatedModelMixinSerializer(data=self.data)
+        self.assertFalse(await serializer.ais_valid())
+        self.assertEqual(set(serializer.errors), {"inn", "rs"})
+        self.assertEqual(serializer.errors["inn"][0].code, "unique")
+        # Unique validators are restored
+        validators = serializer.fields["inn"].validators
+        self.assertTrue(any(isinstance(validator, UniqueValidator) for validator in validators))
+
+        serializer = ValidatedModelMixinSerializer(data=dict(self.data, rs="40702810100020002773"))
+        self.assertFalse(await serializer.ais_valid())
+        self.assertEqual(serializer.errors["rs"], [error_messages["check_num_bik"]])
+
+    async def test_ais_valid_with_db_validators(self):
+        parent = await OrganizationValidated.objects.acreate(**self.data)
+        data = dict(self.data, inn="7702038150", rs="40702810100020002701", kpp="770201001", parent=parent.pk)
+        serializer = RelatedFieldSerializer(data=data)
+        self.assertTrue(await serializer.ais_valid(), serializer.errors)
+        self.assertEqual(serializer.validated_data["parent"], parent)
+
+        serializer = RelatedFieldSerializer(data=dict(data, kpp=self.data["kpp"]))
+        self.assertFalse(await serializer.ais_valid())
+        self.assertEqual(serializer.errors["non_field_errors"][0].code, "unique")
+
+        serializer = RelatedFieldSerializer(data=dict(data, parent=parent.pk + 1))
+        self.assertFalse(await serializer.ais_valid())
+        self.assertEqual(serializer.errors["parent"][0].code, "does_not_exist")
@@ -0,0 +1,111 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError as DRFValidationError
+
+from test_project.test_app.models import OrganizationValidated
+from django_bank_requisites.bloom import reset_unique_filter, get_unique_filter
+from django_bank_requisites.mixins import BloomUniqueCheckMixin, BloomUniqueValidatorMixin
+
+class BloomOrganization(BloomUniqueCheckMixin, OrganizationValidated):
+
+    class Meta:
+        proxy = True
+        app_label = "test_app"
+
+class BloomSerializer(BloomUniqueValidatorMixin, serializers.ModelSerializer):
+
+    class Meta:
+        model = OrganizationValidated
+        fields = "__all__"
+
+class BloomUniqueCheckTestCase(TestCase):
+    """
+    Tests for bloom filter pre-check of inn and rs uniqueness.
+    """
+
+    def setUp(self):
+        self.data = {
+            "organization_name": "ГУП ‟Московский метрополитен‟",
+            "legal_address": "129110, город Москва, пр-кт Мира, д. 41 стр. 2",
+            "inn": "7702038150",
+            "kpp": "770201001",
+            "rs": "40602810900070000003",
+            "ks": "30101810500000000219",
+            "bik": "044525219",
+            "bank_name": "ОАО ‟Банк Москвы‟ г. Москва"
+        }
+        OrganizationValidated.objects.create(**self.data)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "bloom.bin")
+        call_command("build_bloom_filter", "test_app.OrganizationValidated", "--output", self.path, stdout=StringIO())
+        reset_unique_filter()
+
+    def tearDown(self):
+        reset_unique_filter()
+        self.tmp_dir.cleanup()
+
+    def test_model_validate_unique(self):
+        with override_settings(BANK_REQUISITES_BLOOM_FILTER_PATH=self.path):
+            # New values: no queries
+            org = BloomOrganization(**dict(self.data, inn="7705002602", rs="40602810900070000045"))
+            with CaptureQueriesContext(connection) as queries:
+                org.validate_unique()
+            self.assertEqual(len(queries), 0)
+
+            # Existing value is still checked in database
+            org = BloomOrganization(**dict(self.data, rs="40602810900070000045"))
+            with self.assertRaises(ValidationError) as e:
+                org.validate_unique()
+            self.assertIn("inn", e.exception.message_dict)
+            self.assertNotIn("rs", e.exception.message_dict)
+
+            # Saved values are added to the filter
+            org = BloomOrganization(**dict(self.data, inn="7705002602", rs="40602810900070000045"))
+            org.save()
+            self.assertIn("inn:7705002602", get_unique_filter())
+
+    def test_serializer_unique_validator(self):
+        with override_settings(BANK_REQUISITES_BLOOM_FILTER_PATH=self.path):
+            serializer = BloomSerializer(data=self.data)
+            self.assertFalse(serializer.is_valid())
+            self.assertIn("inn", serializer.errors)
+            self.assertIn("rs", serializer.errors)
+
+            serializer = BloomSerializer(data=dict(self.data, inn="7705002602", rs="40602810900070000045"))
+            with CaptureQueriesContext(connection) as queries:
+                self.assertTrue(serializer.is_valid())
+            self.assertEqual(len(queries), 0)
+
+    def test_duplicate_unknown_to_filter(self):
+        # Row saved by another process after the filter was built
+        duplicate = dict(self.data, inn="7705002602", rs="40602810900070000045")
+        OrganizationValidated.objects.create(**duplicate)
+        with override_settings(BANK_REQUISITES_BLOOM_FILTER_PATH=self.path):
+            with self.assertRaises(ValidationError) as e:
+                BloomOrganization(**duplicate).save()
+            self.assertEqual(set(e.exception.message_dict), {"inn", "rs"})
+            # Found values are added to the filter
+            self.assertIn("rs:40602810900070000045", get_unique_filter())
+
+        reset_unique_filter()
+        with override_settings(BANK_REQUISITES_BLOOM_FILTER_PATH=self.path):
+            serializer = BloomSerializer(data=duplicate)
+            self.assertTrue(serializer.is_valid())
+            with self.assertRaises(DRFValidationError) as e:
+                serializer.save()
+            self.assertEqual(set(e.exception.detail), {"inn", "rs"})
+            self.assertEqual(e.exception.detail["inn"][0].code, "unique")
+            self.assertEqual(OrganizationValidated.objects.count(), 2)
+
+    def test_without_filter(self):
+        org = BloomOrganization(**dict(self.data, rs="40602810900070000045"))
+        with self.assertRaises(ValidationError):
+            org.validate_unique()
@@ -0,0 +1,123 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from test_project.test_app.models import OrganizationValidated
+from django_bank_requisites.django_validators import error_messages
+
+class RegistryStubHandler(BaseHTTPRequestHandler):
+    """
+    Tax registry stub: 7702038150 is active, 7707083893 is not active, other INNs are not registered.
+    """
+
+    protocol_version = "HTTP/1.1"
+    registry = {
+        "7702038150": {"registered": True, "active": True},
+        "7707083893": {"registered": True, "active": False},
+    }
+    requests = []
+
+    def _respond(self, status: int, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.requests.append(self.path)
+        code = self.path.rsplit("/", 1)[-1]
+        if code in self.registry:
+            self._respond(200, self.registry[code])
+        else:
+            self._respond(404, {})
+
+    def do_POST(self):
+        self.requests.append(self.path)
+        codes = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["codes"]
+        self._respond(200, {"results": {code: self.registry[code] for code in codes if code in self.registry}})
+
+    def log_message(self, *args):
+        pass
+
+class CounterpartyCheckTestCase(TestCase):
+    """
+    Tests for check of INN in tax registry in BankDetailsValidated.clean().
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), RegistryStubHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = "http://127.0.0.1:{}".format(cls.server.server_address[1])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        RegistryStubHandler.requests = []
+        self.data = {
+            "organization_name": "ГУП ‟Московский метрополитен‟",
+            "legal_address": "129110, город Москва, пр-кт Мира, д. 41 стр. 2",
+            "inn": "7702038150",
+            "kpp": "770201001",
+            "rs": "40602810900070000003",
+            "ks": "30101810500000000219",
+            "bik": "044525219",
+            "bank_name": "Банк ВТБ (ПАО)",
+        }
+
+    def test_check_is_disabled_by_default(self):
+        OrganizationValidated(**dict(self.data, inn="7707083893")).full_clean()
+        self.assertEqual(RegistryStubHandler.requests, [])
+
+    def test_clean(self):
+        with self.settings(BANK_REQUISITES_COUNTERPARTY_CHECK=True,
+                           BANK_REQUISITES_COUNTERPARTY_BASE_URL=self.base_url):
+            OrganizationValidated(**self.data).full_clean()
+            with self.assertRaises(ValidationError) as cm:
+                OrganizationValidated(**dict(self.data, inn="7707083893")).full_clean()
+            self.assertEqual(cm.exception.message_dict["inn"], [error_messages["inactive"]])
+            with self.assertRaises(ValidationError) as cm:
+                OrganizationValidated(**dict(self.data, inn="7736207543")).full_clean()
+            self.assertEqual(cm.exception.message_dict["inn"], [error_messages["not_registered"]])
+            # Statuses are cached
+            OrganizationValidated(**self.data).full_clean()
+            self.assertEqual(len(RegistryStubHandler.requests), 3)
+
+    def test_unavailable_registry_is_skipped(self):
+        with self.settings(BANK_REQUISITES_COUNTERPARTY_CHECK=True,
+                           BANK_REQUISITES_COUNTERPARTY_BASE_URL="http://127.0.0.1:1",
+                           BANK_REQUISITES_COUNTERPARTY_TIMEOUT=1):
+            OrganizationValidated(**self.data).full_clean()
+
+    def test_bulk_create_requests_statuses_in_bulk(self):
+        with self.settings(BANK_REQUISITES_COUNTERPARTY_CHECK=True,
+                           BANK_REQUISITES_COUNTERPARTY_BASE_URL=self.base_url):
+            objs = [OrganizationValidated(**self.data),
+                    OrganizationValidated(**dict(self.data, inn="7707083893", rs="40702810100020002772"))]
+            OrganizationValidated.validated.bulk_create(objs, invalid_rows="skip")
+        self.assertEqual(RegistryStubHandler.requests, ["/counterparties/bulk"])
+        self.assertEqual(OrganizationValidated.objects.count(), 1)
+        self.assertIn("inn", objs[1].validation_errors)
+
+    def test_update_loads_inn_with_rows(self):
+        OrganizationValidated.objects.bulk_create([
+            OrganizationValidated(**self.data),
+            OrganizationValidated(**dict(self.data, inn="7707083893", rs="40602810900070000016")),
+        ])
+        with self.settings(BANK_REQUISITES_COUNTERPARTY_CHECK=True,
+                           BANK_REQUISITES_COUNTERPARTY_BASE_URL=self.base_url):
+            # INN is read by the query of rows, not by a query per row
+            with self.assertNumQueries(2):
+                updated = OrganizationValidated.validated.validated_update({"ks": self.data["ks"]},
+                                                                           invalid_rows="skip")
+        self.assertEqual(updated, 1)
+        self.assertEqual(RegistryStubHandler.requests, ["/counterparties/bulk"])
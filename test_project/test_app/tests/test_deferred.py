@@ -0,0 +1,111 @@
+import multiprocessing
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from test_project.test_app.models import OrganizationValidated
+from django_bank_requisites.deferred import (DeferredValidationPool,
+                                             _init_process_worker,
+                                             set_default_pool,
+                                             PENDING, VALID, INVALID)
+from django_bank_requisites.django_validators import error_messages
+from django_bank_requisites.signals import bank_details_validation_failed
+
+@override_settings(BANK_REQUISITES_DEFERRED_VALIDATION=True)
+class DeferredValidationTestCase(TestCase):
+    """
+    Tests for deferred (background) validation of models with SaveMethodMixin.
+    """
+
+    def setUp(self):
+        # Unique checks are made by DB constraints in tests,
+        # because worker threads don't see data of the test transaction
+        self.pool = DeferredValidationPool(kind="thread", max_workers=2, validate_unique=False)
+        set_default_pool(self.pool)
+        self.data = {
+            "organization_name": "ГУП ‟Московский метрополитен‟",
+            "legal_address": "129110, город Москва, пр-кт Мира, д. 41 стр. 2",
+            "inn": "7702038150",
+            "kpp": "770201001",
+            "rs": "40602810900070000003",
+            "ks": "30101810500000000219",
+            "bik": "044525219",
+            "bank_name": "ОАО ‟Банк Москвы‟ г. Москва"
+        }
+        self.failed = []
+        bank_details_validation_failed.connect(self.on_failed)
+
+    def tearDown(self):
+        bank_details_validation_failed.disconnect(self.on_failed)
+        set_default_pool(None)
+
+    def on_failed(self, sender, instance, errors, **kwargs):
+        self.failed.append((instance.pk, errors))
+
+    def test_valid_instance(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            org = OrganizationValidated.objects.create(**self.data)
+            self.assertEqual(org.validation_status, PENDING)
+        self.pool.wait()
+        self.assertEqual(self.pool.status(org), VALID)
+        self.assertEqual(self.pool.errors(org), {})
+        self.assertEqual(self.failed, [])
+
+    def test_invalid_instance_is_saved_and_reported(self):
+        # Invalid RS check num is accepted immediately
+        self.data["rs"] = "40602810900070000004"
+        with self.captureOnCommitCallbacks(execute=True):
+            org = OrganizationValidated.objects.create(**self.data)
+        self.assertEqual(OrganizationValidated.objects.count(), 1)
+        self.pool.wait()
+        self.assertEqual(self.pool.status(org), INVALID)
+        self.assertIn(error_messages["check_num_bik"], self.pool.errors(org)["rs"])
+        self.assertEqual(len(self.failed), 1)
+        self.assertEqual(self.failed[0][0], org.pk)
+
+    def test_inline_validation_per_model(self):
+        # Model attribute has priority over the setting
+        self.data["rs"] = "40602810900070000004"
+        org = OrganizationValidated(**self.data)
+        org.deferred_validation = False
+        with self.assertRaises(ValidationError):
+            org.save()
+        self.assertEqual(OrganizationValidated.objects.count(), 0)
+
+    def test_results_are_evicted(self):
+        pool = DeferredValidationPool(kind="sync", validate_unique=False, max_results=1)
+        org = OrganizationValidated.objects.create(**self.data)
+        other = OrganizationValidated.objects.create(**dict(self.data, inn="7736207543", rs="40602810900070000016"))
+        pool.submit(org)
+        self.assertEqual(pool.status(org), VALID)
+        pool.submit(other)
+        self.assertIsNone(pool.status(org))
+        self.assertEqual(pool.status(other), VALID)
+        self.assertEqual(len(pool._results), 1)
+
+    def test_process_pool(self):
+        invalid = OrganizationValidated.objects.create(**dict(self.data, rs="40602810900070000004"))
+        for context in ("fork", "spawn"):
+            # Spawned workers set up Django in initializer
+            pool = DeferredValidationPool(kind="process", max_workers=1, validate_unique=False,
+                                          mp_context=multiprocessing.get_context(context))
+            try:
+                pool.submit(invalid).result(timeout=60)
+                pool.wait()
+            finally:
+                pool.shutdown()
+            self.assertEqual(pool.status(invalid), INVALID)
+            self.assertIn(error_messages["check_num_bik"], pool.errors(invalid)["rs"])
+        # Connection of the parent is still usable
+        self.assertEqual(OrganizationValidated.objects.count(), 1)
+        self.assertTrue(connection.is_usable())
+
+    def test_process_worker_forgets_inherited_connections(self):
+        connection.ensure_connection()
+        wrapper = connection.connection
+        with mock.patch("django.setup"):
+            _init_process_worker()
+        self.assertIsNone(connection.connection)
+        connection.connection = wrapper
@@ -0,0 +1,124 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from test_project.test_app.models import OrganizationValidated
+from django_bank_requisites.django_validators import error_messages
+from django_bank_requisites import managers
+from django_bank_requisites.managers import BulkValidationError
+
+class BankDetailsQuerySetTestCase(TestCase):
+    """
+    Tests for validated bulk operations of BankDetailsValidated validated manager.
+    """
+
+    def setUp(self):
+        self.data = {
+            "organization_name": "ГУП ‟Московский метрополитен‟",
+            "legal_address": "129110, город Москва, пр-кт Мира, д. 41 стр. 2",
+            "inn": "7702038150",
+            "kpp": "770201001",
+            "rs": "40602810900070000003",
+            "ks": "30101810500000000219",
+            "bik": "044525219",
+            "bank_name": "ОАО ‟Банк Москвы‟ г. Москва"
+        }
+        self.other = dict(self.data, inn="7705002602", rs="40602810900070000045", ks="30101810145250000411", bik="044525411")
+
+    def test_bulk_create_valid(self):
+        objs = OrganizationValidated.validated.bulk_create([OrganizationValidated(**self.data),
+                                                          OrganizationValidated(**self.other)])
+        self.assertEqual(len(objs), 2)
+        self.assertEqual(OrganizationValidated.objects.count(), 2)
+
+    def test_bulk_create_raise(self):
+        OrganizationValidated.objects.create(**self.data)
+        objs = [
+            OrganizationValidated(**self.other),
+            # Existing INN and RS
+            OrganizationValidated(**self.data),
+            # Invalid RS check num and duplicate INN in batch
+            OrganizationValidated(**dict(self.other, rs="40602810900070000046")),
+        ]
+        with self.assertRaises(BulkValidationError) as e:
+            OrganizationValidated.validated.bulk_create(objs)
+        row_errors = e.exception.row_errors
+        self.assertEqual(set(row_errors), {1, 2})
+        self.assertEqual(set(row_errors[1]), {"inn", "rs"})
+        self.assertIn(error_messages["check_num_bik"], row_errors[2]["rs"])
+        self.assertIn("inn", row_errors[2])
+        self.assertEqual(OrganizationValidated.objects.count(), 1)
+
+    def test_code_fields_are_validated_in_batch(self):
+        objs = [OrganizationValidated(**self.data), OrganizationValidated(**dict(self.other, inn="7705002603"))]
+        with mock.patch.object(managers, "validate_many", wraps=managers.validate_many) as validate_many, \
+                mock.patch.object(OrganizationValidated, "clean_fields", autospec=True,
+                                  side_effect=OrganizationValidated.clean_fields) as clean_fields:
+            with self.assertRaises(BulkValidationError) as e:
+                OrganizationValidated.validated.bulk_create(objs)
+        self.assertEqual(sorted(call.args[0] for call in validate_many.call_args_list),
+                         ["bik", "inn", "kpp", "ks", "rs"])
+        # Validators of accepted codes are skipped
+        self.assertTrue({"inn", "kpp", "rs", "ks", "bik"} <= clean_fields.call_args_list[0].kwargs["exclude"])
+        self.assertNotIn("inn", clean_fields.call_args_list[1].kwargs["exclude"])
+        self.assertEqual(e.exception.row_errors, {1: {"inn": [error_messages["check_num"]]}})
+
+    def test_bulk_create_skip(self):
+        invalid = OrganizationValidated(**dict(self.other, inn="770500260q"))
+        objs = OrganizationValidated.validated.bulk_create([OrganizationValidated(**self.data), invalid],
+                                                         invalid_rows="skip")
+        self.assertEqual(len(objs), 1)
+        self.assertIn(error_messages["structure"], invalid.validation_errors["inn"])
+        self.assertEqual(OrganizationValidated.objects.count(), 1)
+
+    def test_bulk_create_without_validation(self):
+        invalid = OrganizationValidated(**dict(self.data, rs="40602810900070000004"))
+        OrganizationValidated.validated.bulk_create([invalid], validate=False)
+        self.assertEqual(OrganizationValidated.objects.count(), 1)
+
+    def test_default_manager_without_validation(self):
+        invalid = OrganizationValidated(**dict(self.data, rs="40602810900070000004"))
+        OrganizationValidated.objects.bulk_create([invalid])
+        self.assertEqual(OrganizationValidated.objects.update(ks=self.other["ks"]), 1)
+
+    def test_bulk_update(self):
+        org = OrganizationValidated.objects.create(**self.data)
+        other = OrganizationValidated.objects.create(**self.other)
+        # RS is validated with BIK of the same row
+        org.rs = "40602810900070000004"
+        other.kpp = "770101001"
+        with self.assertRaises(BulkValidationError) as e:
+            OrganizationValidated.validated.bulk_update([org, other], ["rs", "kpp"])
+        self.assertEqual(list(e.exception.row_errors), [0])
+        self.assertIn(error_messages["check_num_bik"], e.exception.row_errors[0]["rs"])
+
+        OrganizationValidated.validated.bulk_update([org, other], ["rs", "kpp"], invalid_rows="skip")
+        self.assertEqual(OrganizationValidated.objects.get(pk=other.pk).kpp, "770101001")
+        self.assertEqual(OrganizationValidated.objects.get(pk=org.pk).rs, self.data["rs"])
+
+    def test_update(self):
+        org = OrganizationValidated.objects.create(**self.data)
+        other = OrganizationValidated.objects.create(**self.other)
+        # KS is valid only for BIK of the first row
+        with self.assertRaises(BulkValidationError) as e:
+            OrganizationValidated.validated.update(ks=self.data["ks"])
+        self.assertEqual(list(e.exception.row_errors), [other.pk])
+
+        updated = OrganizationValidated.validated.validated_update({"ks": self.data["ks"]}, invalid_rows="skip")
+        self.assertEqual(updated, 1)
+
+        # The same unique value for several rows
+        with self.assertRaises(BulkValidationError):
+            OrganizationValidated.validated.update(inn="7830002293")
+        self.assertEqual(OrganizationValidated.validated.filter(pk=org.pk).update(inn="7830002293"), 1)
+
+    def test_update_skip_in_chunks(self):
+        OrganizationValidated.objects.create(**self.data)
+        OrganizationValidated.objects.create(**dict(self.data, inn="7736207543", rs="40602810900070000016"))
+        other = OrganizationValidated.objects.create(**self.other)
+        with mock.patch("django_bank_requisites.managers.IN_LOOKUP_CHUNK_SIZE", 1):
+            with self.assertNumQueries(3, using="default"):
+                updated = OrganizationValidated.validated.validated_update({"ks": self.data["ks"]}, invalid_rows="skip")
+        self.assertEqual(updated, 2)
+        self.assertEqual(OrganizationValidated.objects.filter(ks=self.data["ks"]).count(), 2)
+        self.assertEqual(OrganizationValidated.objects.get(pk=other.pk).ks, self.other["ks"])
@@ -1,7 +1,11 @@
-from django.test import TestCase
+from unittest import mock
+
+from django.test import TestCase, override_settings
 from django.core.exceptions import ValidationError
 
 from test_project.test_app.models import OrganizationValidated
+from django_bank_requisites import django_validators
+from django_bank_requisites.bik_directory import BankInfo, BikDirectory, BikDirectoryRegistry
 from django_bank_requisites.django_validators import error_messages
 
 class BankDetailsValidatedModelTestCase(TestCase):
@@ -307,3 +311,25 @@ class BankDetailsValidatedModelTestCase(TestCase):
         except ValidationError as e:
             self.assertTrue(e.message_dict.get("ks", ""))
             self.assertIn(error_messages["check_num_bik"], e.message_dict["ks"])
+
+    def test_model_bik_directory_validation(self):
+        registry = BikDirectoryRegistry(BikDirectory({
+            "044525219": BankInfo(bik="044525219", name="Bank", accounts=("30101810500000000219",)),
+        }))
+        with mock.patch.object(django_validators, "bik_directory", registry):
+            org = self.model(**self.data)
+            # The check is disabled by default
+            org.full_clean()
+            with override_settings(BANK_REQUISITES_BIK_DIRECTORY_CHECK=True):
+                org.full_clean()
+                registry.directory = BikDirectory({"044525219": BankInfo(bik="044525219", name="Bank")})
+                with self.assertRaises(ValidationError) as e:
+                    org.full_clean()
+                self.assertEqual(e.exception.message_dict, {"ks": [error_messages["ks_not_found"]]})
+                registry.directory = BikDirectory({"044525225": BankInfo(bik="044525225", name="Bank")})
+                with self.assertRaises(ValidationError) as e:
+                    org.full_clean()
+                self.assertEqual(e.exception.message_dict, {"bik": [error_messages["bik_not_found"]]})
+                # Not loaded directory
+                registry.directory = BikDirectory()
+                org.full_clean()
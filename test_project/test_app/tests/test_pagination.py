@@ -0,0 +1,57 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from django_bank_requisites.pagination import iter_keyset_pages, keyset_page
+from test_project.test_app.models import OrganizationValidated
+
+class PaginationTestCase(TestCase):
+    """
+    Tests for keyset helpers and cursor pagination of ValidatedModelViewSet.
+    """
+
+    def setUp(self):
+        OrganizationValidated.objects.bulk_create([
+            OrganizationValidated(organization_name="Org {}".format(i), legal_address="Moscow",
+                                  inn="77000000{:02d}".format(i), kpp="770101001",
+                                  rs="407028101000200027{:02d}".format(30 - i), ks="", bik="044525201",
+                                  bank_name="Bank")
+            for i in range(25)
+        ])
+        self.url = reverse("organizationvalidated-list")
+
+    def test_keyset_page(self):
+        page = list(keyset_page(OrganizationValidated.objects.all(), after="7700000009", size=3))
+        self.assertEqual([obj.inn for obj in page], ["7700000010", "7700000011", "7700000012"])
+        self.assertNotIn("OFFSET", str(keyset_page(OrganizationValidated.objects.all(), after="7700000009").query))
+
+    def test_iter_keyset_pages(self):
+        queryset = OrganizationValidated.objects.values("rs")
+        pages = list(iter_keyset_pages(queryset, field="rs", size=10))
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        values = [row["rs"] for page in pages for row in page]
+        self.assertEqual(values, sorted(values))
+        self.assertEqual(len(set(values)), 25)
+
+    def test_cursor_pagination(self):
+        inns = []
+        url = self.url + "?page_size=10"
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(any("OFFSET" in query["sql"] for query in queries))
+            inns.extend(obj["inn"] for obj in response.json()["results"])
+            url = response.json()["next"]
+        self.assertEqual(inns, sorted(OrganizationValidated.objects.values_list("inn", flat=True)))
+
+    def test_ordering(self):
+        response = self.client.get(self.url, {"order_by": "-rs"})
+        results = response.json()["results"]
+        self.assertEqual(len(results), 25)
+        self.assertEqual(results[0]["rs"], "40702810100020002730")
+
+        # Only unique fields can be used
+        response = self.client.get(self.url, {"order_by": "bank_name"})
+        self.assertEqual(response.json()["results"][0]["inn"], "7700000000")
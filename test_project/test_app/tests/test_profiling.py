@@ -0,0 +1,107 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from django_bank_requisites import profiling
+from django_bank_requisites.django_validators import validate_inn
+
+class ProfilingTestCase(SimpleTestCase):
+    """
+    Tests for settings-controlled profiling hooks.
+    """
+
+    def setUp(self):
+        profiling.reset_stats()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        profiling.reset_stats()
+        self.tmp_dir.cleanup()
+
+    def test_import_without_settings(self):
+        # Nothing is profiled, so settings are not read at exit
+        env = {name: value for name, value in os.environ.items() if name != "DJANGO_SETTINGS_MODULE"}
+        result = subprocess.run([sys.executable, "-c", "import django_bank_requisites.django_validators"],
+                                env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(result.stderr, b"")
+
+    def test_profiling_disabled(self):
+        validate_inn("7702038150")
+        self.assertIsNone(profiling.get_stats())
+
+    def test_profiling_enabled(self):
+        with override_settings(BANK_REQUISITES_PROFILING_ENABLED=True,
+                               BANK_REQUISITES_PROFILING_SAMPLE_RATE=1,
+                               BANK_REQUISITES_PROFILING_OUTPUT_DIR=self.tmp_dir.name):
+            for _ in range(3):
+                validate_inn("7702038150")
+            profiling.flush_stats()
+            path = profiling.get_stats_path()
+        self.assertIsNotNone(profiling.get_stats())
+        self.assertTrue(os.path.exists(path))
+
+    def test_profiling_sample_rate(self):
+        with override_settings(BANK_REQUISITES_PROFILING_ENABLED=True,
+                               BANK_REQUISITES_PROFILING_SAMPLE_RATE=0):
+            validate_inn("7702038150")
+        self.assertIsNone(profiling.get_stats())
+
+    def test_profiler_busy(self):
+        with override_settings(BANK_REQUISITES_PROFILING_ENABLED=True,
+                               BANK_REQUISITES_PROFILING_SAMPLE_RATE=1):
+            # Another thread profiles its call
+            with profiling._profiler_lock:
+                validate_inn("7702038150")
+            self.assertIsNone(profiling.get_stats())
+
+            # Another profiling tool is active (Python 3.12+ raises ValueError)
+            profiler = mock.Mock(**{"enable.side_effect": ValueError("Another profiling tool is already active")})
+            with mock.patch.object(profiling, "_get_profiler", return_value=profiler):
+                validate_inn("7702038150")
+            self.assertIsNone(profiling.get_stats())
+
+    def test_dump_in_background(self):
+        with override_settings(BANK_REQUISITES_PROFILING_ENABLED=True,
+                               BANK_REQUISITES_PROFILING_SAMPLE_RATE=1,
+                               BANK_REQUISITES_PROFILING_OUTPUT_DIR=self.tmp_dir.name,
+                               BANK_REQUISITES_PROFILING_DUMP_INTERVAL=2):
+            with mock.patch.object(profiling, "_request_dump") as request_dump:
+                validate_inn("7702038150")
+                request_dump.assert_not_called()
+                validate_inn("7702038150")
+                request_dump.assert_called_once_with()
+
+class ProfileValidatorsCommandTestCase(SimpleTestCase):
+    """
+    Tests for profile_validators management command.
+    """
+
+    def test_command(self):
+        record = {
+            "legal_address": "107078, г Москва, пер. Б.Козловский, дом 5, стр.2",
+            "inn": "7701992807",
+            "kpp": "770101001",
+            "rs": "40702810100020002772",
+            "ks": "30101810000000000201",
+            "bik": "044525201",
+            "bank_name": "ПАО АКБ ‟Авангард‟"
+        }
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            input_file = os.path.join(tmp_dir, "records.json")
+            output_file = os.path.join(tmp_dir, "stats.prof")
+            with open(input_file, "w", encoding="utf-8") as f:
+                f.write("\n".join(json.dumps(r) for r in (record, dict(record, inn="7701992808"))))
+            out = StringIO()
+            call_command("profile_validators", input_file, "--model", "test_app.OrganizationValidated",
+                         "--output", output_file, "--limit", "200", stdout=out)
+            self.assertTrue(os.path.exists(output_file))
+        self.assertIn("Validated 2 records", out.getvalue())
+        self.assertIn("validate_inn", out.getvalue())
@@ -0,0 +1,57 @@
+from django.db.models import Count, F
+from django.test import TestCase
+
+from test_project.test_app.models import RegionalOrganization
+
+class RegionIndexTestCase(TestCase):
+    """
+    Tests for indexed region and tax office columns of RegionIndexMixin.
+    """
+
+    def setUp(self):
+        self.data = {
+            "organization_name": "ООО ‟ГидроТеплоСервис‟",
+            "legal_address": "107078, г Москва, пер. Б.Козловский, дом 5, стр.2",
+            "inn": "7701992807",
+            "kpp": "770101001",
+            "rs": "40702810100020002772",
+            "ks": "30101810000000000201",
+            "bik": "044525201",
+            "bank_name": "ПАО АКБ ‟Авангард‟"
+        }
+
+    def test_save(self):
+        organization = RegionalOrganization.objects.create(**self.data)
+        organization.refresh_from_db()
+        self.assertEqual((organization.inn_region, organization.inn_tax_office, organization.kpp_tax_office),
+                         ("77", "7701", "7701"))
+        self.assertEqual(organization.get_region_name(), "г. Москва")
+
+        organization.kpp = "500101001"
+        organization.save(update_fields=["kpp"])
+        organization.refresh_from_db()
+        self.assertEqual(organization.kpp_tax_office, "5001")
+
+    def test_bulk_operations(self):
+        organization = RegionalOrganization(**self.data)
+        RegionalOrganization.objects.bulk_create([organization])
+        self.assertEqual(RegionalOrganization.objects.filter(inn_region="77").count(), 1)
+
+        organization = RegionalOrganization.objects.get()
+        organization.inn = "7736207543"
+        RegionalOrganization.objects.bulk_update([organization], ["inn"])
+        self.assertEqual(RegionalOrganization.objects.get().inn_tax_office, "7736")
+
+        RegionalOrganization.validated.update(kpp="500101001")
+        self.assertEqual(RegionalOrganization.objects.get().kpp_tax_office, "5001")
+
+        # Expressions are recomputed by database
+        RegionalOrganization.objects.update(kpp=F("kpp"))
+        self.assertEqual(RegionalOrganization.objects.get().kpp_tax_office, "5001")
+
+    def test_group_by_region(self):
+        RegionalOrganization.objects.create(**self.data)
+        RegionalOrganization.objects.filter(pk__isnull=False).update(inn_region="")
+        RegionalOrganization.objects.fill_derived_fields()
+        counts = list(RegionalOrganization.objects.values("inn_region").annotate(count=Count("pk")))
+        self.assertEqual(counts, [{"inn_region": "77", "count": 1}])
@@ -0,0 +1,45 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from test_project.test_app.models import OrganizationValidated
+from django_bank_requisites.mapped_registry import MappedRegistry
+
+class BuildRegistryCommandTestCase(TestCase):
+    """
+    Tests for build_registry management command.
+    """
+
+    def setUp(self):
+        OrganizationValidated.objects.create(
+            organization_name="ГУП ‟Московский метрополитен‟",
+            legal_address="129110, город Москва, пр-кт Мира, д. 41 стр. 2",
+            inn="7702038150",
+            kpp="770201001",
+            rs="40602810900070000003",
+            ks="30101810500000000219",
+            bik="044525219",
+            bank_name="Банк ВТБ (ПАО)",
+        )
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "inn.bin")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_build_inn_registry(self):
+        out = StringIO()
+        call_command("build_registry", "inn", "test_app.OrganizationValidated", output=self.path, stdout=out)
+        self.assertIn("1 records", out.getvalue())
+        with MappedRegistry(self.path) as registry:
+            self.assertIn("7702038150", registry)
+
+    def test_invalid_source(self):
+        with self.assertRaises(CommandError):
+            call_command("build_registry", "inn", "test_app.Missing", output=self.path)
+        with self.assertRaises(CommandError):
+            call_command("build_registry", "bik", os.path.join(self.tmp_dir.name, "missing.xml"), output=self.path)
@@ -0,0 +1,45 @@
+import tempfile
+
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from django_bank_requisites import __version__
+from django_bank_requisites.result_cache import content_key, get_shared_cache, COUNTERPARTY_NAMESPACE
+
+class ResultCacheTestCase(SimpleTestCase):
+    """
+    Tests for validation results cache in Django cache framework.
+    """
+
+    def test_content_key(self):
+        key = content_key("record_errors", ["7702038150", None])
+        self.assertTrue(key.startswith("bank_requisites:{}:record_errors:".format(__version__)))
+        self.assertEqual(key, content_key("record_errors", ("7702038150", None)))
+        self.assertNotEqual(key, content_key("counterparty", ["7702038150", None]))
+
+    def test_cache_is_disabled_by_default(self):
+        self.assertIsNone(get_shared_cache(COUNTERPARTY_NAMESPACE))
+
+    def _test_shared_cache(self):
+        caches["results"].clear()
+        shared_cache = get_shared_cache(COUNTERPARTY_NAMESPACE)
+        self.assertIsNone(shared_cache.get("7702038150"))
+        shared_cache.set("7702038150", [True, True])
+        self.assertEqual(shared_cache.get("7702038150"), [True, True])
+        shared_cache.set_many({"7701992808": [True, False]})
+        self.assertEqual(shared_cache.get_many(["7702038150", "7701992808", "5001007322"]),
+                         {"7702038150": [True, True], "7701992808": [True, False]})
+
+    def test_locmem_cache(self):
+        with self.settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+                                   "results": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+                           BANK_REQUISITES_RESULT_CACHE="results"):
+            self._test_shared_cache()
+
+    def test_file_based_cache(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with self.settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+                                       "results": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                                                   "LOCATION": tmp_dir}},
+                               BANK_REQUISITES_RESULT_CACHE="results"):
+                self._test_shared_cache()
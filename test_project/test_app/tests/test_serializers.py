@@ -1,9 +1,18 @@
-from django.test import TestCase
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework.exceptions import ValidationError as DRFValidationError
 
-from test_project.test_app.models import OrganizationUnvalidated
-from test_project.test_app.serializers import UnvalidatedModelSerializer, ValidatedModelSerializer
+from test_project.test_app.models import OrganizationBranch, OrganizationUnvalidated, OrganizationValidated
+from test_project.test_app.serializers import (UnvalidatedModelSerializer,
+                                               ValidatedModelSerializer,
+                                               SinglePassModelSerializer,
+                                               BranchModelSerializer)
+from django_bank_requisites import django_validators
+from django_bank_requisites.bik_directory import BankInfo, BikDirectory, BikDirectoryRegistry
 from django_bank_requisites.django_validators import error_messages
 
 class SetUpMixin:
@@ -42,6 +51,17 @@ class BankDetailsUnvalidatedModelSerializerTestCase(SetUpMixin, TestCase):
         orgs_count = OrganizationUnvalidated.objects.count()
         self.assertEqual(orgs_count, 1)
 
+    @override_settings(BANK_REQUISITES_BIK_DIRECTORY_CHECK=True)
+    def test_serializer_bik_directory_validation(self):
+        registry = BikDirectoryRegistry(BikDirectory({"044525201": BankInfo(bik="044525201", name="Bank")}))
+        with mock.patch.object(django_validators, "bik_directory", registry):
+            serializer = self.serializer(data=self.data)
+            self.assertFalse(serializer.is_valid())
+            self.assertEqual(serializer.errors, {"ks": [error_messages["ks_not_found"]]})
+            registry.directory = BikDirectory({"044525201": BankInfo(bik="044525201", name="Bank",
+                                                                     accounts=(self.data["ks"],))})
+            self.assertTrue(self.serializer(data=self.data).is_valid())
+
     def test_serializer_legal_address_validation(self):
         # Blank legal_address
         self.data["legal_address"] = ""
@@ -378,3 +398,66 @@ class BankDetailsValidatedModelSerializerTestCase(SetUpMixin, TestCase):
         except DjangoValidationError:
             flag = False
         self.assertFalse(flag)
+
+class SinglePassModelSerializerTestCase(SetUpMixin, TestCase):
+    """
+    Tests for model serializer with ValidatedModelSerializerMixin.
+    """
+
+    def test_clean_runs_once(self):
+        serializer = SinglePassModelSerializer(data=self.data)
+        with mock.patch.object(OrganizationValidated, "clean", autospec=True,
+                               side_effect=OrganizationValidated.clean) as clean:
+            self.assertTrue(serializer.is_valid())
+            serializer.save()
+        self.assertEqual(clean.call_count, 1)
+        self.assertEqual(OrganizationValidated.objects.count(), 1)
+
+        # Values changed after validation are cleaned again
+        instance = serializer.instance
+        instance.ks = "30101810000000000200"
+        with self.assertRaises(DjangoValidationError):
+            instance.save()
+
+    def test_clean_runs_once_with_omitted_field(self):
+        del self.data["ks"]
+        serializer = SinglePassModelSerializer(data=self.data)
+        with mock.patch.object(OrganizationValidated, "clean", autospec=True,
+                               side_effect=OrganizationValidated.clean) as clean:
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+            serializer.save()
+        self.assertEqual(clean.call_count, 1)
+        self.assertEqual(serializer.instance.ks, "")
+
+    def test_clean_errors(self):
+        self.data["ks"] = "30101810000000000200"
+        serializer = SinglePassModelSerializer(data=self.data)
+        self.assertFalse(serializer.is_valid())
+        self.assertIn(error_messages["ks_last_3"], serializer.errors["ks"])
+
+    def test_unique_fields_in_one_query(self):
+        OrganizationValidated.objects.create(**self.data)
+        serializer = SinglePassModelSerializer(data=self.data)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertFalse(serializer.is_valid())
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(set(serializer.errors), {"inn", "rs"})
+        self.assertEqual(serializer.errors["inn"][0].code, "unique")
+
+    def test_foreign_key(self):
+        head = OrganizationValidated.objects.create(**self.data)
+        serializer = BranchModelSerializer(data=dict(self.data, head=head.pk))
+        cleaned = []
+        with mock.patch.object(OrganizationBranch, "clean", autospec=True,
+                               side_effect=lambda instance: cleaned.append((instance.head_id, instance.head))):
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(cleaned, [(head.pk, head)])
+        self.assertEqual(serializer.save().head, head)
+
+    def test_update(self):
+        instance = OrganizationValidated.objects.create(**self.data)
+        serializer = SinglePassModelSerializer(instance, data={"organization_name": "ООО ‟Ромашка‟"}, partial=True)
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+        instance.refresh_from_db()
+        self.assertEqual(instance.organization_name, "ООО ‟Ромашка‟")
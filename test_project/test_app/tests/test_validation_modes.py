@@ -0,0 +1,97 @@
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from test_project.test_app.models import OrganizationValidated
+from test_project.test_app.serializers import UnvalidatedModelSerializer
+from django_bank_requisites.django_validators import error_messages
+from django_bank_requisites.managers import BulkValidationError
+
+class FailFastValidationTestCase(TestCase):
+    """
+    Tests for fail-fast validation mode of models, serializers and bulk operations.
+    """
+
+    def setUp(self):
+        self.data = {
+            "organization_name": "ГУП ‟Московский метрополитен‟",
+            "legal_address": "129110, город Москва, пр-кт Мира, д. 41 стр. 2",
+            "inn": "7702038150",
+            "kpp": "770201001",
+            "rs": "40602810900070000003",
+            "ks": "30101810500000000219",
+            "bik": "044525219",
+            "bank_name": "Банк ВТБ (ПАО)",
+        }
+        # Invalid INN check num, RS length and KS suffix
+        self.invalid = dict(self.data, inn="7702038151", rs="4060281090007000000", ks="30101810500000000218",
+                            legal_address="")
+
+    def test_collect_all_is_default(self):
+        with self.assertRaises(ValidationError) as cm:
+            OrganizationValidated(**self.invalid).full_clean()
+        self.assertEqual(set(cm.exception.message_dict), {"inn", "rs", "ks", "legal_address"})
+
+    def test_model_full_clean(self):
+        with self.settings(BANK_REQUISITES_VALIDATION_MODE="fail_fast"):
+            with self.assertRaises(ValidationError) as cm, CaptureQueriesContext(connection) as queries:
+                OrganizationValidated(**self.invalid).full_clean()
+            self.assertEqual(cm.exception.message_dict, {"rs": [error_messages["length"]]})
+            self.assertEqual(len(queries), 0)
+
+            with self.assertRaises(ValidationError) as cm:
+                OrganizationValidated(**dict(self.data, legal_address="")).full_clean()
+            self.assertEqual(list(cm.exception.message_dict), ["legal_address"])
+
+            OrganizationValidated.objects.create(**self.data)
+            # Only the first uniqueness error is reported
+            with self.assertRaises(ValidationError) as cm:
+                OrganizationValidated(**self.data).full_clean()
+            self.assertEqual(list(cm.exception.message_dict), ["inn"])
+
+    def test_model_constraints(self):
+        error = ValidationError({"__all__": ["Constraint “first” is violated.", "Constraint “second” is violated."]})
+        with self.settings(BANK_REQUISITES_VALIDATION_MODE="fail_fast"):
+            with mock.patch.object(OrganizationValidated, "validate_constraints", side_effect=error) as validate:
+                with self.assertRaises(ValidationError) as cm:
+                    OrganizationValidated(**self.data).full_clean(exclude=["organization_name"])
+                self.assertEqual(cm.exception.message_dict, {"__all__": ["Constraint “first” is violated."]})
+                validate.assert_called_once_with(exclude={"organization_name"})
+
+                # validate_constraints=False is respected
+                validate.reset_mock()
+                OrganizationValidated(**self.data).full_clean(validate_constraints=False)
+                validate.assert_not_called()
+
+    def test_model_clean(self):
+        org = OrganizationValidated(**self.invalid)
+        org.validation_mode = "fail_fast"
+        with self.assertRaises(ValidationError) as cm:
+            org.clean()
+        self.assertEqual(cm.exception.message_dict, {"rs": [error_messages["length"]]})
+
+    def test_serializer(self):
+        serializer = UnvalidatedModelSerializer(data=self.invalid)
+        serializer.validation_mode = "fail_fast"
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors, {"rs": [error_messages["length"]]})
+        self.assertEqual(serializer.errors["rs"][0].code, "invalid_length")
+
+        serializer = UnvalidatedModelSerializer(data=dict(self.data, ks="30101810500000000218"))
+        serializer.validation_mode = "fail_fast"
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(serializer.errors, {"ks": [error_messages["ks_last_3"]]})
+
+        serializer = UnvalidatedModelSerializer(data=self.data)
+        serializer.validation_mode = "fail_fast"
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+    def test_bulk_create(self):
+        with self.settings(BANK_REQUISITES_VALIDATION_MODE="fail_fast"):
+            with self.assertRaises(BulkValidationError) as cm:
+                OrganizationValidated.validated.bulk_create([OrganizationValidated(**self.data),
+                                                           OrganizationValidated(**self.invalid)])
+        self.assertEqual(cm.exception.row_errors, {1: {"rs": [error_messages["length"]]}})
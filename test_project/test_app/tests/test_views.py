@@ -0,0 +1,115 @@
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+
+from django_bank_requisites.django_validators import error_messages
+
+class BulkValidationViewTestCase(TestCase):
+    """
+    Tests for streaming bulk validation endpoint.
+    """
+
+    def setUp(self):
+        self.url = reverse("bank_requisites:bulk-validation")
+        self.data = {
+            "legal_address": "107078, г Москва, пер. Б.Козловский, дом 5, стр.2",
+            "inn": "7701992807",
+            "kpp": "770101001",
+            "rs": "40702810100020002772",
+            "ks": "30101810000000000201",
+            "bik": "044525201",
+            "bank_name": "ПАО АКБ ‟Авангард‟"
+        }
+
+    def get_results(self, body, content_type):
+        response = self.client.post(self.url, data=body, content_type=content_type)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        content = b"".join(response.streaming_content).decode()
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_json_array(self):
+        invalid = dict(self.data, rs="40702810100020002773")
+        body = json.dumps([self.data, invalid])
+        results = self.get_results(body, "application/json")
+        self.assertEqual(results[0], {"index": 0, "valid": True})
+        self.assertEqual(results[1]["index"], 1)
+        self.assertFalse(results[1]["valid"])
+        self.assertIn(error_messages["check_num_bik"], results[1]["errors"]["rs"])
+
+    def test_ndjson(self):
+        invalid = dict(self.data, inn="770199280")
+        body = "\n".join(json.dumps(record) for record in (invalid, self.data))
+        results = self.get_results(body, "application/x-ndjson")
+        self.assertFalse(results[0]["valid"])
+        self.assertIn(error_messages["length"], results[0]["errors"]["inn"])
+        self.assertEqual(results[1], {"index": 1, "valid": True})
+
+    def test_codes_normalization(self):
+        record = dict(self.data, inn="7701 992 807", rs="40702-810-1-0002-0002772", bik="０４４５２５２０１")
+        results = self.get_results(json.dumps([record]), "application/json")
+        self.assertEqual(results[0], {"index": 0, "valid": True})
+
+    def test_malformed_body(self):
+        body = json.dumps(self.data) + "\n{"
+        results = self.get_results(body, "application/x-ndjson")
+        self.assertEqual(results[0], {"index": 0, "valid": True})
+        self.assertIn("error", results[1])
+
+class CodeValidationViewTestCase(TestCase):
+    """
+    Tests for cacheable single code validation endpoint.
+    """
+
+    def get_url(self, kind, code):
+        return reverse("bank_requisites:code-validation", kwargs={"kind": kind, "code": code})
+
+    def test_code_validation(self):
+        response = self.client.get(self.get_url("inn", "7702038150"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"kind": "inn", "code": "7702038150", "valid": True})
+        self.assertIn("max-age=31536000", response["Cache-Control"])
+        self.assertIn("public", response["Cache-Control"])
+
+        response = self.client.get(self.get_url("inn", "7702038151"))
+        self.assertFalse(response.json()["valid"])
+
+        # Codes are normalized
+        response = self.client.get(self.get_url("inn", "7702-038 150"))
+        self.assertEqual(response.json()["code"], "7702038150")
+        self.assertTrue(response.json()["valid"])
+
+    def test_bank_account_validation(self):
+        response = self.client.get(self.get_url("rs", "40702810100020002772"), {"bik": "044525201"})
+        self.assertTrue(response.json()["valid"])
+        response = self.client.get(self.get_url("ks", "30101810000000000201"), {"bik": "044525202"})
+        self.assertFalse(response.json()["valid"])
+
+        # BIK is required
+        response = self.client.get(self.get_url("rs", "40702810100020002772"))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("bik", response.json())
+
+    def test_unknown_kind(self):
+        response = self.client.get(self.get_url("snils", "12345678901"))
+        self.assertEqual(response.status_code, 404)
+
+    def test_etag(self):
+        url = self.get_url("bik", "044525201")
+        etag = self.client.get(url)["ETag"]
+        self.assertTrue(etag.startswith('"'))
+        # Same input gives same ETag, different input gives another one
+        self.assertEqual(self.client.get(url)["ETag"], etag)
+        self.assertNotEqual(self.client.get(self.get_url("bik", "044525202"))["ETag"], etag)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_browser_accept_header(self):
+        # Browsable API is not used, so cached response is the same JSON for any client
+        url = self.get_url("bik", "044525201")
+        response = self.client.get(url, HTTP_ACCEPT="text/html,application/xhtml+xml,*/*;q=0.8")
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(response["ETag"], self.client.get(url)["ETag"])
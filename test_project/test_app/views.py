@@ -1,4 +1,5 @@
 from rest_framework import viewsets
+from django_bank_requisites.pagination import BankDetailsCursorPagination
 
 from .models import OrganizationValidated, OrganizationUnvalidated
 from .serializers import ValidatedModelSerializer, UnvalidatedModelSerializer
@@ -7,6 +8,8 @@ class ValidatedModelViewSet(viewsets.ModelViewSet):
 
     queryset = OrganizationValidated.objects.all()
     serializer_class = ValidatedModelSerializer
+    # Pages are read by unique index of inn (or rs) instead of OFFSET
+    pagination_class = BankDetailsCursorPagination
 
 class UnvalidatedModelViewSet(viewsets.ModelViewSet):
 
@@ -27,5 +27,6 @@ router.register(r'unvalidated-model-org', UnvalidatedModelViewSet)
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/v1/', include(router.urls)),
+    path('api/v1/', include('django_bank_requisites.urls')),
     re_path(r'^$', RedirectView.as_view(url=reverse_lazy('api-root'), permanent=False)),
 ]
\ No newline at end of file
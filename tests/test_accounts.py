@@ -0,0 +1,65 @@
+import pytest
+
+from django_bank_requisites.accounts import (BUDGET,
+                                             CATEGORIES,
+                                             CORRESPONDENT,
+                                             DEPOSIT,
+                                             OTHER,
+                                             PERSONAL,
+                                             SETTLEMENT,
+                                             TREASURY,
+                                             AccountParts,
+                                             category_ranges,
+                                             classify_account,
+                                             is_rub_account,
+                                             parse_account)
+
+def test_parse_account():
+    parts = parse_account("40702810100020002772")
+    assert parts == AccountParts(balance_account="40702", currency="810", check_digit="1",
+                                 branch="0002", personal="0002772")
+    assert "".join(parts) == "40702810100020002772"
+    assert parts.category == SETTLEMENT
+    assert parse_account("4070281010002000277") is None
+    assert parse_account("4070281010002000277a") is None
+    assert parse_account(None) is None
+
+@pytest.mark.parametrize("account, category", [
+    ("40702810100020002772", SETTLEMENT),
+    ("40802810000000000001", SETTLEMENT),
+    ("40817810000000000001", PERSONAL),
+    ("42301810000000000001", DEPOSIT),
+    ("42101810000000000001", DEPOSIT),
+    ("40101810000000010001", BUDGET),
+    ("40201810000000000001", BUDGET),
+    ("40102810545370000003", TREASURY),
+    ("03100643000000017300", TREASURY),
+    ("30101810000000000201", CORRESPONDENT),
+    ("47422810000000000001", OTHER),
+])
+def test_classify_account(account, category):
+    assert classify_account(account) == category
+
+def test_classify_malformed_account():
+    assert classify_account("407028101000200027") is None
+    assert classify_account("") is None
+    # str.isdigit() accepts these, but int() can't parse them
+    assert classify_account("4070²810000000000000") is None
+    assert parse_account("4070²810000000000000") is None
+    assert classify_account("４０７０２810100020002772") is None
+
+def test_is_rub_account():
+    assert is_rub_account("40702810100020002772")
+    assert is_rub_account("03100643000000017300")
+    assert not is_rub_account("40702840100020002772")
+    assert not is_rub_account("40702810")
+    assert not is_rub_account(None)
+
+def test_category_ranges():
+    assert category_ranges(CORRESPONDENT) == (("30100", "30199"),)
+    assert ("40817", "40817") in category_ranges(PERSONAL)
+    # Ranges of all categories cover all balance accounts
+    covered = sum(int(last) - int(first) + 1 for category in CATEGORIES for first, last in category_ranges(category))
+    assert covered == 10 ** 5
+    with pytest.raises(ValueError):
+        category_ranges("loan")
@@ -0,0 +1,47 @@
+import pytest
+
+from django_bank_requisites import backends
+from django_bank_requisites.base_validators import is_inn_valid, is_ogrn_valid, is_rs_valid, is_ks_valid
+
+INNS = ["7702038150", "7702038151", "500100732259", "500100732258", "770203815q", "77020381", ""]
+OGRNS = ["1027700132195", "1027700132196", "304500116000157", "10277001321"]
+BIKS = ["044525219", "044525219", "044525219", "04452521q", "044525219"]
+RSS = ["40602810900070000003", "40602810900070000004", "4060281090007000000", "40602810900070000003",
+       "4060281090007000000q"]
+KSS = ["30101810500000000219", "30101810500000000218", "30201810500000000219", "30101810500000000219",
+       "3010181050000000021"]
+
+@pytest.mark.parametrize("name", ["python", "table", "numpy"])
+def test_backends_match_base_validators(name):
+    if name == "numpy":
+        pytest.importorskip("numpy")
+    assert backends.validate_many("inn", INNS, backend=name) == [is_inn_valid(inn) for inn in INNS]
+    assert backends.validate_many("ogrn", OGRNS, backend=name) == [is_ogrn_valid(ogrn) for ogrn in OGRNS]
+    assert backends.validate_many("rs", RSS, biks=BIKS, backend=name) == list(map(is_rs_valid, RSS, BIKS))
+    assert backends.validate_many("ks", KSS, biks=BIKS, backend=name) == list(map(is_ks_valid, KSS, BIKS))
+
+def test_select_backend():
+    settings = [(0, "python"), (10, "table"), (100, "numpy")]
+    assert backends.select_backend(1, settings).name == "python"
+    assert backends.select_backend(10, settings).name == "table"
+    expected = "numpy" if backends.get_backend("numpy").is_available() else "table"
+    assert backends.select_backend(1000, settings).name == expected
+
+def test_validate_many_errors():
+    with pytest.raises(ValueError):
+        backends.validate_many("snils", ["123"])
+    with pytest.raises(ValueError):
+        backends.validate_many("rs", RSS)
+    with pytest.raises(ValueError):
+        backends.validate_many("rs", RSS, biks=BIKS[:1])
+    with pytest.raises(ValueError):
+        backends.validate_many("inn", INNS, backend="gpu")
+
+def test_process_pool_shutdown():
+    backend = backends.get_backend("process")
+    executor = backend.get_executor()
+    assert backend.get_executor() is executor
+    backends.ProcessBackend.shutdown()
+    assert backends.ProcessBackend._executor is None
+    assert backend.validate("inn", INNS) == [is_inn_valid(inn) for inn in INNS]
+    backends.ProcessBackend.shutdown()
@@ -61,6 +61,23 @@ def test_is_code_structure_valid_func():
     result = is_code_structure_valid(code="1234567890q")
     assert result == False
 
+    # Unicode digits are not valid (superscript, Arabic-Indic, full-width)
+    result = is_code_structure_valid(code="123456789²")
+    assert result == False
+    result = is_code_structure_valid(code="١٢٣٤٥٦٧٨٩٠")
+    assert result == False
+    result = is_code_structure_valid(code="１２３４５６７８９０")
+    assert result == False
+
+def test_normalize_code_func():
+    result = normalize_code(" 7702-038 150\t")
+    assert result == "7702038150"
+    result = normalize_code("４０７０２ ８１０ ５０ ０００００ ０００１４")
+    assert result == "40702810500000000014"
+    # Other characters are kept
+    result = normalize_code("7702O38150")
+    assert result == "7702O38150"
+
 def test_is_inn_check_num_valid_func():
     # Valid INNs (existing codes)
     result = is_inn_check_num_valid("7702038150")
@@ -0,0 +1,96 @@
+import io
+import threading
+from unittest import mock
+
+from django_bank_requisites import bik_directory
+from django_bank_requisites.bik_directory import ADDED, DELETED, BankInfo, BikDirectory, BikDirectoryRegistry, iter_ed807
+
+FULL = """<?xml version="1.0" encoding="UTF-8"?>
+<ED807 xmlns="urn:cbr-ru:ed:v2.0" EDNo="1" EDDate="2024-01-09" CreationReason="FCBD">
+  <BICDirectoryEntry BIC="044525219">
+    <ParticipantInfo NameP="Bank one" Rgn="45"/>
+    <Accounts Account="30101810500000000219" RegulationAccountType="CRSA" AccountStatus="ACAC"/>
+    <Accounts Account="30101810500000001219" RegulationAccountType="CRSA" AccountStatus="ACDL"/>
+  </BICDirectoryEntry>
+  <BICDirectoryEntry BIC="044525225">
+    <ParticipantInfo NameP="Bank two" Rgn="45"/>
+    <Accounts Account="30101810400000000225" RegulationAccountType="CRSA" AccountStatus="ACAC"/>
+  </BICDirectoryEntry>
+</ED807>
+"""
+
+DELTA = """<?xml version="1.0" encoding="UTF-8"?>
+<ED807 xmlns="urn:cbr-ru:ed:v2.0" EDNo="2" EDDate="2024-01-10" CreationReason="RCBD">
+  <BICDirectoryEntry BIC="044525219" ChangeType="CHGD">
+    <ParticipantInfo NameP="Bank one renamed" Rgn="45"/>
+    <Accounts Account="30101810500000000219" RegulationAccountType="CRSA" AccountStatus="ACAC"/>
+  </BICDirectoryEntry>
+  <BICDirectoryEntry BIC="044525225" ChangeType="DLTD"/>
+  <BICDirectoryEntry BIC="044525974" ChangeType="ADDD">
+    <ParticipantInfo NameP="Bank three" Rgn="45"/>
+  </BICDirectoryEntry>
+</ED807>
+"""
+
+def _stream(text: str):
+    return io.BytesIO(text.encode())
+
+def test_iter_ed807():
+    entries = list(iter_ed807(_stream(FULL)))
+    assert [(change_type, info.bik) for change_type, info in entries] == [(None, "044525219"), (None, "044525225")]
+    assert entries[0][1].name == "Bank one"
+    # Deleted accounts are skipped
+    assert entries[0][1].accounts == ("30101810500000000219",)
+
+def test_apply_delta():
+    directory = BikDirectory.from_ed807(_stream(FULL))
+    assert len(directory) == 2
+    assert directory.is_ks_valid("30101810400000000225", "044525225")
+
+    updated = directory.apply(iter_ed807(_stream(DELTA)))
+    assert sorted(info.bik for info in updated) == ["044525219", "044525974"]
+    assert updated.get("044525219").name == "Bank one renamed"
+    # Old snapshot is not changed
+    assert "044525225" in directory and "044525974" not in directory
+    # Delta can be applied twice
+    assert sorted(info.bik for info in updated.apply(iter_ed807(_stream(DELTA)))) == ["044525219", "044525974"]
+
+def test_deltas_are_layers():
+    directory = BikDirectory.from_ed807(_stream(FULL))
+    with mock.patch.object(bik_directory, "MAX_LAYERS", 3):
+        updated = directory.apply(iter_ed807(_stream(DELTA)))
+        # The full directory is shared, not copied
+        assert updated._entries.maps[-1] is directory._entries.maps[0]
+        assert len(updated) == 2 and "044525225" not in updated
+        updated = updated.apply([(ADDED, BankInfo(bik="044525225", name="Bank two"))])
+        assert len(updated) == 3 and "044525225" in updated
+        # Layers are merged
+        updated = updated.apply([(DELETED, BankInfo(bik="044525974", name=""))])
+        assert len(updated._entries.maps) == 1
+    assert sorted(info.bik for info in updated) == ["044525219", "044525225"]
+    assert len(updated) == 2
+
+def test_registry_swap_is_atomic():
+    registry = BikDirectoryRegistry()
+    registry.load(_stream(FULL))
+    seen = set()
+    stop = threading.Event()
+
+    def read():
+        while not stop.is_set():
+            directory = registry.directory
+            seen.add(tuple(sorted(info.bik for info in directory)))
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for _ in range(50):
+        registry.apply_delta(_stream(DELTA))
+        registry.load(_stream(FULL))
+    stop.set()
+    for reader in readers:
+        reader.join()
+    # Readers see only complete snapshots
+    assert seen <= {("044525219", "044525225"), ("044525219", "044525974")}
+    registry.apply_deltas([_stream(DELTA), _stream(DELTA)])
+    assert "044525974" in registry and "044525225" not in registry
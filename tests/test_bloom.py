@@ -0,0 +1,31 @@
+import os
+
+import pytest
+
+from django_bank_requisites.bloom import BloomFilter
+
+def test_bloom_filter():
+    bloom_filter = BloomFilter(capacity=1000, error_rate=0.01)
+    codes = [str(7700000000 + i) for i in range(1000)]
+    bloom_filter.update(codes)
+    assert all(code in bloom_filter for code in codes)
+    assert bloom_filter.count == 1000
+    # False positives rate is close to error rate
+    false_positives = sum(str(5000000000 + i) in bloom_filter for i in range(10000))
+    assert false_positives < 300
+
+def test_bloom_filter_save_load(tmp_path):
+    path = str(tmp_path / "filter.bin")
+    bloom_filter = BloomFilter(capacity=100)
+    bloom_filter.add("inn:7702038150")
+    bloom_filter.save(path)
+    loaded = BloomFilter.load(path)
+    assert "inn:7702038150" in loaded
+    assert "inn:7705002602" not in loaded
+    assert (loaded.num_bits, loaded.num_hashes, loaded.count) == (bloom_filter.num_bits, bloom_filter.num_hashes, 1)
+    assert os.listdir(str(tmp_path)) == ["filter.bin"]
+
+    with open(path, "wb") as f:
+        f.write(b"garbage")
+    with pytest.raises(ValueError):
+        BloomFilter.load(path)
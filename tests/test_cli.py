@@ -0,0 +1,67 @@
+import io
+import json
+import subprocess
+import sys
+
+from django_bank_requisites.cli import main, INVALID_RECORDS, OK, USAGE_ERROR
+
+CSV = """inn,kpp,rs,ks,bik
+7702038150,770201001,40602810900070000003,30101810500000000219,044525219
+7702038150,770201001,40602810900070000004,,044525219
+"""
+
+def _run(args) -> tuple:
+    out = io.StringIO()
+    code = main(args, stdout=out)
+    return code, [json.loads(line) for line in out.getvalue().splitlines()]
+
+def test_validate_csv(tmp_path):
+    path = tmp_path / "records.csv"
+    path.write_text(CSV)
+    code, results = _run(["validate", str(path)])
+    assert code == INVALID_RECORDS
+    assert results == [
+        {"file": str(path), "line": 2, "valid": True},
+        {"file": str(path), "line": 3, "valid": False, "errors": {"rs": ["check_num_bik"]}},
+    ]
+    code, results = _run(["validate", "--only-invalid", "--workers", "2", str(path)])
+    assert [result["line"] for result in results] == [3]
+
+def test_validate_tsv_and_jsonl(tmp_path):
+    tsv = tmp_path / "records.txt"
+    tsv.write_text(CSV.replace(",", "\t"))
+    jsonl = tmp_path / "records.jsonl"
+    jsonl.write_text('{"inn": "7702038150"}\n\n{"inn": 770203815}\n')
+    code, results = _run(["validate", str(tsv), str(jsonl)])
+    assert [(result["line"], result["valid"]) for result in results] == [(2, True), (3, False), (1, True), (3, False)]
+    assert results[-1]["errors"] == {"inn": ["length"]}
+
+def test_invalid_input(tmp_path):
+    path = tmp_path / "records.jsonl"
+    path.write_text("{broken\n")
+    assert _run(["validate", str(path)])[0] == USAGE_ERROR
+    assert _run(["validate", str(tmp_path / "missing.csv")])[0] == USAGE_ERROR
+    empty = tmp_path / "empty.csv"
+    empty.write_text("")
+    assert _run(["validate", str(empty)]) == (OK, [])
+
+def test_stdin_without_django():
+    script = ("import sys; from django_bank_requisites.cli import main; code = main(['validate']); "
+              "assert 'django' not in sys.modules; sys.exit(code)")
+    result = subprocess.run([sys.executable, "-c", script], input=CSV.encode(), stdout=subprocess.PIPE)
+    assert result.returncode == INVALID_RECORDS
+    assert len(result.stdout.splitlines()) == 2
+    result = subprocess.run([sys.executable, "-m", "django_bank_requisites", "validate", "--format", "jsonl"],
+                            input=b'{"bik": "044525219"}\n', stdout=subprocess.PIPE)
+    assert result.returncode == OK
+
+def test_validate_large_chunk(tmp_path):
+    # Chunks are screened by numpy backend (if available) before error codes are computed
+    path = tmp_path / "records.jsonl"
+    lines = ['{"inn": "7702038150", "rs": "40602810900070000003", "bik": "044525219"}',
+             '{"inn": "7702038151", "rs": "40602810900070000003", "bik": "044525219"}']
+    path.write_text("\n".join(lines * 1000) + "\n")
+    code, results = _run(["validate", "--only-invalid", str(path)])
+    assert code == INVALID_RECORDS
+    assert len(results) == 1000
+    assert {json.dumps(result["errors"]) for result in results} == {'{"inn": ["check_num"]}'}
@@ -0,0 +1,74 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from django_bank_requisites.base_validators import *
+from django_bank_requisites import columnar
+
+INNS = ["7702038150", "500100732259", "7830000978", "744703315311", "12345q6789", "12345678912", "", None]
+OGRNS = ["1027700096280", "306745218800012", "1928374650777", "918273645000559", "10277qwe96280", None]
+BIKS = ["044525411", "044544512", "04455411", "0445q5411", "044525411", "045525977", "042406608"]
+RSS = ["40602810900070000045", "40702810500000000014", "40602810900070000045", "40602810900070000045",
+       "4070281050000000014", "407028105000000q014", "40702810500000000015"]
+KSS = ["30101810145250000411", "30101810000000000608", "30101810145250000411", "30101810145250000411",
+       "30101810145250000412", "3010000000000000q977", "30101810000000000608"]
+
+def expected(func, *columns):
+    return [bool(func(*values)) if None not in values else False for values in zip(*columns)]
+
+def test_column_validators():
+    assert columnar.inn_valid(INNS).tolist() == expected(is_inn_valid, INNS)
+    assert columnar.ogrn_valid(OGRNS).tolist() == expected(is_ogrn_valid, OGRNS)
+    assert columnar.bik_valid(BIKS).tolist() == expected(is_bik_valid, BIKS)
+    assert columnar.kpp_valid(["770201001", "q12345678", "12345678"]).tolist() == [True, False, False]
+    assert columnar.rs_valid(RSS, BIKS).tolist() == expected(is_rs_valid, RSS, BIKS)
+    assert columnar.ks_valid(KSS, BIKS).tolist() == expected(is_ks_valid, KSS, BIKS)
+
+def test_check_column():
+    checks = columnar.check_column("inn", ["7702038150", "770203815q", "7702038151"])
+    assert checks["length"].tolist() == [True, True, True]
+    assert checks["structure"].tolist() == [True, False, True]
+    assert checks["check_num"].tolist() == [True, False, False]
+    with pytest.raises(ValueError):
+        columnar.check_column("rs", RSS)
+
+def test_arrow_columns():
+    pa = pytest.importorskip("pyarrow")
+    # Sliced chunked arrays use offsets into shared buffers
+    inns = pa.chunked_array([pa.array(["0000000000"] + INNS[:4]).slice(1), pa.array(INNS[4:])])
+    assert columnar.inn_valid(inns).tolist() == expected(is_inn_valid, INNS)
+    rss = pa.chunked_array([pa.array(RSS[:3], type=pa.large_string()), pa.array(RSS[3:], type=pa.large_string())])
+    assert columnar.rs_valid(rss, pa.array(BIKS)).tolist() == expected(is_rs_valid, RSS, BIKS)
+    # Non-ASCII digits are not digits
+    assert columnar.inn_valid(pa.array(["７７０２０３８１５０"])).tolist() == [False]
+
+def test_long_values():
+    # Matrix width doesn't depend on the longest junk value
+    junk = "7" * 255
+    codes = columnar._Codes.from_values(["7702038150", junk])
+    assert codes.matrix.shape == (2, columnar.MAX_CODE_WIDTH)
+    assert columnar.inn_valid(["7702038150", junk, "40602810900070000045" + "0"]).tolist() == [True, False, False]
+    assert columnar.rs_valid(["40602810900070000045" + "5" * 300], ["044525411"]).tolist() == [False]
+
+    pa = pytest.importorskip("pyarrow")
+    codes = columnar._Codes.from_arrow(pa.array(["7702038150", junk, None]))
+    assert codes.matrix.shape == (3, columnar.MAX_CODE_WIDTH)
+    assert columnar.inn_valid(pa.array(["7702038150", junk, None])).tolist() == [True, False, False]
+
+def test_validate_dataframe():
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("pyarrow")
+    df = pd.DataFrame({"rs": RSS, "ks": KSS, "bik": BIKS}, index=range(10, 17))
+    result = columnar.validate_dataframe(df, detailed=True)
+    assert list(result.index) == list(df.index)
+    assert result["rs_valid"].tolist() == expected(is_rs_valid, RSS, BIKS)
+    assert result["ks_valid"].tolist() == expected(is_ks_valid, KSS, BIKS)
+    assert result["ks_ks_last_3"].tolist()[4] == False
+    assert "inn_valid" not in result
+
+def test_validate_table():
+    pa = pytest.importorskip("pyarrow")
+    table = pa.table({"inn": INNS, "ogrn": OGRNS + [None, None]})
+    result = columnar.validate_table(table)
+    assert result.column("inn_valid").to_pylist() == expected(is_inn_valid, INNS)
+    assert result.column("ogrn_valid").to_pylist() == expected(is_ogrn_valid, OGRNS) + [False, False]
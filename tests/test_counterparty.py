@@ -0,0 +1,143 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from django_bank_requisites.counterparty import CounterpartyClient, CounterpartyError, CounterpartyStatus
+
+REGISTRY = {
+    "7702038150": {"registered": True, "active": True},
+    "7701992808": {"registered": True, "active": False},
+}
+
+class RegistryHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests = []
+    delay = 0
+    # Close keep-alive connections after response without "Connection: close" header
+    drop_connections = False
+
+    def _respond(self, status: int, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if self.drop_connections:
+            self.close_connection = True
+
+    def do_GET(self):
+        self.requests.append(self.path)
+        time.sleep(self.delay)
+        code = self.path.rsplit("/", 1)[-1]
+        if self.path.startswith("/api/counterparties/") and code in REGISTRY:
+            self._respond(200, REGISTRY[code])
+        elif code == "500":
+            self._respond(500, {})
+        else:
+            self._respond(404, {})
+
+    def do_POST(self):
+        self.requests.append(self.path)
+        codes = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["codes"]
+        self._respond(200, {"results": {code: REGISTRY[code] for code in codes if code in REGISTRY}})
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    RegistryHandler.requests = []
+    RegistryHandler.delay = 0
+    RegistryHandler.drop_connections = False
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RegistryHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:{}/api".format(server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+def test_status_is_cached(server):
+    client = CounterpartyClient(server)
+    assert client.status("7702038150") == CounterpartyStatus("7702038150", True, True)
+    assert client.is_active("7702038150")
+    assert not client.is_active("7701992808")
+    assert client.status("5001007322") == CounterpartyStatus("5001007322", False, False)
+    assert len(RegistryHandler.requests) == 3
+    client.clear_cache()
+    client.status("7702038150")
+    assert len(RegistryHandler.requests) == 4
+    client.close()
+
+def test_cache_ttl_and_size(server):
+    client = CounterpartyClient(server, cache_size=1, cache_ttl=0)
+    client.status("7702038150")
+    client.status("7702038150")
+    assert len(RegistryHandler.requests) == 2
+
+def test_concurrent_requests_are_coalesced(server):
+    RegistryHandler.delay = 0.2
+    client = CounterpartyClient(server)
+    threads = [threading.Thread(target=client.status, args=("7702038150",)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert RegistryHandler.requests == ["/api/counterparties/7702038150"]
+
+def test_status_many(server):
+    client = CounterpartyClient(server)
+    client.status("7702038150")
+    result = client.status_many(["7702038150", "7701992808", "5001007322", "7701992808"])
+    assert result["7701992808"] == CounterpartyStatus("7701992808", True, False)
+    assert not result["5001007322"].registered
+    # Cached code is not requested again
+    assert RegistryHandler.requests == ["/api/counterparties/7702038150", "/api/counterparties/bulk"]
+
+def test_errors(server):
+    client = CounterpartyClient(server)
+    with pytest.raises(CounterpartyError):
+        client.status("500")
+    with pytest.raises(CounterpartyError):
+        CounterpartyClient("http://127.0.0.1:1", timeout=1).status("7702038150")
+    with pytest.raises(ValueError):
+        CounterpartyClient("ftp://example.com")
+
+def test_retry_on_closed_connection(server):
+    RegistryHandler.drop_connections = True
+    client = CounterpartyClient(server, cache_size=0)
+    client.status("7702038150")
+    # Pooled connection is closed by the server, request is retried on a new one
+    assert client.status("7702038150") == CounterpartyStatus("7702038150", True, True)
+    assert len(RegistryHandler.requests) == 2
+    client.close()
+
+class DictCache:
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value):
+        self.data[key] = value
+
+    def get_many(self, keys):
+        return {key: self.data[key] for key in keys if key in self.data}
+
+    def set_many(self, values):
+        self.data.update(values)
+
+def test_shared_cache(server):
+    shared_cache = DictCache()
+    CounterpartyClient(server, shared_cache=shared_cache).status("7702038150")
+    CounterpartyClient(server, shared_cache=shared_cache).status_many(["7701992808"])
+    # Other clients (processes) take statuses from shared cache
+    client = CounterpartyClient(server, shared_cache=shared_cache)
+    assert client.status("7702038150") == CounterpartyStatus("7702038150", True, True)
+    assert client.status_many(["7701992808"])["7701992808"] == CounterpartyStatus("7701992808", True, False)
+    assert RegistryHandler.requests == ["/api/counterparties/7702038150", "/api/counterparties/bulk"]
@@ -0,0 +1,48 @@
+from django_bank_requisites import dedup
+from django_bank_requisites.dedup import CodeIndex, find_duplicates, IN_FILE_DUPLICATE, ALREADY_EXISTS
+
+def test_code_index():
+    index = CodeIndex(["7702038150", "500100732259", "40602810900070000045", "90602810900070000045"])
+    assert "7702038150" in index
+    assert "500100732259" in index
+    assert "40602810900070000045" in index
+    assert "90602810900070000045" in index
+    # Leading zeroes and 20-digit codes which don't fit into 64 bits
+    assert "007702038150" not in index
+    assert "0040602810900070000045" not in index
+    assert "50602810900070000045" not in index
+    assert "770203815q" not in index
+    assert len(index) == 4
+    assert index.nbytes == 4 * 8
+
+def test_code_index_runs():
+    index = CodeIndex()
+    for i in range(100):
+        index.update(str(10 ** 9 + i * 7 + j) for j in range(5))
+        assert str(10 ** 9 + i * 7) in index
+    assert len(index) == len({10 ** 9 + i * 7 + j for i in range(100) for j in range(5)})
+    codes = [str(10 ** 9 + i) for i in range(800)]
+    assert index.contains_many(codes) == [code in index for code in codes]
+    assert index.contains_many(codes) == [(i % 7) < 5 and i < 700 for i in range(800)]
+
+def test_code_index_without_numpy(monkeypatch):
+    monkeypatch.setattr(dedup, "np", None)
+    index = CodeIndex(["7702038150", "40602810900070000045"])
+    index.update(["7702038150", "7705002602"])
+    assert index.contains_many(["7702038150", "7705002602", "7830002293"]) == [True, True, False]
+    assert len(index) == 3
+
+def test_find_duplicates(monkeypatch):
+    monkeypatch.setattr(dedup, "DB_CHUNK_SIZE", 2)
+    records = [
+        {"inn": "7702038150", "rs": "40602810900070000045"},
+        {"inn": "7705002602", "rs": "40702810500000000014"},
+        {"inn": "500100732259", "rs": "40602810900070000003"},
+        {"inn": "7702038150", "rs": "4070281050000000001q"},
+        {"inn": "7830002293", "rs": "4070281050000000001q"},
+        {"inn": "7705002602", "rs": ""},
+    ]
+    existing = {"rs": CodeIndex(["40602810900070000003"])}
+    result = find_duplicates(records, existing=existing)
+    assert result["inn"] == {3: IN_FILE_DUPLICATE, 5: IN_FILE_DUPLICATE}
+    assert result["rs"] == {2: ALREADY_EXISTS, 4: IN_FILE_DUPLICATE}
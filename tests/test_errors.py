@@ -0,0 +1,90 @@
+from unittest import mock
+
+from django_bank_requisites import backends
+from django_bank_requisites.errors import (ErrorCode, ErrorReport, record_errors, records_errors, parties_errors,
+                                           iter_chunks, ks_errors, first_error)
+
+VALID_RECORD = {
+    "inn": "7702038150",
+    "kpp": "770201001",
+    "rs": "40602810900070000003",
+    "ks": "30101810500000000219",
+    "bik": "044525219",
+}
+MESSAGES = {key: key.upper() for key in ("length", "structure", "check_num", "check_num_bik", "ks_last_3", "ks_first_3")}
+
+def test_error_codes_are_stable():
+    assert [int(code) for code in ErrorCode] == [1, 2, 4, 8, 16, 32]
+    assert (ErrorCode.LENGTH | ErrorCode.STRUCTURE).keys == ["length", "structure"]
+
+def test_record_errors():
+    assert record_errors(VALID_RECORD) == {}
+    assert record_errors(dict(VALID_RECORD, ks="")) == {}
+    errors = record_errors(dict(VALID_RECORD, inn="770203815q", rs="40602810900070000004", kpp="77020100"))
+    assert errors == {"inn": ErrorCode.STRUCTURE, "kpp": ErrorCode.LENGTH, "rs": ErrorCode.CHECK_NUM_BIK}
+    # RS and KS check nums are not validated with invalid BIK
+    assert record_errors(dict(VALID_RECORD, bik="04452521q")) == {"bik": ErrorCode.STRUCTURE}
+
+def test_records_errors():
+    records = [
+        VALID_RECORD,
+        dict(VALID_RECORD, inn="770203815q", rs="40602810900070000004", kpp="77020100"),
+        {"inn": "7702038150"},
+        dict(VALID_RECORD, ks="30101810500000000218"),
+    ]
+    with mock.patch.object(backends, "validate_many", wraps=backends.validate_many) as validate_many:
+        assert records_errors(records) == [record_errors(record) for record in records]
+    # One batch call per field
+    assert sorted(call.args[0] for call in validate_many.call_args_list) == sorted(VALID_RECORD)
+    assert records_errors(records[1:2], fail_fast=True) == [{"kpp": ErrorCode.LENGTH}]
+
+def test_parties_errors():
+    documents = [
+        {"payer": VALID_RECORD, "payee": dict(VALID_RECORD, inn="7702038151")},
+        {"payer": dict(VALID_RECORD, bik="04452521q")},
+    ]
+    assert parties_errors(documents) == [{"payee": {"inn": ErrorCode.CHECK_NUM}},
+                                         {"payer": {"bik": ErrorCode.STRUCTURE}}]
+
+def test_iter_chunks():
+    assert list(iter_chunks(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(iter_chunks([], 2)) == []
+
+def test_ks_errors():
+    assert ks_errors("30101810500000000218", "044525219") == ErrorCode.KS_LAST_3
+    assert ks_errors("30201810500000000219", "044525219") == ErrorCode.KS_FIRST_3 | ErrorCode.CHECK_NUM_BIK
+    assert ks_errors("3010181050000000219", "044525219") == ErrorCode.LENGTH
+
+def test_error_report():
+    records = [
+        VALID_RECORD,
+        dict(VALID_RECORD, inn="77020381q0", rs="40602810900070000004"),
+        VALID_RECORD,
+        dict(VALID_RECORD, ks="30101810500000000218"),
+    ]
+    report = ErrorReport.from_records(records)
+    assert report.total == 4
+    assert len(report) == 2
+    assert list(report) == [
+        (1, {"inn": ErrorCode.STRUCTURE, "rs": ErrorCode.CHECK_NUM_BIK}),
+        (3, {"ks": ErrorCode.KS_LAST_3}),
+    ]
+    assert report.counts() == {("inn", ErrorCode.STRUCTURE): 1,
+                               ("rs", ErrorCode.CHECK_NUM_BIK): 1,
+                               ("ks", ErrorCode.KS_LAST_3): 1}
+    assert list(report.iter_messages(messages=MESSAGES)) == [
+        (1, {"inn": ["STRUCTURE"], "rs": ["CHECK_NUM_BIK"]}),
+        (3, {"ks": ["KS_LAST_3"]}),
+    ]
+
+def test_first_error_is_cheapest():
+    record = dict(VALID_RECORD, inn="770203815q", rs="4060281090007000000")
+    # Length is checked before structure of all fields
+    assert first_error(record) == ("rs", ErrorCode.LENGTH)
+    record = dict(VALID_RECORD, inn="7702038151", ks="30101810500000000218")
+    # KS suffix is checked before check nums
+    assert first_error(record) == ("ks", ErrorCode.KS_LAST_3)
+    assert first_error(dict(VALID_RECORD, inn="7702038151")) == ("inn", ErrorCode.CHECK_NUM)
+    assert first_error(VALID_RECORD) is None
+    assert record_errors(record, fail_fast=True) == {"ks": ErrorCode.KS_LAST_3}
+    assert record_errors(VALID_RECORD, fail_fast=True) == {}
@@ -0,0 +1,68 @@
+import io
+
+import pytest
+
+from django_bank_requisites.errors import ErrorCode
+from django_bank_requisites.exchange_1c import validate_1c_documents, iter_1c_documents
+
+FILE = """1CClientBankExchange
+ВерсияФормата=1.03
+Кодировка=Windows
+Отправитель=Бухгалтерия предприятия
+СекцияРасчСчет
+РасчСчет=40602810900070000003
+КонецРасчСчет
+СекцияДокумент=Платежное поручение
+Номер=1
+ПлательщикСчет=40602810900070000003
+ПлательщикИНН=7702038150
+ПлательщикКПП=770201001
+ПлательщикБИК=044525219
+ПлательщикКорсчет=30101810500000000219
+ПолучательСчет=40602810900070000003
+ПолучательИНН=0
+ПолучательКПП=
+ПолучательБИК=044525219
+ПолучательКорсчет=30101810500000000219
+КонецДокумента
+СекцияДокумент=Платежное поручение
+Номер=2
+ПлательщикСчет=40602810900070000004
+ПлательщикИНН=770203815
+ПлательщикБИК=044525219
+ПолучательСчет=40602810900070000003
+ПолучательБИК=044525219
+ПолучательКорсчет=30101810500000000218
+КонецДокумента
+КонецФайла
+"""
+
+def test_validate_1c_documents():
+    results = list(validate_1c_documents(io.BytesIO(FILE.replace("\n", "\r\n").encode("cp1251"))))
+    assert [(result.index, result.line, result.number) for result in results] == [(0, 8, "1"), (1, 21, "2")]
+    assert results[0].kind == "Платежное поручение"
+    assert results[0].valid
+    assert results[1].errors == {
+        "payer": {"inn": ErrorCode.LENGTH, "rs": ErrorCode.CHECK_NUM_BIK},
+        "payee": {"ks": ErrorCode.KS_LAST_3},
+    }
+    assert not any(result.duplicate for result in results)
+
+def test_duplicate_numbers():
+    results = list(validate_1c_documents(io.StringIO(FILE.replace("Номер=2", "Номер=1"))))
+    assert [result.duplicate for result in results] == [False, True]
+
+def test_encoding_detection():
+    text = FILE.replace("Кодировка=Windows", "Кодировка=DOS")
+    documents = list(iter_1c_documents(io.BytesIO(text.encode("cp866"))))
+    assert documents[0][2]["ПлательщикИНН"] == "7702038150"
+    # Text streams are supported too
+    assert len(list(iter_1c_documents(io.StringIO(FILE)))) == 2
+
+def test_invalid_files():
+    with pytest.raises(ValueError):
+        list(iter_1c_documents(io.StringIO("Номер=1\n")))
+    with pytest.raises(ValueError):
+        list(iter_1c_documents(io.StringIO(FILE.replace("КонецДокумента\nСекцияДокумент", "СекцияДокумент", 1))))
+    with pytest.raises(ValueError):
+        list(iter_1c_documents(io.StringIO(FILE.rsplit("КонецДокумента", 1)[0])))
@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from django_bank_requisites.bik_directory import BikDirectory, BankInfo
+from django_bank_requisites.mapped_registry import (MappedRegistry, MappedBikDirectory, write_registry,
+                                                    write_bik_registry, write_inn_registry)
+
+def test_inn_registry(tmp_path):
+    path = str(tmp_path / "inn.bin")
+    inns = [str(7700000000 + i * 7) for i in range(1000)] + ["500100732259", ""]
+    assert write_inn_registry(path, reversed(inns)) == 1001
+    with MappedRegistry(path) as registry:
+        assert len(registry) == 1001
+        assert all(inn in registry for inn in inns if inn)
+        assert "7700000001" not in registry
+        assert "7702038150123" not in registry
+        assert list(registry.keys()) == sorted(inn for inn in inns if inn)
+    assert os.listdir(str(tmp_path)) == ["inn.bin"]
+
+def test_bik_registry(tmp_path):
+    path = str(tmp_path / "bik.bin")
+    directory = BikDirectory({
+        "044525219": BankInfo("044525219", "Банк", ("30101810500000000219",)),
+        "044525974": BankInfo("044525974", "Б" * 200, ("30101810145250000974", "30101810145250000975")),
+    })
+    write_bik_registry(path, directory)
+    with MappedBikDirectory(path) as registry:
+        assert registry.get("044525219") == directory.get("044525219")
+        assert registry.get("044525225") is None
+        info = registry.get("044525974")
+        # Long name is truncated, accounts are kept
+        assert info.accounts == ("30101810145250000974", "30101810145250000975")
+        assert "Б" * 10 in info.name
+        assert registry.is_ks_valid("30101810500000000219", "044525219")
+        assert not registry.is_ks_valid("30101810500000000219", "044525974")
+
+def test_invalid_registry(tmp_path):
+    path = str(tmp_path / "registry.bin")
+    with pytest.raises(ValueError):
+        write_registry(path, ["1234567890123"], key_size=12)
+    with open(path, "wb") as f:
+        f.write(b"garbage" * 10)
+    with pytest.raises(ValueError):
+        MappedRegistry(path)
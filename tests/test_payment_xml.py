@@ -0,0 +1,105 @@
+import io
+from unittest import mock
+from xml.etree.ElementTree import iterparse
+
+import pytest
+
+from django_bank_requisites.errors import ErrorCode
+from django_bank_requisites import payment_xml
+from django_bank_requisites.payment_xml import validate_payment_xml
+
+ED_PACKET = """<?xml version="1.0" encoding="WINDOWS-1251"?>
+<PacketEPD xmlns="urn:cbr-ru:ed:v2.0" EDNo="1" EDDate="2024-01-10">
+  <ED101 EDNo="10" EDDate="2024-01-10" Sum="100">
+    <Payer INN="7702038150" KPP="770201001" PersonalAcc="40602810900070000003">
+      <Name>ГУП Московский метрополитен</Name>
+      <Bank BIC="044525219" CorrespAcc="30101810500000000219"/>
+    </Payer>
+    <Payee INN="0" PersonalAcc="40602810900070000003">
+      <Bank BIC="044525219" CorrespAcc="30101810500000000219"/>
+    </Payee>
+  </ED101>
+  <ED105 EDNo="11" EDDate="2024-01-10" Sum="100">
+    <Payer INN="77020381" PersonalAcc="40602810900070000004">
+      <Bank BIC="044525219" CorrespAcc="30101810500000000219"/>
+    </Payer>
+    <Payee PersonalAcc="40602810900070000003">
+      <Bank BIC="044525219" CorrespAcc="30101810500000000218"/>
+    </Payee>
+  </ED105>
+</PacketEPD>
+"""
+
+def _party(prefix, inn, account, bik, ks):
+    return """
+      <{p}><Nm>Org</Nm><Id><OrgId><Othr><Id>{inn}</Id><SchmeNm><Cd>TXID</Cd></SchmeNm></Othr>
+        <Othr><Id>770201001</Id><SchmeNm><Prtry>KPP</Prtry></SchmeNm></Othr></OrgId></Id></{p}>
+      <{p}Acct><Id><Othr><Id>{account}</Id></Othr></Id></{p}Acct>
+      <{p}Agt><FinInstnId><ClrSysMmbId><MmbId>{bik}</MmbId></ClrSysMmbId></FinInstnId></{p}Agt>
+      <{p}AgtAcct><Id><Othr><Id>{ks}</Id></Othr></Id></{p}AgtAcct>""".format(p=prefix, inn=inn, account=account,
+                                                                              bik=bik, ks=ks)
+
+PAIN_001 = """<?xml version="1.0" encoding="UTF-8"?>
+<Document xmlns="urn:iso:std:iso:20022:tech:xsd:pain.001.001.09"><CstmrCdtTrfInitn><PmtInf>
+  {debtor}
+  <CdtTrfTxInf><PmtId><EndToEndId>E2E-1</EndToEndId></PmtId>{creditor}</CdtTrfTxInf>
+  <CdtTrfTxInf><PmtId><EndToEndId>E2E-2</EndToEndId></PmtId>{bad_creditor}</CdtTrfTxInf>
+</PmtInf></CstmrCdtTrfInitn></Document>
+""".format(debtor=_party("Dbtr", "7702038150", "40602810900070000003", "044525219", "30101810500000000219"),
+           creditor=_party("Cdtr", "7702038150", "40602810900070000003", "044525219", "30101810500000000219"),
+           bad_creditor=_party("Cdtr", "7702038151", "40602810900070000003", "044525219", "30101810500000000219"))
+
+PACS_008 = """<?xml version="1.0" encoding="UTF-8"?>
+<Document xmlns="urn:iso:std:iso:20022:tech:xsd:pacs.008.001.08"><FIToFICstmrCdtTrf>
+  <CdtTrfTxInf><PmtId><EndToEndId>E2E-3</EndToEndId></PmtId>{debtor}{creditor}</CdtTrfTxInf>
+</FIToFICstmrCdtTrf></Document>
+""".format(debtor=_party("Dbtr", "7702038150", "4060281090007000000q", "044525219", "30101810500000000219"),
+           creditor=_party("Cdtr", "7702038150", "40602810900070000003", "044525219", "30101810500000000219"))
+
+def _validate(text: str, encoding: str = "utf-8") -> list:
+    return list(validate_payment_xml(io.BytesIO(text.encode(encoding))))
+
+def test_ed_documents():
+    results = _validate(ED_PACKET, "cp1251")
+    assert [(result.kind, result.reference) for result in results] == [("ED101", "10"), ("ED105", "11")]
+    assert results[0].valid
+    assert results[1].errors == {
+        "payer": {"inn": ErrorCode.LENGTH, "rs": ErrorCode.CHECK_NUM_BIK},
+        "payee": {"ks": ErrorCode.KS_LAST_3},
+    }
+    assert not any(result.duplicate for result in results)
+
+def test_duplicate_references():
+    results = _validate(ED_PACKET.replace('EDNo="11"', 'EDNo="10"'), "cp1251")
+    assert [result.duplicate for result in results] == [False, True]
+    results = _validate(PAIN_001.replace("E2E-2", "E2E-1"))
+    assert [result.duplicate for result in results] == [False, True]
+
+def test_processed_packet_children_are_removed():
+    packet = ED_PACKET.replace("</PacketEPD>", '<ED108 EDNo="12"><Payer INN="7702038150"/></ED108></PacketEPD>')
+    roots = []
+
+    def _iterparse(source, events):
+        for event, element in iterparse(source, events=events):
+            if not roots:
+                roots.append(element)
+            yield event, element
+
+    with mock.patch.object(payment_xml, "iterparse", _iterparse):
+        assert len(_validate(packet, "cp1251")) == 2
+    assert len(roots[0]) == 0
+
+def test_iso_20022_documents():
+    results = _validate(PAIN_001)
+    assert [(result.kind, result.reference) for result in results] == [("pain.001.001.09", "E2E-1"),
+                                                                         ("pain.001.001.09", "E2E-2")]
+    assert results[0].valid
+    assert results[1].errors == {"payee": {"inn": ErrorCode.CHECK_NUM}}
+
+    results = _validate(PACS_008)
+    assert results[0].kind == "pacs.008.001.08"
+    assert results[0].errors == {"payer": {"rs": ErrorCode.STRUCTURE}}
+
+def test_invalid_xml():
+    with pytest.raises(SyntaxError):
+        _validate("<PacketEPD><ED101>")
@@ -0,0 +1,47 @@
+import pytest
+
+from django_bank_requisites.regions import (TaxOfficeTable,
+                                            inn_region,
+                                            inn_tax_office,
+                                            kpp_tax_office,
+                                            region_name)
+
+def test_codes():
+    assert inn_region("7701992807") == "77"
+    assert inn_region("500100732259") == "50"
+    assert inn_tax_office("7701992807") == "7701"
+    assert kpp_tax_office("770101001") == "7701"
+    assert inn_region("77019928") is None
+    assert inn_region(None) is None
+    assert kpp_tax_office("77010100a") is None
+
+def test_region_name():
+    assert region_name("77") == "г. Москва"
+    assert region_name("7701") == "г. Москва"
+    assert region_name("86") == "Ханты-Мансийский автономный округ - Югра"
+    assert region_name("99") == "Межрегиональные инспекции ФНС России"
+    assert region_name("00") is None
+    assert region_name("80") is None
+    assert region_name("x") is None
+
+def test_tax_office_table(tmp_path):
+    path = tmp_path / "sono.csv"
+    path.write_text("7701;ИФНС России № 1 по г. Москве\n5001;ИФНС России по г. Балашихе\n", encoding="utf-8")
+    table = TaxOfficeTable.from_csv(str(path))
+    assert len(table) == 2
+    assert table.get("7701") == "ИФНС России № 1 по г. Москве"
+    assert "5001" in table
+    assert "5002" not in table
+    assert table.get("770") is None
+    with pytest.raises(ValueError):
+        TaxOfficeTable({"77": "Москва"})
+    with pytest.raises(ValueError):
+        TaxOfficeTable({"77²1": "Москва"})
+
+def test_non_ascii_digits():
+    # str.isdigit() accepts these, but int() can't parse them
+    assert region_name("²7") is None
+    assert region_name("７７") is None
+    assert inn_region("77０1992807") is None
+    assert kpp_tax_office("77²101001") is None
+    assert TaxOfficeTable({"7701": "ИФНС"}).get("77²1") is None
@@ -0,0 +1,61 @@
+import io
+import json
+
+import pytest
+
+from django_bank_requisites.streaming import iter_json_records
+
+RECORDS = [{"inn": "7702038150", "rs": "40602810900070000003"}, {"inn": "500100732259"}, {}]
+
+def test_iter_json_records_array():
+    stream = io.BytesIO(b' [ {"inn": "7702038150", "rs": "40602810900070000003"},\n{"inn": "500100732259"} , {}]')
+    # Small chunks make records split between reads
+    assert list(iter_json_records(stream, chunk_size=3)) == RECORDS
+    assert list(iter_json_records(io.BytesIO(b"[]"))) == []
+    assert list(iter_json_records(io.BytesIO(b"[12, 345]"), chunk_size=2)) == [12, 345]
+
+def test_iter_json_records_ndjson():
+    stream = io.BytesIO('{"inn": "7702038150", "rs": "40602810900070000003"}\n\n{"inn": "500100732259"}\n{}'.encode())
+    assert list(iter_json_records(stream, chunk_size=5)) == RECORDS
+    assert list(iter_json_records(io.StringIO("  "))) == []
+    assert list(iter_json_records(None)) == []
+
+def test_iter_json_records_non_ascii():
+    stream = io.BytesIO('[{"bank_name": "ПАО ‟Авангард‟"}]'.encode())
+    assert list(iter_json_records(stream, chunk_size=1)) == [{"bank_name": "ПАО ‟Авангард‟"}]
+
+def test_iter_json_records_malformed():
+    with pytest.raises(ValueError):
+        list(iter_json_records(io.BytesIO(b'[{"inn": "1"} {"inn": "2"}]')))
+    with pytest.raises(ValueError):
+        list(iter_json_records(io.BytesIO(b'[{"inn": "1"},')))
+    with pytest.raises(ValueError):
+        list(iter_json_records(io.BytesIO(b'{"inn": "1"}\n{"inn": ')))
+
+class LongStream:
+    """
+    Stream of head followed by a lot of whitespace.
+    """
+
+    def __init__(self, head: bytes):
+        self.head = head
+        self.reads = 0
+
+    def read(self, size):
+        self.reads += 1
+        if self.head:
+            chunk, self.head = self.head[:size], self.head[size:]
+            return chunk
+        return b" " * size if self.reads < 1000 else b""
+
+def test_iter_json_records_malformed_without_reading_rest():
+    stream = LongStream(b'[{"inn": "1"}, {"inn" "2"}')
+    with pytest.raises(ValueError):
+        list(iter_json_records(stream, chunk_size=4))
+    assert stream.reads <= 8
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7])
+def test_iter_json_records_split_values(chunk_size):
+    data = '[{"a\\u0041": [true, false, null, -1.5e+10, 0, "x\\"y"]}, {"n": {"k": 12}}]'
+    stream = io.BytesIO(data.encode())
+    assert list(iter_json_records(stream, chunk_size=chunk_size)) == json.loads(data)
@@ -0,0 +1,18 @@
+import os
+
+import pytest
+
+from django_bank_requisites.utils import atomic_write
+
+def test_atomic_write(tmp_path):
+    path = str(tmp_path / "registry.bin")
+    with atomic_write(path) as f:
+        f.write(b"old")
+    with pytest.raises(RuntimeError):
+        with atomic_write(path) as f:
+            f.write(b"new")
+            raise RuntimeError
+    # The file isn't replaced and the temporary file is removed
+    with open(path, "rb") as f:
+        assert f.read() == b"old"
+    assert os.listdir(str(tmp_path)) == ["registry.bin"]